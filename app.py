@@ -3,24 +3,73 @@ Universal Sentiment Analysis Platform - Flask Backend
 Replaces Streamlit with Flask API
 """
 
-from flask import Flask, request, jsonify, render_template, send_from_directory
+from flask import Flask, Response, request, jsonify, render_template, send_from_directory, stream_with_context
 from flask_cors import CORS
+import csv
+import io
 import json
+import os
+import threading
+import time
 import uuid
+from collections import OrderedDict
 from datetime import datetime
-from sentiment_engine import SentimentAnalyzer
-from comment_fetcher import fetch_comments
+from sentiment_engine import ColumnarResults, LABEL_CODES, SentimentAnalyzer, preload_model, score_cache
+from comment_fetcher import PLATFORM_DEFAULT, YOUTUBE_SORTS, fetch_cache, fetch_comments, fetch_metrics
 from creator_analytics import CreatorAnalyzer
+from session_store import create_session_store
+from job_queue import JobQueue, JobError, QUEUED, DONE, FAILED
 
 app = Flask(__name__, static_folder='static', template_folder='templates')
 CORS(app)
 
+# Memory-mapped export of model_pickle (python lexicon_store.py regenerates it)
+MODEL_FORMAT = 'lexicon'
+
+# Load the model once; both analyzers below share it, and so do workers
+# forked from this process (gunicorn --preload)
+preload_model(model_format=MODEL_FORMAT)
+
 # Initialize sentiment analyzer with existing model
-analyzer = SentimentAnalyzer()
-creator_analyzer = CreatorAnalyzer()
+# Large batches are scored across a process pool, one worker per core
+analyzer = SentimentAnalyzer(workers=os.cpu_count() or 1, model_format=MODEL_FORMAT)
+creator_analyzer = CreatorAnalyzer(analyzer)
+
+# Analysis sessions expire and are evicted LRU once over the size limit.
+# In memory by default; SESSION_STORE=sqlite:///sessions.db shares them
+# between workers and keeps them across restarts
+sessions = create_session_store(os.environ.get('SESSION_STORE'))
+
+# URL and creator analyses run as background jobs; JOB_STORE=sqlite:///jobs.db
+# lets any worker report on jobs started by another
+jobs = JobQueue(os.environ.get('JOB_STORE'))
+
+# Job long-polls and event streams each hold a worker thread while they wait,
+# so both are bounded; an event stream ends after EVENT_STREAM_DURATION and
+# the browser's EventSource reconnects with Last-Event-ID after EVENT_RETRY_MS
+JOB_POLL_MAX_TIMEOUT = 30
+EVENT_STREAM_DURATION = 60
+EVENT_KEEPALIVE = 15
+EVENT_RETRY_MS = 1000
 
-# Store analysis sessions in memory (can be replaced with database later)
-sessions = {}
+# Upper bound on "max_comments" for one Reddit thread or YouTube video
+# (MAX_COMMENTS_PER_SOURCE=0 or unset: none, and "max_comments": null fetches all)
+MAX_COMMENTS_PER_SOURCE = int(os.environ.get('MAX_COMMENTS_PER_SOURCE') or 0) or None
+
+
+def store_results(title, results):
+    """
+    Store a ColumnarResults as a new session and return its id; the counts
+    are kept beside the results so a summary never has to decode them
+    """
+    session_id = str(uuid.uuid4())
+    sessions.put(session_id, {
+        'title': title,
+        'timestamp': datetime.now().isoformat(),
+        'counts': results.counts(),
+        'results': results.to_dict()
+    })
+    return session_id
 
 
 @app.route('/')
@@ -54,31 +103,204 @@ def analyze():
             return jsonify({'error': 'Comments list is empty'}), 400
         
         # Perform sentiment analysis
-        results = analyzer.analyze_comments(comments)
+        results = analyzer.analyze_columnar(comments)
         
         # Create session
-        session_id = str(uuid.uuid4())
-        sessions[session_id] = {
-            'title': title,
-            'timestamp': datetime.now().isoformat(),
-            'results': results
-        }
+        session_id = store_results(title, results)
         
         return jsonify({
             'session_id': session_id,
             'title': title,
-            'results': results
+            'results': results.legacy_view()
         })
     
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 
+# Request content types whose lines are parsed as JSON; anything else is one comment per line
+NDJSON_MIMETYPES = ('application/x-ndjson', 'application/jsonl', 'application/json')
+
+
+def iter_stream_comments(stream, ndjson=True):
+    """
+    Comments from an upload read line by line
+    NDJSON lines may be a string or an object with a "text" field; lines
+    that cannot be parsed are yielded as ValueError so the caller can report them
+    """
+    for line_number, raw in enumerate(stream, start=1):
+        line = raw.decode('utf-8', 'replace').strip()
+        if not line:
+            continue
+        if not ndjson:
+            yield line
+            continue
+        try:
+            item = json.loads(line)
+        except ValueError:
+            yield ValueError(f'Line {line_number} is not valid JSON')
+            continue
+        if isinstance(item, dict):
+            item = item.get('text')
+        if not isinstance(item, str):
+            yield ValueError(f'Line {line_number} has no comment text')
+            continue
+        yield item
+
+
+@app.route('/api/analyze/stream', methods=['POST'])
+def analyze_stream():
+    """
+    Analyze an NDJSON (or plain text, one comment per line) upload incrementally
+    Responds with NDJSON: {"index", "label", "compound"} per comment and
+    {"counts"} with running totals after each batch, ending with "done": true
+    """
+    ndjson = request.mimetype in NDJSON_MIMETYPES
+    errors = []
+
+    def comments():
+        for item in iter_stream_comments(request.stream, ndjson):
+            if isinstance(item, ValueError):
+                errors.append(str(item))
+            else:
+                yield item
+
+    def generate():
+        counts = {'positive': 0, 'negative': 0, 'neutral': 0, 'total': 0}
+        try:
+            for event in analyzer.analyze_stream(comments()):
+                if 'counts' in event:
+                    counts = event['counts']
+                    for error in errors:
+                        yield json.dumps({'error': error}) + '\n'
+                    errors.clear()
+                yield json.dumps(event) + '\n'
+        except Exception as e:
+            yield json.dumps({'error': str(e)}) + '\n'
+        for error in errors:
+            yield json.dumps({'error': error}) + '\n'
+        yield json.dumps({'counts': counts, 'done': True}) + '\n'
+
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+
+# Header names of the comment column in a multi-column CSV upload
+CSV_COMMENT_COLUMNS = ('comment', 'comments', 'text')
+
+
+def iter_upload_comments(upload):
+    """
+    Comments of an uploaded file, read incrementally: one per row of a .csv,
+    otherwise one per line; a first row mentioning "comment" is taken as a
+    header and skipped. Only a header naming the comment column among
+    several selects one field; otherwise a row's fields are joined back
+    together, so unquoted commas stay part of the comment
+    """
+    text = io.TextIOWrapper(upload.stream, encoding='utf-8', errors='replace', newline='')
+    if upload.filename.lower().endswith('.csv'):
+        rows = csv.reader(text)
+    else:
+        rows = ([line] for line in text)
+    column = None
+    for row_number, row in enumerate(rows):
+        if row_number == 0 and 'comment' in ','.join(row).lower():
+            names = [field.strip().lower() for field in row]
+            if len(names) > 1:
+                column = next((i for i, name in enumerate(names) if name in CSV_COMMENT_COLUMNS), None)
+            continue
+        if column is None:
+            comment = ','.join(row)
+        else:
+            comment = row[column] if column < len(row) else ''
+        comment = comment.strip()
+        if comment:
+            yield comment
+
+
+@app.route('/api/analyze/upload', methods=['POST'])
+def analyze_upload():
+    """
+    Analyze a CSV or TXT comment dump sent as multipart form field "file"
+    (optional form field "title"). The file is read and scored in batches,
+    so it never sits in memory as one string; the session keeps each
+    distinct comment once.
+    Returns the session id, title and counts.
+    """
+    upload = request.files.get('file')
+    if upload is None or not upload.filename:
+        return jsonify({'error': 'No file uploaded'}), 400
+    title = request.form.get('title') or os.path.splitext(upload.filename)[0]
+
+    try:
+        results = analyzer.analyze_iter(iter_upload_comments(upload))
+    except csv.Error as e:
+        return jsonify({'error': f'Could not parse CSV: {e}'}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+    if not len(results):
+        return jsonify({'error': 'No comments found in file'}), 400
+
+    session_id = store_results(title, results)
+    return jsonify({
+        'session_id': session_id,
+        'title': title,
+        'counts': results.counts()
+    })
+
+
+def fetch_options(data):
+    """
+    The optional "max_comments" and "sort" of a fetch request
+    Returns (options, error) with options as keyword arguments for fetch_comments
+    """
+    max_count = data.get('max_comments', PLATFORM_DEFAULT)
+    limit = MAX_COMMENTS_PER_SOURCE
+    if max_count is not PLATFORM_DEFAULT:
+        valid = max_count is None or (
+            isinstance(max_count, int) and not isinstance(max_count, bool) and max_count >= 1)
+        if not valid or (limit is not None and (max_count is None or max_count > limit)):
+            if limit is None:
+                return None, 'max_comments must be a whole number, or null for all comments'
+            return None, f'max_comments must be a whole number from 1 to {limit}'
+    sort = data.get('sort', 'recent')
+    if sort not in YOUTUBE_SORTS:
+        return None, f'Unknown sort: {sort}'
+    return {'max_count': max_count, 'sort': sort}, None
+
+
+def run_url_job(url, options, progress):
+    """Job: fetch and analyze one URL, returning the new session id"""
+    progress(sources_done=0, sources_total=1, comments_scored=0, percent=0.0)
+
+    # Fetch comments
+    fetch_result, error = fetch_comments(url, **options)
+    
+    if error:
+        raise JobError(error)
+        
+    comments = fetch_result['comments']
+    title = fetch_result['title']
+    
+    if not comments or len(comments) == 0:
+        raise JobError('No comments found at this URL')
+        
+    # Perform sentiment analysis
+    results = analyzer.analyze_columnar(comments)
+    progress(sources_done=1, comments_scored=len(comments), percent=100.0)
+    
+    # Create session
+    session_id = store_results(title, results)
+    return {'session_id': session_id, 'title': title}
+
+
 @app.route('/api/analyze-url', methods=['POST'])
 def analyze_url():
     """
-    Fetch and analyze comments from a URL
-    Expects JSON: {"url": "https://..."}
+    Fetch and analyze comments from a URL in the background
+    Expects JSON: {"url": "https://..."}, optionally with "max_comments"
+    (Reddit and YouTube; null = all) and "sort": "recent" or "popular" (YouTube)
+    Returns 202 with a job_id; poll /api/jobs/<job_id> for the session_id
     """
     try:
         data = request.get_json()
@@ -86,48 +308,173 @@ def analyze_url():
         if not data or 'url' not in data:
             return jsonify({'error': 'No URL provided'}), 400
         
-        url = data['url']
-        
-        # Fetch comments
-        fetch_result, error = fetch_comments(url)
-        
+        options, error = fetch_options(data)
         if error:
             return jsonify({'error': error}), 400
-            
-        comments = fetch_result['comments']
-        title = fetch_result['title']
-        
-        if not comments or len(comments) == 0:
-            return jsonify({'error': 'No comments found at this URL'}), 400
-            
-        # Perform sentiment analysis
-        results = analyzer.analyze_comments(comments)
-        
-        # Create session
-        session_id = str(uuid.uuid4())
-        sessions[session_id] = {
-            'title': title,
-            'timestamp': datetime.now().isoformat(),
-            'results': results
-        }
-        
-        return jsonify({
-            'session_id': session_id,
-            'title': title,
-            'results': results
-        })
+
+        job_id = jobs.submit('url', run_url_job, data['url'], options)
+        return jsonify({'job_id': job_id, 'status': QUEUED}), 202
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """
+    Status and progress of a background job
+    With ?version=N the request waits (up to ?timeout seconds, max
+    JOB_POLL_MAX_TIMEOUT) until the job has changed since version N
+    """
+    version = request.args.get('version', type=int)
+    if version is None:
+        job = jobs.get(job_id)
+    else:
+        timeout = max(0, min(request.args.get('timeout', 15, type=float), JOB_POLL_MAX_TIMEOUT))
+        job = jobs.wait(job_id, version, timeout)
+
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify(job)
+
+
+def session_view(session):
+    """
+    A stored session in the shape the dashboard reads: columnar results are
+    expanded into positive/negative/neutral text lists
+    """
+    if session.get('type') == 'creator':
+        stats = session['data']['stats']
+        if ColumnarResults.is_columnar(stats.get('comments')):
+            view = ColumnarResults.from_dict(stats['comments']).legacy_view()
+            stats = {key: value for key, value in stats.items() if key != 'comments'}
+            stats.update(positive=view['positive'], negative=view['negative'], neutral=view['neutral'])
+            return dict(session, data=dict(session['data'], stats=stats))
+        return session
+
+    if ColumnarResults.is_columnar(session.get('results')):
+        return dict(session, results=ColumnarResults.from_dict(session['results']).legacy_view())
+    return session
+
+
 @app.route('/api/session/<session_id>', methods=['GET'])
 def get_session(session_id):
     """Retrieve analysis results by session ID"""
-    if session_id not in sessions:
+    session = sessions.get(session_id)
+    if session is None:
         return jsonify({'error': 'Session not found'}), 404
     
-    return jsonify(sessions[session_id])
+    return jsonify(session_view(session))
+
+# Decoded session results (with their score-sorted indexes) kept per process
+SESSION_RESULTS_CACHE = 32
+_session_results = OrderedDict()
+_session_results_lock = threading.Lock()
+
+# Largest page /api/session/<id>/comments (or k for /extremes) returns
+MAX_PAGE_SIZE = 500
+
+
+def session_results(session_id):
+    """
+    The session's ColumnarResults (None if the session is missing or not columnar)
+    A cached copy is only served while the store still holds the session,
+    so expired or evicted sessions are dropped here too
+    """
+    with _session_results_lock:
+        results = _session_results.get(session_id)
+    if results is not None:
+        if session_id in sessions:
+            with _session_results_lock:
+                if session_id in _session_results:
+                    _session_results.move_to_end(session_id)
+            return results
+        with _session_results_lock:
+            _session_results.pop(session_id, None)
+        return None
+
+    session = sessions.get(session_id)
+    if session is None:
+        return None
+    data = session['data']['stats'].get('comments') if session.get('type') == 'creator' else session.get('results')
+    if not ColumnarResults.is_columnar(data):
+        return None
+    results = ColumnarResults.from_dict(data)
+
+    with _session_results_lock:
+        _session_results[session_id] = results
+        while len(_session_results) > SESSION_RESULTS_CACHE:
+            _session_results.popitem(last=False)
+    return results
+
+
+@app.route('/api/session/<session_id>/summary', methods=['GET'])
+def get_session_summary(session_id):
+    """A session without its comments: title/creator info and counts"""
+    session = sessions.get(session_id)
+    if session is None:
+        return jsonify({'error': 'Session not found'}), 404
+
+    if session.get('type') == 'creator':
+        stats = {key: value for key, value in session['data']['stats'].items() if key != 'comments'}
+        return jsonify(dict(session, data=dict(session['data'], stats=stats)))
+    # Sessions stored before columnar results keep their counts inside results
+    counts = session.get('counts') or session['results'].get('counts')
+    return jsonify(dict({key: value for key, value in session.items() if key != 'results'}, counts=counts))
+
+
+@app.route('/api/session/<session_id>/comments', methods=['GET'])
+def get_session_comments(session_id):
+    """
+    One page of a session's comments
+    Query: label (positive/negative/neutral), offset, limit (max 500),
+    sort (score or -score; default is analysis order)
+    """
+    label = request.args.get('label') or None
+    sort = request.args.get('sort') or None
+    offset = max(request.args.get('offset', 0, type=int), 0)
+    limit = min(max(request.args.get('limit', 50, type=int), 0), MAX_PAGE_SIZE)
+
+    if label is not None and label not in LABEL_CODES:
+        return jsonify({'error': f'Unknown label: {label}'}), 400
+    if sort not in (None, 'score', '-score'):
+        return jsonify({'error': f'Unknown sort: {sort}'}), 400
+
+    results = session_results(session_id)
+    if results is None:
+        return jsonify({'error': 'Session not found'}), 404
+
+    total, items = results.page(label, offset, limit, sort)
+    return jsonify({
+        'total': total,
+        'offset': offset,
+        'limit': limit,
+        'comments': items
+    })
+
+
+@app.route('/api/session/<session_id>/extremes', methods=['GET'])
+def get_session_extremes(session_id):
+    """The k (default 10, max 500) most positive and most negative comments of a session"""
+    k = min(max(request.args.get('k', 10, type=int), 0), MAX_PAGE_SIZE)
+
+    results = session_results(session_id)
+    if results is None:
+        return jsonify({'error': 'Session not found'}), 404
+
+    return jsonify(dict(results.extremes(k), k=k))
+
+
+@app.route('/api/cache/stats', methods=['GET'])
+def cache_stats():
+    """Hit/miss counters of the shared comment score cache"""
+    return jsonify(score_cache.stats())
+
+
+@app.route('/api/fetch/stats', methods=['GET'])
+def fetch_stats():
+    """Connection reuse, connect/response/transfer time and cache hit ratio of comment fetches"""
+    return jsonify({**fetch_metrics.stats(), 'cache': fetch_cache.stats()})
 
 
 @app.route('/api/demo', methods=['GET'])
@@ -156,27 +503,86 @@ def demo_data():
         "Excellent explanation!"
     ]
     
-    results = analyzer.analyze_comments(demo_comments)
+    results = analyzer.analyze_columnar(demo_comments)
     
-    session_id = str(uuid.uuid4())
-    sessions[session_id] = {
-        'title': 'Demo Analysis',
-        'timestamp': datetime.now().isoformat(),
-        'results': results
-    }
+    session_id = store_results('Demo Analysis', results)
     
     return jsonify({
         'session_id': session_id,
         'title': 'Demo Analysis',
-        'results': results
+        'results': results.legacy_view()
+    })
+
+
+@app.route('/api/jobs/<job_id>/events', methods=['GET'])
+def job_events(job_id):
+    """
+    Server-Sent Events stream of a job: a "progress" event with the job
+    record each time it changes, then "done" or "failed". Event ids are job
+    versions, so a reconnecting EventSource resumes where it left off.
+
+    The stream closes after EVENT_STREAM_DURATION seconds so it does not
+    hold a worker for the whole job; the client then reconnects.
+    """
+    version = request.headers.get('Last-Event-ID', -1, type=int)
+    if jobs.get(job_id) is None:
+        return jsonify({'error': 'Job not found'}), 404
+
+    def generate():
+        current = version
+        deadline = time.monotonic() + EVENT_STREAM_DURATION
+        yield f"retry: {EVENT_RETRY_MS}\n\n"
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            job = jobs.wait(job_id, current, timeout=min(EVENT_KEEPALIVE, remaining))
+            if job is None:
+                yield f"event: failed\ndata: {json.dumps({'error': 'Job expired'})}\n\n"
+                return
+            if job['version'] <= current:
+                # Comment line keeps proxies from closing an idle stream
+                yield ": keep-alive\n\n"
+                continue
+            current = job['version']
+            event = job['status'] if job['status'] in (DONE, FAILED) else 'progress'
+            yield f"id: {current}\nevent: {event}\ndata: {json.dumps(job)}\n\n"
+            if event != 'progress':
+                return
+
+    return Response(generate(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+
+
+def run_creator_job(name, urls, manual_data, refresh, options, progress):
+    """Job: analyze a creator's sources, returning the new session id"""
+    analysis_result = creator_analyzer.analyze_creator(name, urls, manual_data, progress=progress,
+                                                       refresh=refresh, **options)
+    
+    if analysis_result['stats']['total_count'] == 0:
+         raise JobError('Could not fetch any comments from the provided URLs. Check URLs and try again.')
+
+    # Create session (comments stored column-wise)
+    analysis_result['stats']['comments'] = analysis_result['stats']['comments'].to_dict()
+    session_id = str(uuid.uuid4())
+    sessions.put(session_id, {
+        'type': 'creator',
+        'data': analysis_result
     })
+    return {'session_id': session_id}
 
 
 @app.route('/api/creator/analyze', methods=['POST'])
 def analyze_creator():
     """
-    Analyze a creator profile provided multiple URLs
+    Analyze a creator profile provided multiple URLs, in the background
     Expects JSON: {"name": "Creator Name", "urls": ["url1", "url2", ...]}
+    and optionally "refresh": true to re-fetch and re-score every source,
+    "max_comments" per Reddit thread or YouTube video (null = all) and
+    "sort": "recent" or "popular" for YouTube videos
+    Returns 202 with a job_id; poll /api/jobs/<job_id> for the session_id
     """
     try:
         data = request.get_json()
@@ -191,23 +597,13 @@ def analyze_creator():
         if len(urls) == 0 and len(manual_data) == 0:
              return jsonify({'error': 'Please provide at least one URL or Manual Text entry.'}), 400
             
-        # Perform Creator Analysis
-        analysis_result = creator_analyzer.analyze_creator(name, urls, manual_data)
-        
-        if analysis_result['stats']['total_count'] == 0:
-             return jsonify({'error': 'Could not fetch any comments from the provided URLs. Check URLs and try again.'}), 400
+        options, error = fetch_options(data)
+        if error:
+            return jsonify({'error': error}), 400
 
-        # Create session
-        session_id = str(uuid.uuid4())
-        sessions[session_id] = {
-            'type': 'creator',
-            'data': analysis_result
-        }
-        
-        return jsonify({
-            'session_id': session_id,
-            'status': 'success'
-        })
+        refresh = bool(data.get('refresh', False))
+        job_id = jobs.submit('creator', run_creator_job, name, urls, manual_data, refresh, options)
+        return jsonify({'job_id': job_id, 'status': QUEUED}), 202
 
     except Exception as e:
         return jsonify({'error': str(e)}), 500
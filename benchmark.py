@@ -0,0 +1,329 @@
+"""
+Benchmark Module
+Throughput, latency and memory of the cleaning and scoring hot paths
+
+Runs clean/clean_batch, SentimentAnalyzer.analyze_comments and
+CreatorAnalyzer.analyze_creator over synthetic corpora (short, long,
+emoji-heavy and HTML-laden comments) and over recorded corpora saved with
+--record. Creator sources are served from the corpus instead of the network.
+
+Each result reports comments/sec (median of the repeats), p50/p99 latency
+and peak traced memory. Latency is per comment for clean and analyze (one
+call per comment over a sample) and per source for creator (time until the
+source finished). Results are saved as JSON; --compare flags throughput
+regressions against an earlier run.
+
+Usage:
+    python benchmark.py [--sizes 1000 10000] [--corpora short long emoji html]
+                        [--benchmarks clean analyze creator] [--repeat 3]
+                        [--output results.json] [--compare baseline.json]
+    python benchmark.py --record https://www.reddit.com/r/.../comments/... [...]
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import re
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+
+import creator_analytics
+from comment_fetcher import REDDIT_PAGE_SIZE, _pages
+from creator_analytics import CreatorAnalyzer, SourceResults
+from sentiment_engine import ScoreCache, SentimentAnalyzer
+from session_store import MemorySessionStore
+from text_processor import clean, clean_batch
+
+# Recorded corpora: one JSON file per source, as returned by fetch_comments
+FIXTURES_DIR = 'bench_fixtures'
+
+# Default output directory for result files
+RESULTS_DIR = 'benchmark_results'
+
+# Comments timed one call at a time for latency percentiles
+LATENCY_SAMPLE = 500
+
+# Sources a corpus is split into for the creator benchmark
+CREATOR_SOURCES = 5
+
+# Throughput drop (fraction) reported as a regression by --compare
+REGRESSION_THRESHOLD = 0.10
+
+SYNTHETIC_CORPORA = ('short', 'long', 'emoji', 'html')
+BENCHMARKS = ('clean', 'analyze', 'creator')
+
+_WORDS = (
+    'the video was really good and i love how you explain it but the audio is bad '
+    'honestly this is amazing content great work keep it up not sure about that part '
+    'terrible editing awful music boring intro best channel ever so helpful thanks lol '
+    'wtf omg idk imo tbh brb u r gr8 cant wont dont isnt wasnt would have been better'
+).split()
+_EMOJIS = ('😂', '❤️', '🔥', '👍', '😭', '😡', '🙏', '💯', '🤔', '😍', '👎', '🎉')
+_TAGS = ('b', 'i', 'em', 'strong', 'a href="https://example.com"', 'span class="x"', 'p', 'br')
+_ENTITIES = ('&amp;', '&quot;', '&#39;', '&lt;3', '&nbsp;', '&hellip;')
+
+
+def _sentence(rng, low, high):
+    return ' '.join(rng.choice(_WORDS) for _ in range(rng.randint(low, high)))
+
+
+def synthetic_corpus(kind, size, seed=0):
+    """size comments of one synthetic kind, the same for a given seed"""
+    rng = random.Random(f'{kind}:{seed}')
+    comments = []
+    for _ in range(size):
+        if kind == 'short':
+            comment = _sentence(rng, 3, 12)
+        elif kind == 'long':
+            comment = '. '.join(_sentence(rng, 8, 20) for _ in range(rng.randint(4, 10)))
+        elif kind == 'emoji':
+            words = _sentence(rng, 3, 10).split()
+            for _ in range(rng.randint(2, 6)):
+                words.insert(rng.randint(0, len(words)), rng.choice(_EMOJIS) * rng.randint(1, 3))
+            comment = ' '.join(words)
+        elif kind == 'html':
+            words = _sentence(rng, 6, 20).split()
+            for _ in range(rng.randint(1, 4)):
+                tag = rng.choice(_TAGS)
+                i = rng.randrange(len(words))
+                words[i] = f'<{tag}>{words[i]}</{tag.split()[0]}>'
+            words.insert(rng.randint(0, len(words)), rng.choice(_ENTITIES))
+            comment = ' '.join(words)
+        else:
+            raise ValueError(f"Unknown corpus: {kind}")
+        comments.append(comment)
+    return comments
+
+
+def recorded_corpora(fixtures_dir=FIXTURES_DIR):
+    """{name: [source dicts]} for each recorded fixture file"""
+    corpora = {}
+    if not os.path.isdir(fixtures_dir):
+        return corpora
+    for filename in sorted(os.listdir(fixtures_dir)):
+        if filename.endswith('.json'):
+            with open(os.path.join(fixtures_dir, filename), encoding='utf-8') as f:
+                corpora[f'recorded:{filename[:-5]}'] = [json.load(f)]
+    return corpora
+
+
+def record(urls, fixtures_dir=FIXTURES_DIR):
+    """Fetch each URL once and save its comments as a fixture"""
+    from comment_fetcher import canonical_url, fetch_comments
+
+    os.makedirs(fixtures_dir, exist_ok=True)
+    for url in urls:
+        result, error = fetch_comments(url, use_cache=False)
+        if error:
+            print(f"{url}: {error}")
+            continue
+        name = re.sub(r'[^A-Za-z0-9_-]+', '_', canonical_url(url) or url)
+        path = os.path.join(fixtures_dir, f'{name}.json')
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'url': url, 'title': result['title'], 'comments': result['comments']}, f, ensure_ascii=False)
+        print(f"Wrote {path} ({len(result['comments'])} comments)")
+
+
+def _sources(name, comments):
+    """Split a synthetic corpus into CREATOR_SOURCES fake Reddit threads"""
+    step = -(-len(comments) // CREATOR_SOURCES)
+    return [{
+        'url': f'https://www.reddit.com/r/benchmark/comments/{name}{i}/source/',
+        'title': f'{name} source {i}',
+        'comments': comments[start:start + step]
+    } for i, start in enumerate(range(0, len(comments), step))]
+
+
+def _analyzer(workers):
+    # No score cache, so repeats measure scoring rather than cache lookups
+    return SentimentAnalyzer(cache=ScoreCache(0), workers=workers, model_format='lexicon')
+
+
+def _percentiles(latencies):
+    latencies = np.asarray(latencies) * 1000
+    return round(float(np.percentile(latencies, 50)), 4), round(float(np.percentile(latencies, 99)), 4)
+
+
+def _sample(comments):
+    return comments[::max(len(comments) // LATENCY_SAMPLE, 1)][:LATENCY_SAMPLE]
+
+
+def _timed_calls(func, items):
+    latencies = []
+    for item in items:
+        start = time.perf_counter()
+        func(item)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def _peak_memory(run):
+    """Peak traced allocation of run() in MB (traced separately from the timed runs)"""
+    tracemalloc.start()
+    try:
+        run()
+        return round(tracemalloc.get_traced_memory()[1] / 1e6, 3)
+    finally:
+        tracemalloc.stop()
+
+
+def bench_clean(comments, sources, workers):
+    run = lambda: clean_batch(comments)
+    return run, _percentiles(_timed_calls(clean, _sample(comments)))
+
+
+def bench_analyze(comments, sources, workers):
+    analyzer = _analyzer(workers)
+    run = lambda: analyzer.analyze_comments(comments)
+    latencies = _timed_calls(lambda comment: analyzer.analyze_comments([comment]), _sample(comments))
+    return run, _percentiles(latencies)
+
+
+def bench_creator(comments, sources, workers):
+    fixtures = {source['url']: source for source in sources}
+    creator = CreatorAnalyzer(_analyzer(workers), sources=SourceResults(MemorySessionStore()))
+    latencies = []
+
+    def open_fixture(url, use_cache=True, **options):
+        source = fixtures[url]
+        return source['title'], _pages(source['comments'], REDDIT_PAGE_SIZE)
+
+    def run():
+        start = time.perf_counter()
+        latencies.clear()
+        creator_analytics.open_comments = open_fixture
+        try:
+            # refresh, so stored results from earlier repeats are not reused
+            creator.analyze_creator(
+                'benchmark', list(fixtures), refresh=True,
+                progress=lambda **_: latencies.append(time.perf_counter() - start)
+            )
+        finally:
+            creator_analytics.open_comments = network_open
+
+    network_open = creator_analytics.open_comments
+    run()
+    return run, _percentiles(latencies)
+
+
+BENCHMARK_FUNCTIONS = {'clean': bench_clean, 'analyze': bench_analyze, 'creator': bench_creator}
+
+
+def run_benchmark(benchmark, corpus, comments, sources, repeat, workers):
+    run, (p50, p99) = BENCHMARK_FUNCTIONS[benchmark](comments, sources, workers)
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        durations.append(time.perf_counter() - start)
+    seconds = statistics.median(durations)
+    return {
+        'benchmark': benchmark,
+        'corpus': corpus,
+        'size': len(comments),
+        'seconds': round(seconds, 4),
+        'comments_per_sec': round(len(comments) / seconds, 1) if seconds else None,
+        'latency_unit': 'source' if benchmark == 'creator' else 'comment',
+        'p50_ms': p50,
+        'p99_ms': p99,
+        'peak_memory_mb': _peak_memory(run)
+    }
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline, threshold=REGRESSION_THRESHOLD):
+    """Print throughput changes against a baseline run; returns the regressions"""
+    before = {(r['benchmark'], r['corpus'], r['size']): r for r in baseline['results']}
+    regressions = []
+    print(f"\nCompared with {baseline.get('commit') or 'baseline'} ({baseline.get('timestamp')}):")
+    for result in results:
+        old = before.get((result['benchmark'], result['corpus'], result['size']))
+        if old is None or not old['comments_per_sec'] or not result['comments_per_sec']:
+            continue
+        change = result['comments_per_sec'] / old['comments_per_sec'] - 1
+        regressed = change < -threshold
+        if regressed:
+            regressions.append(result)
+        print(f"  {result['benchmark']:8} {result['corpus']:16} {result['size']:>8}  "
+              f"{change:+7.1%}{'  REGRESSION' if regressed else ''}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark cleaning and scoring throughput')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000])
+    parser.add_argument('--corpora', nargs='+', default=list(SYNTHETIC_CORPORA),
+                        help='synthetic corpora to run; recorded fixtures always run at their own size')
+    parser.add_argument('--benchmarks', nargs='+', choices=BENCHMARKS, default=list(BENCHMARKS))
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--workers', type=int, default=0, help='scoring process pool size (0: in-process)')
+    parser.add_argument('--fixtures', default=FIXTURES_DIR)
+    parser.add_argument('--output', help=f'result file (default: {RESULTS_DIR}/<commit>-<time>.json)')
+    parser.add_argument('--compare', help='earlier result file to compare throughput against')
+    parser.add_argument('--record', nargs='+', metavar='URL', help='fetch URLs into fixtures and exit')
+    args = parser.parse_args(argv)
+
+    if args.record:
+        record(args.record, args.fixtures)
+        return 0
+
+    corpora = []
+    for kind in args.corpora:
+        for size in args.sizes:
+            comments = synthetic_corpus(kind, size)
+            corpora.append((kind, comments, _sources(f'{kind}{size}', comments)))
+    for name, sources in recorded_corpora(args.fixtures).items():
+        corpora.append((name, [comment for source in sources for comment in source['comments']], sources))
+
+    results = []
+    for corpus, comments, sources in corpora:
+        for benchmark in args.benchmarks:
+            result = run_benchmark(benchmark, corpus, comments, sources, args.repeat, args.workers)
+            results.append(result)
+            print(f"{benchmark:8} {corpus:16} {result['size']:>8}  {result['comments_per_sec']:>12,.0f}/s  "
+                  f"p50 {result['p50_ms']:.3f}ms  p99 {result['p99_ms']:.3f}ms  "
+                  f"peak {result['peak_memory_mb']:.1f}MB")
+
+    now = datetime.now()
+    commit = _git_commit()
+    report = {
+        'commit': commit,
+        'timestamp': now.isoformat(),
+        'python': sys.version.split()[0],
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'repeat': args.repeat,
+        'workers': args.workers,
+        'results': results
+    }
+    output = args.output or os.path.join(RESULTS_DIR, f"{commit or 'local'}-{now:%Y%m%d-%H%M%S}.json")
+    os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nWrote {output}")
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            if compare(results, json.load(f)):
+                return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -6,9 +6,248 @@ Handles fetching comments from various platforms using URLs
 import re
 import requests
 import json
+import os
+import threading
+import time
 import instaloader
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from requests.adapters import HTTPAdapter
 from urllib.parse import urlparse
-from youtube_comment_downloader import YoutubeCommentDownloader
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.util.retry import Retry
+from session_store import create_session_store
+from youtube_comment_downloader import YoutubeCommentDownloader, SORT_BY_POPULAR, SORT_BY_RECENT
+
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+
+# (connect, read) timeouts in seconds for every HTTP request
+HTTP_TIMEOUT = (5, 20)
+
+# Retries with exponential backoff (0.5s, 1s, 2s, ...) on these statuses and on connection errors
+HTTP_RETRIES = 3
+HTTP_BACKOFF = 0.5
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# Keep-alive connections kept per host
+HTTP_POOL_SIZE = 10
+
+# Reddit comment tree limits (depth 0 = top-level comments; None = unlimited)
+REDDIT_MAX_DEPTH = 10
+REDDIT_MAX_COMMENTS = 2000
+
+# Comments requested with the first page of a thread
+REDDIT_PAGE_LIMIT = 500
+
+# "more" ids expanded per morechildren request, and requests in flight
+REDDIT_MORE_BATCH = 100
+REDDIT_MORE_CONCURRENCY = 4
+
+# Comments per page when a thread is streamed (open_comments)
+REDDIT_PAGE_SIZE = 100
+
+# max_count of fetch_comments/open_comments selecting the platform's default
+# cap (REDDIT_MAX_COMMENTS, YOUTUBE_MAX_COMMENTS); max_count=None means no cap
+PLATFORM_DEFAULT = object()
+
+
+# Default YouTube comment cap per video and comments per yielded page
+YOUTUBE_MAX_COMMENTS = 200
+YOUTUBE_PAGE_SIZE = 100
+YOUTUBE_SORTS = {'recent': SORT_BY_RECENT, 'popular': SORT_BY_POPULAR}
+
+# Newest top-level comment IDs a resume cursor keeps per video
+# (several, in case the newest is deleted before the next fetch)
+YOUTUBE_CURSOR_DEPTH = 20
+
+
+# Seconds a cached fetch result is served without asking the platform again
+FETCH_CACHE_TTL = {'reddit': 300, 'youtube': 900, 'instagram': 3600}
+
+# Cached results are kept this long past their TTL for conditional revalidation,
+# within a total size bound; FETCH_CACHE=sqlite:///fetch_cache.db keeps them on disk
+FETCH_CACHE_RETENTION = 7 * 24 * 60 * 60
+FETCH_CACHE_MAX_BYTES = 128 * 1024 * 1024
+
+# Error returned by a conditional fetch whose content has not changed
+NOT_MODIFIED = 'Not modified'
+
+
+class FetchError(Exception):
+    """A source could not be fetched; the message is shown to the user"""
+
+
+class RedditFetchError(FetchError):
+    """A Reddit thread could not be fetched"""
+
+
+class NotModified(Exception):
+    """A conditional request was answered with 304"""
+
+
+class FetchMetrics:
+    """Thread-safe totals of HTTP connect, response and transfer time"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.connections = 0
+            self.connect_seconds = 0.0
+            self.requests = 0
+            self.errors = 0
+            self.retries = 0
+            self.retry_seconds = 0.0
+            self.response_seconds = 0.0
+            self.transfer_seconds = 0.0
+            self.bytes = 0
+
+    def record_connect(self, seconds):
+        with self._lock:
+            self.connections += 1
+            self.connect_seconds += seconds
+
+    def record_request(self, response_seconds, transfer_seconds, size, retries=0, retry_seconds=0.0):
+        with self._lock:
+            self.requests += 1
+            self.retries += retries
+            self.retry_seconds += retry_seconds
+            self.response_seconds += response_seconds
+            self.transfer_seconds += transfer_seconds
+            self.bytes += size
+
+    def record_error(self):
+        with self._lock:
+            self.errors += 1
+
+    def stats(self):
+        """
+        connect_seconds covers TCP and TLS setup of new connections;
+        response_seconds runs from the final attempt of a request until its
+        response headers arrive (including connect), transfer_seconds from
+        there until the body is read; retry_seconds is the time spent on
+        earlier, failed attempts and the backoff between them
+        """
+        with self._lock:
+            return {
+                'requests': self.requests,
+                'errors': self.errors,
+                'retries': self.retries,
+                'retry_seconds': round(self.retry_seconds, 4),
+                'connections': self.connections,
+                'connection_reuse': round(1 - self.connections / self.requests, 4) if self.requests else 0.0,
+                'connect_seconds': round(self.connect_seconds, 4),
+                'response_seconds': round(self.response_seconds, 4),
+                'transfer_seconds': round(self.transfer_seconds, 4),
+                'bytes': self.bytes
+            }
+
+
+fetch_metrics = FetchMetrics()
+
+
+class _TimedHTTPConnection(HTTPConnection):
+    def connect(self):
+        start = time.perf_counter()
+        super().connect()
+        fetch_metrics.record_connect(time.perf_counter() - start)
+
+
+class _TimedHTTPSConnection(HTTPSConnection):
+    def connect(self):
+        start = time.perf_counter()
+        super().connect()
+        fetch_metrics.record_connect(time.perf_counter() - start)
+
+
+class _TimedPool:
+    """Connection pool mixin timing each attempt of a request until its headers arrive"""
+
+    def _make_request(self, *args, **kwargs):
+        start = time.perf_counter()
+        response = super()._make_request(*args, **kwargs)
+        response.attempt_seconds = time.perf_counter() - start
+        return response
+
+
+class _TimedHTTPConnectionPool(_TimedPool, HTTPConnectionPool):
+    ConnectionCls = _TimedHTTPConnection
+
+
+class _TimedHTTPSConnectionPool(_TimedPool, HTTPSConnectionPool):
+    ConnectionCls = _TimedHTTPSConnection
+
+
+class _TimedAdapter(HTTPAdapter):
+    """
+    HTTPAdapter whose pools time every new connection, and which applies
+    HTTP_TIMEOUT to requests sent without a timeout of their own
+    """
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': _TimedHTTPConnectionPool,
+            'https': _TimedHTTPSConnectionPool
+        }
+
+    def send(self, request, timeout=None, **kwargs):
+        return super().send(request, timeout=HTTP_TIMEOUT if timeout is None else timeout, **kwargs)
+
+
+def _create_adapter(retry_methods=('GET',)):
+    """Pooled adapter with retries (of retry_methods), default timeouts and connection timing"""
+    retry = Retry(
+        total=HTTP_RETRIES,
+        backoff_factor=HTTP_BACKOFF,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=retry_methods,
+        respect_retry_after_header=True,
+        raise_on_status=False
+    )
+    return _TimedAdapter(pool_connections=HTTP_POOL_SIZE, pool_maxsize=HTTP_POOL_SIZE, max_retries=retry)
+
+
+def create_http_session():
+    """requests Session with keep-alive pooling, retries and gzip"""
+    adapter = _create_adapter()
+    session = requests.Session()
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    session.headers.update({'User-Agent': USER_AGENT, 'Accept-Encoding': 'gzip, deflate'})
+    return session
+
+
+# Shared by every fetch in this process so connections are reused
+http_session = create_http_session()
+
+
+def http_get(url, **kwargs):
+    """
+    GET through the pooled session with the default timeouts, recording metrics
+    The response time is the final attempt's alone; failed attempts and
+    retry backoff are recorded as retry time, and the body is timed apart.
+    """
+    kwargs.setdefault('timeout', HTTP_TIMEOUT)
+    start = time.perf_counter()
+    try:
+        response = http_session.get(url, stream=True, **kwargs)
+        headers_at = time.perf_counter()
+        body = response.content
+    except requests.RequestException:
+        fetch_metrics.record_error()
+        raise
+    end = time.perf_counter()
+    waited = headers_at - start
+    response_seconds = min(getattr(response.raw, 'attempt_seconds', waited), waited)
+    retries = len(response.raw.retries.history) if getattr(response.raw, 'retries', None) else 0
+    fetch_metrics.record_request(response_seconds, end - headers_at, len(body),
+                                 retries=retries, retry_seconds=waited - response_seconds if retries else 0.0)
+    return response
 
 
 def get_platform(url):
@@ -23,6 +262,12 @@ def get_platform(url):
     return 'unknown'
 
 
+def _instagram_shortcode(url):
+    """Shortcode of an Instagram post or reel URL, or None"""
+    match = re.search(r'instagram\.com/(?:p|reel)/([^/?#&]+)', url)
+    return match.group(1) if match else None
+
+
 def fetch_instagram_comments(url):
     """
     Fetch comments from Instagram post using Instaloader.
@@ -31,10 +276,7 @@ def fetch_instagram_comments(url):
     L = instaloader.Instaloader()
     
     # Try to extract shortcode
-    shortcode = None
-    match = re.search(r'instagram\.com/(?:p|reel)/([^/?#&]+)', url)
-    if match:
-        shortcode = match.group(1)
+    shortcode = _instagram_shortcode(url)
     
     if not shortcode:
         return None, "Could not identify Instagram post shortcode"
@@ -78,86 +320,283 @@ def fetch_instagram_comments(url):
         return None, f"Instagram Error: {error_msg}"
 
 
-def fetch_reddit_comments(url):
+def _reddit_json_url(url):
+    """The .json endpoint of a Reddit post URL"""
+    clean_url = url.split('?')[0]
+    if clean_url.endswith('.json'):
+        return clean_url
+    if clean_url.endswith('/'):
+        return clean_url + '.json'
+    return clean_url + '/.json'
+
+
+def _walk_reddit_listing(children, depth, max_depth, stubs):
     """
-    Fetch comments from Reddit post using JSON endpoint (No API key needed)
+    Comment bodies of a listing and its nested replies, depth first
+    "more" stubs are appended to stubs as (depth, ids) instead of expanded
     """
-    # Ensure URL ends with .json
-    clean_url = url.split('?')[0]
-    if not clean_url.endswith('.json'):
-        if clean_url.endswith('/'):
-            json_url = clean_url + '.json'
-        else:
-            json_url = clean_url + '/.json'
-    else:
-        json_url = clean_url
+    stack = [(child, depth) for child in reversed(children)]
+    while stack:
+        child, depth = stack.pop()
+        if max_depth is not None and depth > max_depth:
+            continue
+        data = child.get('data') or {}
+
+        if child.get('kind') == 'more':
+            # "Continue this thread" stubs have no ids; they need a separate page
+            ids = [comment_id for comment_id in data.get('children', []) if comment_id != '_']
+            if ids:
+                stubs.append((depth, ids))
+            continue
+        if child.get('kind') != 't1':  # t1 is comment
+            continue
+
+        body = data.get('body')
+        if body and body != '[deleted]' and body != '[removed]':
+            yield body
+
+        replies = data.get('replies')
+        if replies:
+            stack.extend((reply, depth + 1) for reply in reversed(replies['data']['children']))
 
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-    }
 
+def _fetch_more_children(more_url, link_id, ids):
+    """Things for a batch of "more" ids; [] if the batch cannot be fetched"""
     try:
-        response = requests.get(json_url, headers=headers)
+        response = http_get(more_url, params={
+            'api_type': 'json',
+            'link_id': link_id,
+            'children': ','.join(ids),
+            'limit_children': 'false'
+        })
         if response.status_code != 200:
-            return None, f"Failed to fetch Reddit data: Status {response.status_code}"
+            return []
+        return response.json()['json']['data']['things']
+    except Exception:
+        return []
 
-        data = response.json()
-        
-        # Reddit JSON structure: [post_listing, comment_listing]
-        post_data = data[0]['data']['children'][0]['data']
-        title = post_data.get('title', 'Reddit Post')
-        
-        comments_data = data[1]['data']['children']
-        comments = []
-        
-        for child in comments_data:
-            if child['kind'] == 't1':  # t1 is comment
-                body = child['data'].get('body')
-                if body and body != '[deleted]' and body != '[removed]':
-                    comments.append(body)
-                    
+
+def _iter_reddit_tree(children, more_url, link_id, max_depth, max_count):
+    """Every comment body in a thread, expanding "more" stubs as it goes"""
+    stubs = deque()
+    count = 0
+
+    for body in _walk_reddit_listing(children, 0, max_depth, stubs):
+        yield body
+        count += 1
+        if max_count is not None and count >= max_count:
+            return
+
+    # Expand stubs in batches, a bounded number in flight; results are
+    # consumed in submission order so the output is deterministic
+    executor = ThreadPoolExecutor(max_workers=REDDIT_MORE_CONCURRENCY)
+    in_flight = deque()
+    try:
+        while stubs or in_flight:
+            while stubs and len(in_flight) < REDDIT_MORE_CONCURRENCY:
+                depth = stubs[0][0]
+                batch = []
+                while stubs and len(batch) < REDDIT_MORE_BATCH:
+                    stub_depth, ids = stubs.popleft()
+                    room = REDDIT_MORE_BATCH - len(batch)
+                    batch.extend(ids[:room])
+                    if ids[room:]:
+                        stubs.appendleft((stub_depth, ids[room:]))
+                in_flight.append((executor.submit(_fetch_more_children, more_url, link_id, batch), depth))
+
+            future, depth = in_flight.popleft()
+            for thing in future.result():
+                thing_depth = (thing.get('data') or {}).get('depth', depth)
+                for body in _walk_reddit_listing([thing], thing_depth, max_depth, stubs):
+                    yield body
+                    count += 1
+                    if max_count is not None and count >= max_count:
+                        return
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def open_reddit_thread(url, max_depth=REDDIT_MAX_DEPTH, max_count=REDDIT_MAX_COMMENTS, validators=None):
+    """
+    Title of a Reddit post and a generator over its comment bodies
+
+    The first page is fetched here; the generator yields its comments, nested
+    replies included, and then expands "more" stubs through the morechildren
+    endpoint, so callers can start scoring before the thread is complete.
+    Comments deeper than max_depth (0 = top level) or beyond max_count are
+    skipped; None disables either limit.
+
+    validators, if given, is a dict with the 'etag' and 'last_modified' of an
+    earlier fetch; the request is made conditional on them (raising
+    NotModified on 304) and the dict is updated from the new response.
+    """
+    json_url = _reddit_json_url(url)
+    headers = {}
+    if validators:
+        if validators.get('etag'):
+            headers['If-None-Match'] = validators['etag']
+        if validators.get('last_modified'):
+            headers['If-Modified-Since'] = validators['last_modified']
+    response = http_get(json_url, params={'limit': REDDIT_PAGE_LIMIT}, headers=headers)
+    if response.status_code == 304:
+        raise NotModified(url)
+    if response.status_code != 200:
+        raise RedditFetchError(f"Failed to fetch Reddit data: Status {response.status_code}")
+
+    data = response.json()
+    if validators is not None:
+        validators['etag'] = response.headers.get('ETag')
+        validators['last_modified'] = response.headers.get('Last-Modified')
+
+    # Reddit JSON structure: [post_listing, comment_listing]
+    post_data = data[0]['data']['children'][0]['data']
+    title = post_data.get('title', 'Reddit Post')
+
+    parsed = urlparse(json_url)
+    more_url = f"{parsed.scheme}://{parsed.netloc}/api/morechildren.json"
+    link_id = post_data.get('name') or f"t3_{post_data.get('id')}"
+
+    comments = _iter_reddit_tree(data[1]['data']['children'], more_url, link_id, max_depth, max_count)
+    return title, comments
+
+
+def fetch_reddit_comments(url, max_depth=REDDIT_MAX_DEPTH, max_count=REDDIT_MAX_COMMENTS, validators=None):
+    """
+    Fetch comments from Reddit post using JSON endpoint (No API key needed)
+    Walks the whole comment tree; see open_reddit_thread for the limits and
+    validators. A 304 is returned as the error NOT_MODIFIED.
+    """
+    try:
+        title, comments = open_reddit_thread(url, max_depth, max_count, validators)
         return {
             'title': title,
-            'comments': comments
+            'comments': list(comments)
         }, None
 
+    except NotModified:
+        return None, NOT_MODIFIED
     except Exception as e:
         return None, str(e)
 
 
-def fetch_youtube_comments(url):
+def _youtube_video_id(url):
+    """
+    Video ID of a YouTube URL, or None
+    Supports: youtube.com/watch?v=ID, youtu.be/ID, youtube.com/shorts/ID
+    """
+    video_id = None
+    if 'youtu.be' in url:
+        video_id = url.split('/')[-1].split('?')[0]
+    elif 'youtube.com/shorts' in url:
+        video_id = url.split('shorts/')[-1].split('?')[0]
+    elif 'v=' in url:
+        video_id = url.split('v=')[-1].split('&')[0]
+    return video_id or None
+
+
+class _YoutubeDownloader(YoutubeCommentDownloader):
+    """
+    YoutubeCommentDownloader that leaves retries to its session's adapter
+    The library's own continuation requests try up to 5 times, 20s apart,
+    and end the comments early on a timeout; here they are sent once with
+    HTTP_TIMEOUT, and a request that still fails after the adapter's
+    retries fails the fetch.
+    """
+
+    # Where continuation requests are sent
+    origin = 'https://www.youtube.com'
+
+    def __init__(self):
+        super().__init__()
+        # Its POSTs only read comments, so they are retried like GETs
+        adapter = _create_adapter(retry_methods=('GET', 'POST'))
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def ajax_request(self, endpoint, ytcfg, retries=None, sleep=None, timeout=HTTP_TIMEOUT):
+        url = self.origin + endpoint['commandMetadata']['webCommandMetadata']['apiUrl']
+        data = {'context': ytcfg['INNERTUBE_CONTEXT'], 'continuation': endpoint['continuationCommand']['token']}
+        response = self.session.post(url, params={'key': ytcfg['INNERTUBE_API_KEY']}, json=data, timeout=timeout)
+        if response.status_code in (403, 413):
+            # What the library does too: no more comments available
+            return {}
+        if response.status_code != 200:
+            raise FetchError(f"YouTube returned HTTP {response.status_code}")
+        return response.json()
+
+
+_youtube_local = threading.local()
+
+
+def _youtube_downloader():
+    """This thread's YouTube downloader, created once and kept with its HTTP session"""
+    downloader = getattr(_youtube_local, 'downloader', None)
+    if downloader is None:
+        downloader = _youtube_local.downloader = _YoutubeDownloader()
+    return downloader
+
+
+def iter_youtube_comment_pages(video_id, max_count=YOUTUBE_MAX_COMMENTS, sort='recent',
+                               page_size=YOUTUBE_PAGE_SIZE, cursor=None):
+    """
+    Comment texts of a YouTube video, yielded as lists of up to page_size
+
+    max_count caps the comments fetched (None = all). cursor, if given, is
+    a dict that resumes fetches sorted by recent: the fetch stops at its
+    'cids' (the newest top-level comment IDs of an earlier fetch), so only
+    comments posted since then are returned. Once the fetch has been
+    consumed to the end or the cap, 'cids' is replaced by its newest IDs
+    and 'caught_up' tells whether it stopped at one of the old ones.
+    """
+    sort_by = YOUTUBE_SORTS[sort]
+    recent = sort_by == SORT_BY_RECENT
+    seen = set(cursor.get('cids') or []) if cursor is not None and recent else set()
+    caught_up = False
+    newest = []
+    page = []
+    count = 0
+
+    for comment in _youtube_downloader().get_comments(video_id, sort_by=sort_by):
+        if not comment.get('reply'):
+            if comment.get('cid') in seen:
+                caught_up = True
+                break
+            if len(newest) < YOUTUBE_CURSOR_DEPTH:
+                newest.append(comment.get('cid'))
+
+        text = comment.get('text')
+        if not text:
+            continue
+        page.append(text)
+        count += 1
+        if len(page) >= page_size:
+            yield page
+            page = []
+        if max_count is not None and count >= max_count:
+            break
+
+    if page:
+        yield page
+    if cursor is not None and recent:
+        if newest:
+            cursor['cids'] = newest
+        cursor['caught_up'] = caught_up
+
+
+def fetch_youtube_comments(url, max_count=YOUTUBE_MAX_COMMENTS, sort='recent'):
     """
     Fetch comments from YouTube video using youtube-comment-downloader
+    See iter_youtube_comment_pages for the limits and sort order
     """
-    downloader = YoutubeCommentDownloader()
-    comments = []
-    
     try:
-        # Extract video ID
-        # Supports: youtube.com/watch?v=ID, youtu.be/ID, youtube.com/shorts/ID
-        video_id = None
-        if 'youtu.be' in url:
-            video_id = url.split('/')[-1].split('?')[0]
-        elif 'youtube.com/shorts' in url:
-            video_id = url.split('shorts/')[-1].split('?')[0]
-        elif 'v=' in url:
-            video_id = url.split('v=')[-1].split('&')[0]
-            
+        video_id = _youtube_video_id(url)
         if not video_id:
             return None, "Could not identify YouTube video ID"
 
-        # Fetch comments (limit to recent 200 to be fast)
-        count = 0
-        generator = downloader.get_comments(video_id)
-        
-        for comment in generator:
-            text = comment.get('text')
-            if text:
-                comments.append(text)
-                count += 1
-                if count >= 200:  # Limit for performance
-                    break
-        
+        comments = []
+        for page in iter_youtube_comment_pages(video_id, max_count, sort):
+            comments.extend(page)
+
         return {
             'title': f"YouTube Video ({video_id})",
             'comments': comments
@@ -167,17 +606,262 @@ def fetch_youtube_comments(url):
         return None, str(e)
 
 
-def fetch_comments(url):
+def canonical_url(url):
     """
-    Main entry point to fetch comments from URL
+    Cache key naming the content behind a URL (platform and post or video
+    ID), so tracking parameters and URL variants share one entry; None if
+    the URL is not recognised
     """
     platform = get_platform(url)
+    content_id = None
+    if platform == 'reddit':
+        match = re.search(r'/comments/([A-Za-z0-9]+)', url)
+        content_id = match.group(1).lower() if match else None
+    elif platform == 'youtube':
+        content_id = _youtube_video_id(url)
+    elif platform == 'instagram':
+        content_id = _instagram_shortcode(url)
+    return f"{platform}:{content_id}" if content_id else None
+
+
+def comment_cap(platform, max_count=PLATFORM_DEFAULT):
+    """The comment cap max_count stands for on a platform (None = no cap)"""
+    if max_count is PLATFORM_DEFAULT:
+        return {'reddit': REDDIT_MAX_COMMENTS, 'youtube': YOUTUBE_MAX_COMMENTS}.get(platform)
+    return max_count
+
+
+def source_key(url, max_count=PLATFORM_DEFAULT, sort='recent'):
+    """
+    canonical_url qualified by the comment cap and sort order where they
+    differ from the platform's defaults, so comments fetched with other
+    options are stored apart; None if the URL is not recognised
+    """
+    key = canonical_url(url)
+    if key is None:
+        return None
+    platform = key.split(':', 1)[0]
+    options = []
+    cap = comment_cap(platform, max_count)
+    if platform in ('reddit', 'youtube') and cap != comment_cap(platform):
+        options.append(f"max={'all' if cap is None else cap}")
+    if platform == 'youtube' and sort != 'recent':
+        options.append(f"sort={sort}")
+    return f"{key}?{'&'.join(options)}" if options else key
+
+
+class FetchCache:
+    """
+    fetch_comments results keyed by canonical_url, fresh for a per-platform
+    TTL; stale Reddit entries are revalidated with their ETag/Last-Modified
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+
+    def _count(self, outcome):
+        with self._lock:
+            setattr(self, outcome, getattr(self, outcome) + 1)
+
+    def fetch(self, url, fetcher, key=None):
+        """
+        Cached result for url, or fetcher(url, validators) stored on success
+        fetcher returns (result, error) like fetch_comments and may return
+        NOT_MODIFIED when validators show the cached copy is still current
+        key defaults to canonical_url(url)
+        """
+        key = key or canonical_url(url)
+        if key is None:
+            return fetcher(url, None)
+
+        platform = key.split(':', 1)[0]
+        entry = self.store.get(key)
+        now = time.time()
+        if entry is not None and now - entry['fetched'] < FETCH_CACHE_TTL.get(platform, 0):
+            self._count('hits')
+            return entry['result'], None
+
+        validators = dict(entry['validators']) if entry is not None else {}
+        result, error = fetcher(url, validators)
+        if error == NOT_MODIFIED and entry is not None:
+            self._count('revalidated')
+            self.store.put(key, dict(entry, fetched=now))
+            return entry['result'], None
+
+        self._count('misses')
+        if not error:
+            self.store.put(key, {'result': result, 'fetched': now, 'validators': validators})
+        return result, error
+
+    def open(self, url, opener, key=None, refresh=False):
+        """
+        Like fetch, for an opener(url, validators) returning (title, pages)
+        with pages an iterator over lists of comments as they download
+        Returns (title, pages); a cached copy comes as a single page, and
+        a new download is stored once its pages have all been read.
+        refresh downloads again, without validators, even if a cached copy
+        is fresh.
+        """
+        key = key or canonical_url(url)
+        if key is None:
+            return opener(url, None)
+
+        platform = key.split(':', 1)[0]
+        entry = self.store.get(key) if not refresh else None
+        now = time.time()
+        if entry is not None and now - entry['fetched'] < FETCH_CACHE_TTL.get(platform, 0):
+            self._count('hits')
+            return entry['result']['title'], iter([entry['result']['comments']])
+
+        validators = dict(entry['validators']) if entry is not None else {}
+        try:
+            title, pages = opener(url, validators)
+        except NotModified:
+            if entry is None:
+                raise
+            self._count('revalidated')
+            self.store.put(key, dict(entry, fetched=now))
+            return entry['result']['title'], iter([entry['result']['comments']])
+        self._count('misses')
+
+        def store_when_read():
+            comments = []
+            for page in pages:
+                comments.extend(page)
+                yield page
+            result = {'title': title, 'comments': comments}
+            self.store.put(key, {'result': result, 'fetched': now, 'validators': validators})
+
+        return title, store_when_read()
+
+    def comments(self, key):
+        """(title, comments) last stored under key, fresh or not; None if there are none"""
+        entry = self.store.get(key)
+        if entry is None:
+            return None
+        return entry['result']['title'], entry['result']['comments']
+
+    def put(self, key, title, comments):
+        """Store comments just fetched for key by other means (no validators)"""
+        self.store.put(key, {'result': {'title': title, 'comments': comments}, 'fetched': time.time(),
+                             'validators': {}})
+
+    def stats(self):
+        store_stats = self.store.stats()
+        with self._lock:
+            served = self.hits + self.revalidated
+            total = served + self.misses
+            return {
+                'hits': self.hits,
+                'revalidated': self.revalidated,
+                'misses': self.misses,
+                'hit_ratio': round(served / total, 4) if total else 0.0,
+                'entries': store_stats['sessions'],
+                'bytes': store_stats['bytes']
+            }
+
+
+fetch_cache = FetchCache(create_session_store(
+    os.environ.get('FETCH_CACHE'), ttl=FETCH_CACHE_RETENTION, max_bytes=FETCH_CACHE_MAX_BYTES
+))
+
+
+def _fetch_uncached(url, validators=None, max_count=PLATFORM_DEFAULT, sort='recent'):
+    platform = get_platform(url)
     
     if platform == 'reddit':
-        return fetch_reddit_comments(url)
+        return fetch_reddit_comments(url, max_count=comment_cap(platform, max_count), validators=validators)
     elif platform == 'youtube':
-        return fetch_youtube_comments(url)
+        return fetch_youtube_comments(url, max_count=comment_cap(platform, max_count), sort=sort)
     elif platform == 'instagram':
         return fetch_instagram_comments(url)
     else:
         return None, "Unsupported platform. Currently supporting Reddit, YouTube, and Instagram."
+
+
+def fetch_comments(url, use_cache=True, max_count=PLATFORM_DEFAULT, sort='recent'):
+    """
+    Main entry point to fetch comments from URL
+    Results are served from fetch_cache unless use_cache is False
+
+    max_count caps the Reddit and YouTube comments fetched (PLATFORM_DEFAULT
+    = the platform's default cap, None = all of them); sort ('recent' or
+    'popular') orders YouTube's.
+    """
+    fetcher = partial(_fetch_uncached, max_count=max_count, sort=sort)
+    if not use_cache:
+        return fetcher(url)
+    return fetch_cache.fetch(url, fetcher, source_key(url, max_count, sort))
+
+
+def _pages(items, size):
+    """Lists of up to size items from an iterable"""
+    page = []
+    for item in items:
+        page.append(item)
+        if len(page) >= size:
+            yield page
+            page = []
+    if page:
+        yield page
+
+
+def _open_uncached(url, validators=None, max_count=PLATFORM_DEFAULT, sort='recent', cursor=None):
+    platform = get_platform(url)
+
+    if platform == 'reddit':
+        title, comments = open_reddit_thread(url, max_count=comment_cap(platform, max_count), validators=validators)
+        return title, _pages(comments, REDDIT_PAGE_SIZE)
+    elif platform == 'youtube':
+        video_id = _youtube_video_id(url)
+        if not video_id:
+            raise FetchError("Could not identify YouTube video ID")
+        pages = iter_youtube_comment_pages(
+            video_id, comment_cap(platform, max_count), sort, cursor=cursor
+        )
+        return f"YouTube Video ({video_id})", pages
+    elif platform == 'instagram':
+        result, error = fetch_instagram_comments(url)
+        if error:
+            raise FetchError(error)
+        return result['title'], iter([result['comments']])
+    else:
+        raise FetchError("Unsupported platform. Currently supporting Reddit, YouTube, and Instagram.")
+
+
+def open_comments(url, use_cache=True, max_count=PLATFORM_DEFAULT, sort='recent', cursor=None, refresh=False):
+    """
+    Streaming counterpart of fetch_comments: (title, pages) as soon as the
+    download has started, where pages yields lists of comments as they
+    arrive (Reddit threads and YouTube videos page by page), so callers can
+    start on the first comments while the rest download
+    Errors are raised, as FetchError or from the download itself, instead
+    of returned. Results are served from and stored in fetch_cache unless
+    use_cache is False; refresh downloads again but still stores the
+    result. max_count and sort are as for fetch_comments.
+
+    cursor is passed on to iter_youtube_comment_pages for YouTube URLs. If
+    it holds the 'cids' of an earlier fetch, only the comments posted since
+    then are fetched, bypassing the cache.
+    """
+    opener = partial(_open_uncached, max_count=max_count, sort=sort, cursor=cursor)
+    if not use_cache or (cursor and cursor.get('cids')):
+        return opener(url)
+    return fetch_cache.open(url, opener, source_key(url, max_count, sort), refresh)
+
+
+def cached_comments(key):
+    """(title, comments) the fetch cache last stored for a source_key, fresh or not; None if none"""
+    return fetch_cache.comments(key)
+
+
+def cache_comments(key, title, comments):
+    """
+    Store the comments of a source_key fetched by other means, such as a
+    resumed YouTube fetch merged with earlier comments, in the fetch cache
+    """
+    fetch_cache.put(key, title, comments)
@@ -3,138 +3,617 @@ Creator Analytics Module
 Handles multi-source data aggregation and advanced business scoring logic.
 """
 
-from sentiment_engine import SentimentAnalyzer
-from comment_fetcher import fetch_comments
+from sentiment_engine import ColumnarResults, SentimentAggregate, SentimentAnalyzer
+from comment_fetcher import (FETCH_CACHE_TTL, PLATFORM_DEFAULT, cache_comments, cached_comments, comment_cap,
+                             get_platform, open_comments, source_key)
+from session_store import create_session_store
+from text_processor import iter_lines
+import copy
+import hashlib
+import os
+import threading
+import time
 import uuid
+from contextlib import contextmanager, nullcontext
+from concurrent.futures import Future, ThreadPoolExecutor, FIRST_COMPLETED, wait
 from datetime import datetime
 
-class CreatorAnalyzer:
+# Threads fetching URLs, shared by every analysis a CreatorAnalyzer runs, so
+# each keeps its YouTube downloader and HTTP session from one to the next
+FETCH_WORKERS = 16
+
+# Simultaneous fetches per platform (shared by all requests) to stay under rate limits
+PLATFORM_CONCURRENCY = {'reddit': 2, 'youtube': 4, 'instagram': 1, 'unknown': 4}
+
+# Seconds one URL may take once its fetch starts
+URL_TIMEOUT = 60
+
+# Seconds all URLs of one analyze_creator call may take to download together;
+# time a download spends waiting on scoring does not count
+FETCH_DEADLINE = 180
+
+# Threads handing fetched comments to the analyzer, one chunk at a time
+SCORE_WORKERS = 2
+
+# Comments per scoring task, so a large source is scored in parts while it
+# and other sources are still downloading. When the analyzer has a process
+# pool, chunks are at least its parallel_threshold so each one is spread
+# over the pool instead of scored in the scoring thread
+SCORE_CHUNK_SIZE = 1000
+
+# Seconds between URL timeout and deadline checks while downloads wait on scoring
+PIPELINE_POLL = 1.0
+
+# Scoring tasks queued or running before fetch threads wait for them (backpressure)
+PIPELINE_DEPTH = 8
+
+# Platforms in a creator's platform_breakdown; sources on any other platform count as 'other'
+PLATFORMS = ('youtube', 'reddit', 'other')
+
+# Scored sources are kept this long after their last use, within a total size
+# bound; SOURCE_STORE=sqlite:///sources.db keeps them across restarts
+SOURCE_RETENTION = 30 * 24 * 60 * 60
+SOURCE_STORE_MAX_BYTES = 256 * 1024 * 1024
+
+
+class ContentHash:
+    """content_hash computed incrementally, as comments arrive"""
+
     def __init__(self):
-        self.analyzer = SentimentAnalyzer()
+        self._digest = hashlib.blake2b(digest_size=16)
+
+    def update(self, comments):
+        for comment in comments:
+            encoded = comment.encode('utf-8', 'surrogatepass')
+            self._digest.update(len(encoded).to_bytes(4, 'little'))
+            self._digest.update(encoded)
+
+    def pages(self, pages):
+        """Pass pages (lists of comments) through, hashing them on the way"""
+        for page in pages:
+            self.update(page)
+            yield page
+
+    def hexdigest(self):
+        return self._digest.hexdigest()
+
+
+def _resolved(result):
+    """A Future already holding result"""
+    future = Future()
+    future.set_result(result)
+    return future
+
+
+def _until_abandoned(pages, i, abandoned):
+    """pages of download i, ending it at the next page once i is in abandoned"""
+    for page in pages:
+        if i in abandoned:
+            raise TimeoutError('download abandoned')
+        yield page
+
+
+def content_hash(comments):
+    """Hash of a source's comments, in order"""
+    digest = ContentHash()
+    digest.update(comments)
+    return digest.hexdigest()
+
+
+class SourceResults:
+    """
+    Scored results of creator sources, so a repeat analysis only fetches and
+    scores sources that are new or changed
+    Keyed by source_key, or 'manual:<content hash>' for pasted text; each
+    record holds the comments' content hash, the title, the labels and
+    scores of their ColumnarResults, the SentimentAggregate, and for
+    YouTube the cursor (newest comment IDs) a later fetch resumes from.
+    The comment texts are not kept here: they come from the pasted text,
+    a new download, or the fetch cache (see comments).
+    """
+
+    def __init__(self, store):
+        self.store = store
+
+    def get(self, key):
+        return self.store.get(key)
+
+    def put(self, key, source, analysis):
+        self.store.put(key, {
+            'content_hash': source['content_hash'],
+            'title': source['title'],
+            'checked': time.time(),
+            'results': analysis.to_dict(texts=False),
+            'aggregate': source['aggregate'].to_dict(),
+            'cursor': source.get('cursor')
+        })
 
-    def analyze_creator(self, name, urls, manual_data=None):
+    def touch(self, key, record):
+        """Mark record as just checked against its source"""
+        self.store.put(key, dict(record, checked=time.time()))
+
+    @staticmethod
+    def is_fresh(key, record):
+        """Whether record was checked within its platform's fetch cache TTL"""
+        return time.time() - record['checked'] < FETCH_CACHE_TTL.get(key.split(':', 1)[0], 0)
+
+    @staticmethod
+    def comments(key, record):
+        """
+        The comments record was scored from, read back from the fetch cache;
+        None once the cache no longer holds that version of them
+        """
+        cached = cached_comments(key)
+        if cached is None or content_hash(cached[1]) != record['content_hash']:
+            return None
+        return cached[1]
+
+    @staticmethod
+    def results(record, comments):
+        """The stored ColumnarResults, with comments (an iterable, in order) as its texts"""
+        return ColumnarResults.from_dict(record['results'], comments)
+
+    def reuse(self, key, record, comments):
+        """(source, scoring futures) serving a stored record for its comments"""
+        source = {
+            'key': key,
+            'title': record['title'],
+            'content_hash': record['content_hash'],
+            'aggregate': SentimentAggregate.from_dict(record['aggregate'])
+        }
+        return source, [_resolved(self.results(record, comments))]
+
+
+source_results = SourceResults(create_session_store(
+    os.environ.get('SOURCE_STORE'), ttl=SOURCE_RETENTION, max_bytes=SOURCE_STORE_MAX_BYTES
+))
+
+
+class CreatorAggregate:
+    """
+    SentimentAggregates of a creator's sources: overall, per platform and
+    per source (in each source's sentiment_summary)
+    """
+
+    def __init__(self):
+        self.overall = SentimentAggregate()
+        self.platforms = {platform: SentimentAggregate() for platform in PLATFORMS}
+        self.sources = []
+
+    def add(self, source, aggregate):
+        """Add one source's summary dict and its aggregate"""
+        self.overall.merge(aggregate)
+        self.platforms.get(source['platform'], self.platforms['other']).merge(aggregate)
+        self.sources.append(source)
+
+    def merge(self, other):
+        """Add every source of other; returns self"""
+        self.overall.merge(other.overall)
+        for platform, aggregate in other.platforms.items():
+            self.platforms[platform].merge(aggregate)
+        self.sources.extend(other.sources)
+        return self
+
+    def to_dict(self):
+        return {
+            'counts': self.overall.to_dict(),
+            'platform_breakdown': {platform: aggregate.to_dict() for platform, aggregate in self.platforms.items()},
+            'sources': copy.deepcopy(self.sources)
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """Rebuild from to_dict output (or a stored creator report's stats)"""
+        aggregate = cls()
+        for source in data['sources']:
+            aggregate.add(source, SentimentAggregate.from_dict(source['sentiment_summary']))
+        return aggregate
+
+
+class CreatorAnalyzer:
+    def __init__(self, analyzer=None, url_timeout=URL_TIMEOUT, fetch_deadline=FETCH_DEADLINE, sources=None):
+        # Reuse the caller's analyzer (and its model and scoring pool) when given
+        self.analyzer = analyzer if analyzer is not None else SentimentAnalyzer()
+        self.sources = source_results if sources is None else sources
+        self.url_timeout = url_timeout
+        self.fetch_deadline = fetch_deadline
+        self._platform_slots = {
+            platform: threading.BoundedSemaphore(limit)
+            for platform, limit in PLATFORM_CONCURRENCY.items()
+        }
+        self._fetcher = None
+        self._fetcher_lock = threading.Lock()
+
+    def _get_fetcher(self):
+        with self._fetcher_lock:
+            if self._fetcher is None:
+                self._fetcher = ThreadPoolExecutor(max_workers=FETCH_WORKERS, thread_name_prefix='fetch')
+            return self._fetcher
+
+    def close(self):
+        """Shut down the fetch threads, if they were started"""
+        with self._fetcher_lock:
+            if self._fetcher is not None:
+                self._fetcher.shutdown(wait=False, cancel_futures=True)
+                self._fetcher = None
+
+    def _chunk_size(self):
+        """Comments per scoring task (see SCORE_CHUNK_SIZE)"""
+        if self.analyzer.workers > 1:
+            return max(SCORE_CHUNK_SIZE, self.analyzer.parallel_threshold)
+        return SCORE_CHUNK_SIZE
+
+    def _queue_scoring(self, scorer, depth, pages, waiting):
+        """
+        Submit the comments of pages (iterables of comments, possibly still
+        downloading) to the scoring threads in _chunk_size() chunks and
+        return their futures
+        While PIPELINE_DEPTH chunks are in flight it blocks inside the
+        waiting() context.
+        """
+        size = self._chunk_size()
+        futures = []
+
+        def submit(chunk):
+            with waiting():
+                depth.acquire()
+            try:
+                future = scorer.submit(self.analyzer.analyze_columnar, chunk)
+            except BaseException:
+                # The pipeline has shut down (this fetch was given up on)
+                depth.release()
+                raise
+            future.add_done_callback(lambda _: depth.release())
+            futures.append(future)
+
+        chunk = []
+        for page in pages:
+            for comment in page:
+                chunk.append(comment)
+                if len(chunk) >= size:
+                    submit(chunk)
+                    chunk = []
+        if chunk:
+            submit(chunk)
+        return futures
+
+    def _fetch(self, i, url, started, downloaded, abandoned, queue_scoring, refresh, options):
+        """
+        Stored results for one URL if checked within its fetch cache TTL and
+        the fetch cache still holds their comments; otherwise open_comments,
+        holding one of its platform's slots. A URL
+        with no stored results has its pages queued for scoring as they
+        download; otherwise the comments are downloaded in full and queued
+        unless their content hash matches the stored results
+        A YouTube video sorted by recent resumes from its stored results'
+        cursor while their comments are cached: only comments posted since
+        are fetched and scored, ahead of the stored results (up to the
+        comment cap), and the merged comments are cached in turn.
+        options are open_comments' max_count and sort.
+        Returns (source, error, scoring futures); source holds the stored key,
+        title, content hash and YouTube cursor, and the aggregate when reused
+        started[i] is the download's start time while it runs; i is added to
+        downloaded once it ends. Once i is in abandoned, the download stops
+        at its next page. queue_scoring(pages, i, slot) pauses the
+        download's clock, and frees its slot, while it waits on scoring.
+        """
+        key = source_key(url, **options)
+        record = self.sources.get(key) if key and not refresh else None
+        resumable = get_platform(url) == 'youtube' and options['sort'] == 'recent'
+        fresh = record is not None and self.sources.is_fresh(key, record)
+        # Reusing a record, or resuming after it, needs the comments it was scored from
+        stored = None
+        if fresh or (resumable and record is not None and record.get('cursor')):
+            stored = self.sources.comments(key, record)
+        if fresh and stored is not None:
+            source, chunks = self.sources.reuse(key, record, stored)
+            return source, None, chunks
+
+        cursor = None
+        if resumable:
+            cursor = {'cids': record['cursor']} if stored is not None and record.get('cursor') else {}
+        resumed = bool(cursor)
+
+        digest = ContentHash()
+        slot = self._platform_slots.get(get_platform(url), self._platform_slots['unknown'])
+        with slot:
+            started[i] = time.monotonic()
+            try:
+                title, pages = open_comments(url, cursor=cursor, refresh=refresh, **options)
+                pages = _until_abandoned(pages, i, abandoned)
+                if record is None:
+                    chunks = queue_scoring(digest.pages(pages), i, slot)
+                    source = {'key': key, 'title': title, 'content_hash': digest.hexdigest(),
+                              'cursor': cursor.get('cids') if cursor is not None else None}
+                    return source, None, chunks
+                comments = [comment for page in pages for comment in page]
+            finally:
+                # The URL timeout and fetch deadline cover the download, not
+                # time spent waiting on scoring
+                downloaded.add(i)
+                started.pop(i, None)
+
+        if resumed and cursor.get('caught_up'):
+            if not comments:
+                self.sources.touch(key, record)
+                source, chunks = self.sources.reuse(key, record, stored)
+                return source, None, chunks
+            # New comments first, then as many stored ones as the cap leaves room for
+            stored = self.sources.results(record, stored)
+            cap = comment_cap('youtube', options['max_count'])
+            if cap is not None:
+                stored = stored.head(cap - len(comments))
+            # A resumed download bypasses the fetch cache; store the merged comments there
+            cache_comments(key, title, comments + stored.comments())
+            digest.update(comments)
+            digest.update(stored.comments())
+            source = {'key': key, 'title': title, 'content_hash': digest.hexdigest(), 'cursor': cursor['cids']}
+            return source, None, queue_scoring([comments]) + [_resolved(stored)]
+
+        if resumed:
+            cache_comments(key, title, comments)
+        digest.update(comments)
+        new_cursor = cursor.get('cids') if cursor is not None else None
+        if record['content_hash'] == digest.hexdigest():
+            self.sources.touch(key, dict(record, cursor=new_cursor or record.get('cursor')))
+            source, chunks = self.sources.reuse(key, record, comments)
+            return source, None, chunks
+        source = {'key': key, 'title': title, 'content_hash': digest.hexdigest(), 'cursor': new_cursor}
+        return source, None, queue_scoring([comments])
+
+    def _manual(self, text, queue_scoring, refresh):
+        """
+        Like _fetch for pasted text (one comment per non-empty line), stored
+        by content hash
+        The lines are read twice, once to hash them and once to score them,
+        so the block is never copied into a list of comments.
+        """
+        digest = content_hash(iter_lines(text))
+        key = f"manual:{digest}"
+        record = self.sources.get(key) if not refresh else None
+        if record is not None:
+            source, chunks = self.sources.reuse(key, record, iter_lines(text))
+            return source, None, chunks
+        return {'key': key, 'title': None, 'content_hash': digest}, None, queue_scoring([iter_lines(text)])
+
+    def _fetch_and_analyze(self, urls, texts=(), on_done=None, refresh=False, max_count=PLATFORM_DEFAULT,
+                           sort='recent'):
+        """
+        Fetch URLs and score their comments as a pipeline: fetch threads hand
+        comments to scoring threads chunk by chunk as pages download, so
+        downloads and scoring overlap, and stop fetching while PIPELINE_DEPTH
+        chunks wait to be scored.
+        texts are pasted text blocks, one comment per non-empty line; they
+        need no fetch and are scored alongside.
+        Sources unchanged since a previous analysis reuse its stored results
+        (see SourceResults) unless refresh is set. max_count and sort are
+        passed on to open_comments.
+
+        Returns (source, analysis, error) for each URL and then each text, in
+        input order; source has the 'title' and 'aggregate'. on_done(i,
+        source, analysis, error) is called as each source finishes, with i
+        its position in that list.
+        """
+        sources = len(urls) + len(texts)
+        options = {'max_count': max_count, 'sort': sort}
+        outcomes = {}
+        started = {}
+        downloaded = set()
+        abandoned = set()
+        waiting = set()
+        waited = {}
+        fetched = {}
+        scorer = ThreadPoolExecutor(max_workers=SCORE_WORKERS, thread_name_prefix='score')
+        depth = threading.BoundedSemaphore(PIPELINE_DEPTH)
+
+        @contextmanager
+        def waiting_for_scoring(i, slot):
+            """
+            Stop download i's clocks (URL timeout and deadline) and lend out
+            its platform slot while it waits for scoring capacity
+            """
+            waiting.add(i)
+            start = started.pop(i, None)
+            paused = time.monotonic()
+            slot.release()
+            try:
+                yield
+            finally:
+                slot.acquire()
+                paused = time.monotonic() - paused
+                if start is not None:
+                    started[i] = start + paused
+                waited[i] = waited.get(i, 0) + paused
+                waiting.discard(i)
+
+        def queue_scoring(pages, i=None, slot=None):
+            """Queue pages for scoring; i is the URL downloading them, holding slot"""
+            return self._queue_scoring(
+                scorer, depth, pages, nullcontext if i is None else lambda: waiting_for_scoring(i, slot)
+            )
+
+        executor = self._get_fetcher()
+        fetching = {
+            executor.submit(self._fetch, i, url, started, downloaded, abandoned, queue_scoring, refresh, options): i
+            for i, url in enumerate(urls)
+        }
+        fetching.update({
+            executor.submit(self._manual, text, queue_scoring, refresh): len(urls) + j
+            for j, text in enumerate(texts)
+        })
+        scoring = {}
+        deadline = time.monotonic() + self.fetch_deadline
+
+        def finish(i, source, analysis, error):
+            if not error and 'aggregate' not in source:
+                source['aggregate'] = SentimentAggregate.from_results(analysis)
+                if source['key']:
+                    self.sources.put(source['key'], source, analysis)
+            outcomes[i] = (source, analysis, error)
+            if on_done:
+                on_done(i, source, analysis, error)
+
+        try:
+            while fetching or scoring:
+                now = time.monotonic()
+                # Give up on URLs still downloading past the deadline or their
+                # own timeout; pasted text and downloads waiting for scoring
+                # capacity carry on
+                for future, i in list(fetching.items()):
+                    if i >= len(urls) or i in downloaded or i in waiting:
+                        continue
+                    if now >= deadline + waited.get(i, 0):
+                        del fetching[future]
+                        abandoned.add(i)
+                        finish(i, None, None, f"not fetched within the {self.fetch_deadline}s deadline")
+                    elif now - started.get(i, now) >= self.url_timeout:
+                        del fetching[future]
+                        abandoned.add(i)
+                        finish(i, None, None, f"timed out after {self.url_timeout}s")
+
+                downloading = [i for i in fetching.values() if i < len(urls) and i not in downloaded]
+                timeout = None
+                if downloading:
+                    # Downloads waiting on scoring are checked again when they resume
+                    expiries = [
+                        min(started.get(i, now) + self.url_timeout, deadline + waited.get(i, 0))
+                        for i in downloading if i not in waiting
+                    ]
+                    if len(expiries) < len(downloading):
+                        expiries.append(now + PIPELINE_POLL)
+                    timeout = max(min(expiries) - now, 0)
+                done, _ = wait(list(fetching) + list(scoring), timeout=timeout, return_when=FIRST_COMPLETED)
+
+                for future in done:
+                    if future in fetching:
+                        i = fetching.pop(future)
+                        try:
+                            source, error, chunks = future.result()
+                        except Exception as e:
+                            source, error, chunks = None, str(e), []
+                        if error:
+                            finish(i, None, None, error)
+                            continue
+                        fetched[i] = (source, chunks)
+                        scoring.update(dict.fromkeys(chunks, i))
+                    else:
+                        i = scoring.pop(future)
+                    source, chunks = fetched[i]
+                    if i not in outcomes and all(chunk.done() for chunk in chunks):
+                        try:
+                            analysis = ColumnarResults.concat([chunk.result() for chunk in chunks])
+                        except Exception as e:
+                            finish(i, None, None, str(e))
+                        else:
+                            finish(i, source, analysis, None)
+        finally:
+            # Stuck fetches keep their thread until their current request
+            # returns (within HTTP_TIMEOUT); don't wait for them
+            abandoned.update(fetching.values())
+            for future in fetching:
+                future.cancel()
+            scorer.shutdown(wait=False, cancel_futures=True)
+
+        return [outcomes[i] for i in range(sources)]
+
+    def analyze_creator(self, name, urls, manual_data=None, progress=None, refresh=False,
+                        max_count=PLATFORM_DEFAULT, sort='recent'):
         """
         Analyze a creator based on multiple content sources (URLs AND Manual Text).
         Aggregates sentiment and calculates business metrics.
         
         manual_data: list of dicts {'platform': 'instagram', 'text': 'comments...', 'title': '...'}
+        progress: optional callback(sources_done, sources_total, comments_scored, percent, partial)
+                  called as each source finishes; partial holds the counts,
+                  platform breakdown and source summaries so far
+        refresh: fetch and score every source again instead of reusing the
+                 stored results of sources unchanged since an earlier analysis
+        max_count, sort: comment cap per Reddit or YouTube URL (None = no
+                 cap) and YouTube sort order (see fetch_comments)
         """
         if manual_data is None:
             manual_data = []
 
-        aggregated_results = {
-            'positive': [],
-            'negative': [],
-            'neutral': [],
-            'total_count': 0,
-            'platform_breakdown': {
-                'youtube': {'positive': 0, 'negative': 0, 'neutral': 0, 'total': 0},
-                'reddit': {'positive': 0, 'negative': 0, 'neutral': 0, 'total': 0},
-                'other': {'positive': 0, 'negative': 0, 'neutral': 0, 'total': 0}
-            },
-            'sources': []
-        }
+        urls = [url for url in urls if url]
 
-        errors = []
-
-        # 1. Process URLs
-        for url in urls:
-            if not url:
-                continue
+        # Manual entries with at least one comment, as (platform, title, text);
+        # each non-empty line is a comment, read straight from the text when scored
+        manual_sources = []
+        for item in manual_data:
+            text = item.get('text') or ''
+            if next(iter_lines(text), None) is not None:
+                manual_sources.append((item.get('platform', 'other'), item.get('title', 'Manual Entry'), text))
 
-            # Fetch comments for this specific URL
-            fetch_result, error = fetch_comments(url)
-            
-            if error:
-                errors.append(f"Error fetching {url}: {error}")
-                continue
+        sources_total = len(urls) + len(manual_sources)
 
-            comments = fetch_result['comments']
-            title = fetch_result['title']
-            platform = self._identify_platform(url)
-
-            # Analyze sentiment for this batch
-            analysis = self.analyzer.analyze_comments(comments)
-
-            # Aggregate Data
-            aggregated_results['positive'].extend(analysis['positive'])
-            aggregated_results['negative'].extend(analysis['negative'])
-            aggregated_results['neutral'].extend(analysis['neutral'])
-            
-            # Update counts
-            count_pos = len(analysis['positive'])
-            count_neg = len(analysis['negative'])
-            count_neu = len(analysis['neutral'])
-            total = len(comments)
-            
-            aggregated_results['total_count'] += total
-            
-            # Update Platform Breakdown
-            if platform in aggregated_results['platform_breakdown']:
-                stats = aggregated_results['platform_breakdown'][platform]
-                stats['positive'] += count_pos
-                stats['negative'] += count_neg
-                stats['neutral'] += count_neu
-                stats['total'] += total
-
-            aggregated_results['sources'].append({
-                'url': url,
-                'title': title,
+        def describe(i, source):
+            """Summary of source i: URL or manual entry, title, platform and aggregate"""
+            aggregate = source['aggregate']
+            if i < len(urls):
+                return {
+                    'url': urls[i],
+                    'title': source['title'],
+                    'platform': self._identify_platform(urls[i]),
+                    'sentiment_summary': aggregate.to_dict()
+                }
+            platform, title, _ = manual_sources[i - len(urls)]
+            return {
+                'url': 'manual',
+                'title': f"{title} ({platform})",
                 'platform': platform,
-                'sentiment_summary': analysis['counts']
-            })
+                'sentiment_summary': aggregate.to_dict()
+            }
 
-        # 2. Process Manual Data
-        for item in manual_data:
-            text_block = item.get('text', '')
-            platform = item.get('platform', 'other')
-            title = item.get('title', 'Manual Entry')
+        # Running aggregate reported through progress as each source finishes
+        # (sources in completion order; the final result keeps input order)
+        running = CreatorAggregate()
+        tracker = {'sources_done': 0}
 
-            if not text_block:
-                continue
+        def source_done(i, source, analysis, error):
+            tracker['sources_done'] += 1
+            if not error:
+                running.add(describe(i, source), source['aggregate'])
+            if progress:
+                progress(
+                    sources_done=tracker['sources_done'],
+                    sources_total=sources_total,
+                    comments_scored=running.overall.total,
+                    percent=round(100 * tracker['sources_done'] / sources_total, 1) if sources_total else 100.0,
+                    partial=dict(running.to_dict(), creator_name=name)
+                )
 
-            # Split text block into lines (comments)
-            comments = [line.strip() for line in text_block.split('\n') if line.strip()]
-            
-            if not comments:
+        # URLs and manual text go through one fetch -> score pipeline, so
+        # downloads and scoring overlap; results are aggregated in input order
+        outcomes = self._fetch_and_analyze(
+            urls, [text for _, _, text in manual_sources], source_done,
+            refresh=refresh, max_count=max_count, sort=sort
+        )
+
+        # Per-source ColumnarResults, concatenated in input order at the end
+        parts = []
+        totals = CreatorAggregate()
+        errors = []
+
+        for i, (source, analysis, error) in enumerate(outcomes):
+            if error:
+                if i < len(urls):
+                    errors.append(f"Error fetching {urls[i]}: {error}")
+                else:
+                    errors.append(f"Error analyzing {manual_sources[i - len(urls)][1]}: {error}")
                 continue
+            # Stored sources bring their aggregate along; nothing is recounted
+            totals.add(describe(i, source), source['aggregate'])
+            parts.append(analysis)
 
-            # Analyze
-            analysis = self.analyzer.analyze_comments(comments)
-
-            # Aggregate
-            aggregated_results['positive'].extend(analysis['positive'])
-            aggregated_results['negative'].extend(analysis['negative'])
-            aggregated_results['neutral'].extend(analysis['neutral'])
-            
-            # Update counts
-            count_pos = len(analysis['positive'])
-            count_neg = len(analysis['negative'])
-            count_neu = len(analysis['neutral'])
-            total = len(comments)
-            
-            aggregated_results['total_count'] += total
-            
-            # Update Platform Breakdown
-            if platform in aggregated_results['platform_breakdown']:
-                stats = aggregated_results['platform_breakdown'][platform]
-            else:
-                stats = aggregated_results['platform_breakdown']['other'] # fallback
-
-            stats['positive'] += count_pos
-            stats['negative'] += count_neg
-            stats['neutral'] += count_neu
-            stats['total'] += total
-            
-            aggregated_results['sources'].append({
-                'url': 'manual',
-                'title': f"{title} ({platform})",
-                'platform': platform,
-                'sentiment_summary': analysis['counts']
-            })
+        aggregated_results = dict(
+            totals.to_dict(),
+            total_count=totals.overall.total,
+            # Every comment with its label and scores (ColumnarResults)
+            comments=ColumnarResults.concat(parts)
+        )
 
         # Calculate Overall Scores & Recommendations
-        business_metrics = self._calculate_business_metrics(aggregated_results)
+        business_metrics = self._calculate_business_metrics(totals.overall)
 
         return {
             'creator_name': name,
@@ -151,11 +630,12 @@ class CreatorAnalyzer:
             return 'reddit'
         return 'other'
 
-    def _calculate_business_metrics(self, data):
+    def _calculate_business_metrics(self, aggregate):
         """
         Calculate advanced business metrics based on user requirements.
+        Needs only the creator's SentimentAggregate, not the comments.
         """
-        total = data['total_count']
+        total = aggregate.total
         if total == 0:
             return {
                 'overall_score': 0,
@@ -164,9 +644,10 @@ class CreatorAnalyzer:
                 'cult_following_score': 0
             }
 
-        pos_count = len(data['positive'])
-        neu_count = len(data['neutral'])
-        neg_count = len(data['negative'])
+        counts = aggregate.counts()
+        pos_count = counts['positive']
+        neu_count = counts['neutral']
+        neg_count = counts['negative']
 
         # Business Logic: Score is (Positive + Neutral) %
         # Why? Neutral usually means engagement without hate, which is safe for brands.
@@ -0,0 +1,113 @@
+"""
+Job Queue Module
+Runs long analyses (URL fetches, creator profiles) off the request thread
+
+Jobs execute on an in-process thread pool. Their status and progress live
+in a session store (see session_store), so with SQLite every worker can
+report on jobs started by any other.
+"""
+
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from session_store import create_session_store
+
+# Jobs running at once in this process
+JOB_WORKERS = 4
+
+# Seconds a job record is kept after its last update
+JOB_TTL = 60 * 60
+
+# Upper bound on stored job records (JSON bytes)
+JOB_MAX_BYTES = 16 * 1024 * 1024
+
+# Job states
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+
+
+class JobError(Exception):
+    """A job failed with a message meant for the user"""
+
+
+class JobQueue:
+    """Thread-pool job runner with pollable progress"""
+
+    def __init__(self, store_url=None, workers=JOB_WORKERS):
+        self.store = create_session_store(store_url, ttl=JOB_TTL, max_bytes=JOB_MAX_BYTES)
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='job')
+        self._changed = threading.Condition()
+
+    def _update(self, job_id, progress=None, **fields):
+        """Apply fields (and merge progress fields) to a job and wake waiters"""
+        with self._changed:
+            job = self.store.get(job_id)
+            if job is None:
+                return None
+            # Copy, so readers holding the previous record never see it change
+            job = dict(job, **fields)
+            if progress:
+                job['progress'] = dict(job['progress'], **progress)
+            job['version'] += 1
+            job['updated'] = time.time()
+            self.store.put(job_id, job)
+            self._changed.notify_all()
+            return job
+
+    def submit(self, kind, func, *args, **kwargs):
+        """
+        Queue func(*args, progress=callback, **kwargs) and return the job id
+        func reports progress by calling callback(**fields); its return value
+        becomes the job's result. JobError messages are shown as the error,
+        other exceptions as their text.
+        """
+        job_id = str(uuid.uuid4())
+        now = time.time()
+        self.store.put(job_id, {
+            'id': job_id,
+            'type': kind,
+            'status': QUEUED,
+            'progress': {},
+            'result': None,
+            'error': None,
+            'version': 0,
+            'created': now,
+            'updated': now
+        })
+        self._executor.submit(self._run, job_id, func, args, kwargs)
+        return job_id
+
+    def _run(self, job_id, func, args, kwargs):
+        self._update(job_id, status=RUNNING)
+
+        def progress(**fields):
+            self._update(job_id, progress=fields)
+
+        try:
+            result = func(*args, progress=progress, **kwargs)
+        except Exception as e:
+            self._update(job_id, status=FAILED, error=str(e))
+        else:
+            self._update(job_id, status=DONE, result=result)
+
+    def get(self, job_id):
+        """The job record, or None if unknown or expired"""
+        return self.store.get(job_id)
+
+    def wait(self, job_id, version=-1, timeout=15):
+        """
+        The job record once its version is past version, or after timeout
+        Updates made in this process wake waiters at once; updates from other
+        workers (SQLite store) are picked up by polling every second.
+        """
+        deadline = time.monotonic() + timeout
+        with self._changed:
+            while True:
+                job = self.store.get(job_id)
+                remaining = deadline - time.monotonic()
+                if job is None or job['version'] > version or remaining <= 0:
+                    return job
+                self._changed.wait(min(remaining, 1.0))
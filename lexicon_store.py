@@ -0,0 +1,261 @@
+"""
+Lexicon Store Module
+Compact, memory-mappable export of the VADER lexicon and its rule tables
+
+The file holds one section per table. Each section is a sorted string table
+(uint32 offsets into a UTF-8 blob) plus either a float64 value array or a
+second string table. Lookups binary-search the mapped file, so nothing is
+unpickled at start-up and forked workers share the same pages; keys() and
+items() decode a whole section in one sequential pass instead.
+
+Usage: python lexicon_store.py [model_pickle] [model_lexicon]
+"""
+
+import mmap
+import os
+import pickle
+import struct
+import sys
+from collections.abc import Mapping
+from functools import lru_cache
+
+import numpy as np
+
+MAGIC = b'VLEX'
+VERSION = 1
+
+# Section kinds
+FLOAT_VALUES = 0
+TEXT_VALUES = 1
+KEYS_ONLY = 2
+
+_HEADER = struct.Struct('<4sHH')
+_SECTION = struct.Struct('<16sB3xIQQQQ')
+
+# Lookups remembered per section, hits and misses alike
+LOOKUP_CACHE_SIZE = 65536
+
+
+def _string_table(strings):
+    """uint32 offsets (len + 1 entries) and the concatenated UTF-8 blob"""
+    offsets = [0]
+    blob = bytearray()
+    for s in strings:
+        blob += s
+        offsets.append(len(blob))
+    return struct.pack(f'<{len(offsets)}I', *offsets), bytes(blob)
+
+
+def _pad(buf):
+    buf += b'\0' * (-len(buf) % 8)
+
+
+def export_lexicon(model, path):
+    """
+    Write a VADER SentimentIntensityAnalyzer's lexicon, emoji descriptions
+    and the vaderSentiment booster, negation and special-case rule tables
+    to path
+    """
+    from vaderSentiment import vaderSentiment as vader
+
+    sections = [
+        ('lexicon', FLOAT_VALUES, model.lexicon),
+        ('emojis', TEXT_VALUES, model.emojis),
+        ('booster', FLOAT_VALUES, vader.BOOSTER_DICT),
+        ('negate', KEYS_ONLY, dict.fromkeys(vader.NEGATE)),
+        ('special_cases', FLOAT_VALUES, vader.SPECIAL_CASES),
+        ('constants', FLOAT_VALUES, {
+            'C_INCR': vader.C_INCR,
+            'N_SCALAR': vader.N_SCALAR,
+        }),
+    ]
+
+    body = bytearray()
+    body_start = _HEADER.size + _SECTION.size * len(sections)
+    header_padding = -body_start % 8
+    body_start += header_padding
+    directory = []
+
+    for name, kind, table in sections:
+        items = sorted((key.encode('utf-8'), value) for key, value in table.items())
+        key_offsets, key_blob = _string_table(key for key, _ in items)
+
+        key_offsets_at = body_start + len(body)
+        body += key_offsets
+        key_blob_at = body_start + len(body)
+        body += key_blob
+        _pad(body)
+
+        values_at = value_blob_at = 0
+        if kind == FLOAT_VALUES:
+            values_at = body_start + len(body)
+            body += struct.pack(f'<{len(items)}d', *(float(value) for _, value in items))
+        elif kind == TEXT_VALUES:
+            value_offsets, value_blob = _string_table(value.encode('utf-8') for _, value in items)
+            values_at = body_start + len(body)
+            body += value_offsets
+            value_blob_at = body_start + len(body)
+            body += value_blob
+        _pad(body)
+
+        directory.append(_SECTION.pack(
+            name.encode('ascii'), kind, len(items),
+            key_offsets_at, key_blob_at, values_at, value_blob_at
+        ))
+
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(_HEADER.pack(MAGIC, VERSION, len(sections)))
+        f.write(b''.join(directory))
+        f.write(b'\0' * header_padding)
+        f.write(body)
+    os.replace(tmp_path, path)
+
+
+class LexiconSection(Mapping):
+    """Read-only mapping over one section of a mapped lexicon file"""
+
+    def __init__(self, buf, kind, count, key_offsets_at, key_blob_at, values_at, value_blob_at):
+        self._buf = buf
+        self.kind = kind
+        self._count = count
+        self._key_offsets = buf[key_offsets_at:key_offsets_at + 4 * (count + 1)].cast('I')
+        self._key_blob_at = key_blob_at
+        if kind == FLOAT_VALUES:
+            self._values = buf[values_at:values_at + 8 * count].cast('d')
+        elif kind == TEXT_VALUES:
+            self._value_offsets = buf[values_at:values_at + 4 * (count + 1)].cast('I')
+            self._value_blob_at = value_blob_at
+        self._index = lru_cache(maxsize=LOOKUP_CACHE_SIZE)(self._find)
+
+    def _key(self, i):
+        start = self._key_blob_at + self._key_offsets[i]
+        end = self._key_blob_at + self._key_offsets[i + 1]
+        return self._buf[start:end].tobytes()
+
+    def _find(self, key):
+        """Position of key in the sorted table, or -1"""
+        if not isinstance(key, str):
+            return -1
+        target = key.encode('utf-8', 'surrogatepass')
+        low, high = 0, self._count
+        while low < high:
+            mid = (low + high) // 2
+            if self._key(mid) < target:
+                low = mid + 1
+            else:
+                high = mid
+        if low < self._count and self._key(low) == target:
+            return low
+        return -1
+
+    def _value(self, i):
+        if self.kind == FLOAT_VALUES:
+            return self._values[i]
+        if self.kind == TEXT_VALUES:
+            start = self._value_blob_at + self._value_offsets[i]
+            end = self._value_blob_at + self._value_offsets[i + 1]
+            return self._buf[start:end].tobytes().decode('utf-8')
+        return None
+
+    def __contains__(self, key):
+        return self._index(key) >= 0
+
+    def __getitem__(self, key):
+        i = self._index(key)
+        if i < 0:
+            raise KeyError(key)
+        return self._value(i)
+
+    @staticmethod
+    def _strings(buf, offsets, blob_at):
+        """Every string of a string table, decoded in one pass over its blob"""
+        count = len(offsets) - 1
+        if count <= 0:
+            return []
+        blob = np.frombuffer(buf[blob_at:blob_at + offsets[-1]], dtype=np.uint8)
+        # NUL between strings, so the blob decodes and splits in C
+        strings = np.insert(blob, np.asarray(offsets[1:-1], dtype=np.intp), 0).tobytes().decode('utf-8').split('\0')
+        if len(strings) == count:
+            return strings
+        text = blob.tobytes()
+        return [text[offsets[i]:offsets[i + 1]].decode('utf-8') for i in range(count)]
+
+    def keys(self):
+        """All keys in table order, without a lookup per key"""
+        return self._strings(self._buf, self._key_offsets, self._key_blob_at)
+
+    def values(self):
+        if self.kind == FLOAT_VALUES:
+            return self._values.tolist()
+        if self.kind == TEXT_VALUES:
+            return self._strings(self._buf, self._value_offsets, self._value_blob_at)
+        return [None] * self._count
+
+    def items(self):
+        """All (key, value) pairs read sequentially; dict(section.items()) copies a section"""
+        return list(zip(self.keys(), self.values()))
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self):
+        return self._count
+
+
+class LexiconFile:
+    """A memory-mapped lexicon file; sections are opened on first access"""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._buf = memoryview(self._mmap)
+
+        magic, version, section_count = _HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} lexicon file")
+
+        self._directory = {}
+        for i in range(section_count):
+            name, *layout = _SECTION.unpack_from(self._mmap, _HEADER.size + i * _SECTION.size)
+            self._directory[name.rstrip(b'\0').decode('ascii')] = layout
+        self._sections = {}
+
+    def __getitem__(self, name):
+        section = self._sections.get(name)
+        if section is None:
+            section = LexiconSection(self._buf, *self._directory[name])
+            self._sections[name] = section
+        return section
+
+    def __contains__(self, name):
+        return name in self._directory
+
+
+def load_lexicon_model(path):
+    """
+    A VADER SentimentIntensityAnalyzer whose lexicon and emoji tables are
+    read from a mapped lexicon file instead of unpickled
+
+    The file's rule tables stay reachable as model.tables; the vectorized
+    scorer reads them from there.
+    """
+    from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+
+    tables = LexiconFile(path)
+    model = SentimentIntensityAnalyzer.__new__(SentimentIntensityAnalyzer)
+    model.lexicon_full_filepath = path
+    model.emoji_full_filepath = path
+    model.lexicon = tables['lexicon']
+    model.emojis = tables['emojis']
+    model.tables = tables
+    return model
+
+
+if __name__ == '__main__':
+    source = sys.argv[1] if len(sys.argv) > 1 else 'model_pickle'
+    target = sys.argv[2] if len(sys.argv) > 2 else 'model_lexicon'
+    with open(source, 'rb') as f:
+        export_lexicon(pickle.load(f), target)
+    print(f"Wrote {target} ({os.path.getsize(target)} bytes) from {source}")
@@ -1,20 +1,936 @@
 """
 Sentiment Analysis Engine
-Uses the existing VADER model from model_pickle
+Uses the existing VADER model from model_pickle, or its mapped export in
+model_lexicon (see lexicon_store.py)
 """
 
+import base64
+import gc
+import hashlib
+import json
+import os
 import pickle
-from text_processor import clean
+import string
+import threading
+import zlib
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import numpy as np
+from lexicon_store import load_lexicon_model
+from text_processor import clean, clean_batch
+
+# Default model file for each supported model_format
+MODEL_PATHS = {
+    'pickle': 'model_pickle',
+    'lexicon': 'model_lexicon',
+}
+
+# Default number of distinct comments kept in the shared score cache
+SCORE_CACHE_SIZE = 100000
+
+# Batches with fewer uncached comments than this are scored in-process
+PARALLEL_THRESHOLD = 5000
+
+# Chunks handed to each pool worker per batch
+CHUNKS_PER_WORKER = 4
+
+# Comments scored per batch by analyze_stream
+STREAM_BATCH_SIZE = 1000
+
+# Score batches with VectorizedVader instead of calling polarity_scores per comment
+VECTORIZED_SCORING = True
+
+# Sentiment labels by their int8 code in ColumnarResults
+LABELS = ('neutral', 'positive', 'negative')
+LABEL_CODES = {label: code for code, label in enumerate(LABELS)}
+
+# VADER score fields, in column order of ColumnarResults.scores
+SCORE_FIELDS = ('neg', 'neu', 'pos', 'compound')
+
+# Stored scores are int16 multiples of 1/SCORE_SCALE; VADER rounds compound
+# to 4 decimals and the other fields to 3, so none is lost
+SCORE_SCALE = 10000
+
+# zlib level of the packed columns in ColumnarResults.to_dict (fast, and
+# about as small as the default level on comment text)
+RESULTS_COMPRESSION_LEVEL = 1
+
+# Compound score histogram bins over [-1, 1] in SentimentAggregate
+HISTOGRAM_BINS = 20
+
+
+class ScoreCache:
+    """
+    Bounded LRU cache of cleaned text and VADER scores
+    Keyed by a hash of the raw comment, so repeated comments are scored once
+    """
+
+    def __init__(self, maxsize=SCORE_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(comment):
+        """Content hash of a raw comment"""
+        return hashlib.blake2b(comment.encode('utf-8', 'surrogatepass'), digest_size=16).digest()
+
+    def get(self, key):
+        """Return (cleaned, scores) for a key, or None on a miss"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key, cleaned, scores):
+        """Store an entry, evicting the least recently used ones past maxsize"""
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (cleaned, scores)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """Drop all entries and reset the counters"""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        """Hit/miss counters and current size"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': round(self.hits / lookups, 4) if lookups else 0.0,
+                'size': len(self._entries),
+                'maxsize': self.maxsize
+            }
+
+
+# Shared by every analyzer in the process unless one is given its own cache
+score_cache = ScoreCache()
+
+# Models loaded in this process, by (absolute path, format)
+_models = {}
+_models_lock = threading.Lock()
+
+
+def load_model(model_path=None, model_format='pickle'):
+    """
+    Load a VADER model once per process
+    Every analyzer built from the same file shares the returned instance
+
+    model_format 'pickle' unpickles the whole analyzer; 'lexicon' maps a file
+    written by lexicon_store.export_lexicon and reads it lazily.
+    """
+    if model_format not in MODEL_PATHS:
+        raise ValueError(f"Unknown model format: {model_format}")
+    if model_path is None:
+        model_path = MODEL_PATHS[model_format]
+
+    key = (os.path.abspath(model_path), model_format)
+    with _models_lock:
+        model = _models.get(key)
+        if model is None:
+            if model_format == 'lexicon':
+                model = load_lexicon_model(key[0])
+            else:
+                with open(key[0], 'rb') as f:
+                    model = pickle.load(f)
+            _models[key] = model
+        return model
+
+
+def preload_model(model_path=None, model_format='pickle'):
+    """
+    Load the model and freeze everything allocated so far out of the garbage
+    collector's reach, so workers forked afterwards (gunicorn --preload)
+    keep sharing the lexicon pages copy-on-write
+
+    The vectorized scorer's tables are built here too, so the workers and
+    their scoring pools inherit them instead of each building their own.
+    """
+    model = load_model(model_path, model_format)
+    if VECTORIZED_SCORING:
+        _vector_scorer(model)
+    gc.freeze()
+    return model
+
+
+class VectorizedVader:
+    """
+    Batch re-implementation of VADER's polarity_scores
+
+    Tokens of a whole batch are flattened into NumPy arrays of vocabulary
+    ids; the lexicon, booster, negation, idiom, "but" and caps rules and the
+    final normalization then run as array operations. Scores match the
+    model's own polarity_scores.
+    """
+
+    # Words the rules compare tokens against
+    RULE_WORDS = ('no', 'or', 'nor', 'least', 'at', 'very', 'never', 'so',
+                  'this', 'without', 'doubt', 'kind', 'of', 'but')
+
+    def __init__(self, model):
+        booster_dict, negate, special_cases, constants = self._rule_tables(model)
+        self.n_scalar = constants['N_SCALAR']
+        self.c_incr = constants['C_INCR']
+        self.negate = frozenset(negate)
+
+        # Lexicon words take ids 1..n in the lexicon's own order, so their
+        # valences are copied in one go; the rule words follow
+        lexicon_words = list(model.lexicon.keys())
+        self.vocab = dict(zip(lexicon_words, range(1, len(lexicon_words) + 1)))
+        extra = set(self.RULE_WORDS)
+        for phrase in list(booster_dict) + list(special_cases):
+            extra.update(phrase.split(' '))
+        for word in sorted(extra.difference(self.vocab)):
+            self.vocab[word] = len(self.vocab) + 1
+        self.size = len(self.vocab) + 1
+
+        # Per-id tables; id 0 is any word outside the vocabulary
+        self.in_lexicon = np.zeros(self.size, dtype=bool)
+        self.in_lexicon[1:len(lexicon_words) + 1] = True
+        self.valence = np.zeros(self.size)
+        self.valence[1:len(lexicon_words) + 1] = list(model.lexicon.values())
+        self.is_booster = np.zeros(self.size, dtype=bool)
+        self.booster = np.zeros(self.size)
+        for word, value in booster_dict.items():
+            i = self.vocab[word] if ' ' not in word else 0
+            if i:
+                self.is_booster[i] = True
+                self.booster[i] = value
+        self.rule_ids = {word: self.vocab[word] for word in self.RULE_WORDS}
+
+        self.special_cases = self._ngram_table(special_cases)
+        self.booster_ngrams = self._ngram_table(
+            {phrase: value for phrase, value in booster_dict.items() if ' ' in phrase}
+        )
+
+        # polarity_scores only ever matches single characters against the emoji table
+        self.emojis = {char: text for char, text in model.emojis.items() if len(char) == 1}
+
+    @staticmethod
+    def _rule_tables(model):
+        """
+        (booster, negate, special cases, constants) from a mapped lexicon
+        file, or from vaderSentiment itself for a pickled model
+        """
+        tables = getattr(model, 'tables', None)
+        if tables is not None and all(
+                name in tables for name in ('booster', 'negate', 'special_cases', 'constants')):
+            return (dict(tables['booster'].items()), list(tables['negate']),
+                    dict(tables['special_cases'].items()), dict(tables['constants'].items()))
+
+        from vaderSentiment import vaderSentiment as vader
+        return (vader.BOOSTER_DICT, vader.NEGATE, vader.SPECIAL_CASES,
+                {'N_SCALAR': vader.N_SCALAR, 'C_INCR': vader.C_INCR})
+
+    def _code(self, *ids):
+        """Mixed-radix code of an n-gram of vocabulary ids"""
+        code = ids[0]
+        for i in ids[1:]:
+            code = code * self.size + i
+        return code
+
+    def _ngram_table(self, phrases):
+        """{n: (sorted codes, values)} for the 2- and 3-word phrases"""
+        tables = {}
+        for n in (2, 3):
+            entries = sorted(
+                (self._code(*(self.vocab[word] for word in phrase.split(' '))), float(value))
+                for phrase, value in phrases.items() if len(phrase.split(' ')) == n
+            )
+            codes = np.array([code for code, _ in entries], dtype=np.int64)
+            values = np.array([value for _, value in entries])
+            tables[n] = (codes, values)
+        return tables
+
+    @staticmethod
+    def _lookup(table, codes):
+        """(hit mask, values) of codes in a sorted n-gram table"""
+        table_codes, table_values = table
+        if not len(table_codes):
+            return np.zeros(len(codes), dtype=bool), np.zeros(len(codes))
+        index = np.minimum(np.searchsorted(table_codes, codes), len(table_codes) - 1)
+        return table_codes[index] == codes, table_values[index]
+
+    def _replace_emojis(self, text):
+        """Swap emojis for their descriptions exactly as polarity_scores does"""
+        text_no_emoji = ""
+        prev_space = True
+        for char in text:
+            if char in self.emojis:
+                if not prev_space:
+                    text_no_emoji += ' '
+                text_no_emoji += self.emojis[char]
+                prev_space = False
+            else:
+                text_no_emoji += char
+                prev_space = char == ' '
+        return text_no_emoji
+
+    @staticmethod
+    def _punctuation_amplifier(text):
+        ep_count = min(text.count("!"), 4)
+        qm_count = text.count("?")
+        qm_amplifier = 0
+        if qm_count > 1:
+            qm_amplifier = qm_count * 0.18 if qm_count <= 3 else 0.96
+        return ep_count * 0.292 + qm_amplifier
+
+    def polarity_scores(self, text):
+        """Same result as the model's polarity_scores(text)"""
+        return self.polarity_scores_batch([text])[0]
+
+    def polarity_scores_batch(self, texts):
+        """polarity_scores for each text, in order"""
+        vocab_get = self.vocab.get
+        punctuation = string.punctuation
+        ids, upper, negated = [], [], []
+        lengths, amplifiers = [], []
+
+        # Tokenize exactly like SentiText
+        for text in texts:
+            if not self.emojis.keys().isdisjoint(text):
+                text = self._replace_emojis(text)
+            text = text.strip()
+            count = 0
+            for token in text.split():
+                stripped = token.strip(punctuation)
+                if len(stripped) > 2:
+                    token = stripped
+                lower = token.lower()
+                ids.append(vocab_get(lower, 0))
+                upper.append(token.isupper())
+                negated.append(lower in self.negate or "n't" in lower)
+                count += 1
+            lengths.append(count)
+            amplifiers.append(self._punctuation_amplifier(text))
+
+        lengths = np.array(lengths, dtype=np.int64)
+        sentiments = self._token_sentiments(
+            np.array(ids, dtype=np.int64), np.array(upper, dtype=bool),
+            np.array(negated, dtype=bool), lengths
+        )
+        return self._score_valence(sentiments, lengths, np.array(amplifiers))
+
+    def _token_sentiments(self, ids, upper, negated, lengths):
+        """Valence of every token after the booster, negation, idiom, caps and "but" rules"""
+        rule = self.rule_ids
+        n_scalar, c_incr = self.n_scalar, self.c_incr
+        count = len(ids)
+        segment = np.repeat(np.arange(len(lengths)), lengths)
+        starts = np.cumsum(lengths) - lengths
+        pos = np.arange(count) - starts[segment]
+        length = lengths[segment]
+
+        caps = np.bincount(segment, weights=upper, minlength=len(lengths))
+        cap_diff = ((lengths - caps > 0) & (lengths - caps < lengths))[segment]
+
+        def prev(values, k, fill):
+            out = np.full(count, fill, dtype=values.dtype)
+            out[k:] = values[:count - k]
+            out[pos < k] = fill
+            return out
+
+        def following(values, k, fill):
+            out = np.full(count, fill, dtype=values.dtype)
+            out[:count - k] = values[k:]
+            out[pos + k >= length] = fill
+            return out
+
+        prev_ids = {k: prev(ids, k, 0) for k in (1, 2, 3)}
+        prev_upper = {k: prev(upper, k, False) for k in (1, 2, 3)}
+        prev_negated = {k: prev(negated, k, False) for k in (1, 2, 3)}
+        next1, next2 = following(ids, 1, 0), following(ids, 2, 0)
+        p1, p2, p3 = prev_ids[1], prev_ids[2], prev_ids[3]
+
+        active = (self.in_lexicon[ids] & ~self.is_booster[ids]
+                  & ~((ids == rule['kind']) & (next1 == rule['of'])))
+        base = self.valence[ids]
+        v = base.copy()
+
+        # "no" before another lexicon word, and "no" shortly before this one
+        v = np.where((ids == rule['no']) & self.in_lexicon[next1], 0.0, v)
+        no_before = ((p1 == rule['no']) | (p2 == rule['no'])
+                     | ((p3 == rule['no']) & ((p1 == rule['or']) | (p1 == rule['nor']))))
+        v = np.where(no_before, base * n_scalar, v)
+
+        # ALL CAPS word among mixed-case words
+        v = np.where(upper & cap_diff, np.where(v > 0, v + c_incr, v - c_incr), v)
+
+        for start_i in range(3):
+            k = start_i + 1
+            pk = prev_ids[k]
+            cond = active & (pos > start_i) & ~self.in_lexicon[pk]
+
+            s = self.booster[pk]
+            s = np.where(v < 0, s * -1, s)
+            boosted_caps = self.is_booster[pk] & prev_upper[k] & cap_diff
+            s = np.where(boosted_caps, np.where(v > 0, s + c_incr, s - c_incr), s)
+            if start_i == 1:
+                s = np.where(s != 0, s * 0.95, s)
+            if start_i == 2:
+                s = np.where(s != 0, s * 0.9, s)
+            v = np.where(cond, v + s, v)
+
+            if start_i == 0:
+                v = np.where(cond & prev_negated[1], v * n_scalar, v)
+            elif start_i == 1:
+                emphasis = (p2 == rule['never']) & ((p1 == rule['so']) | (p1 == rule['this']))
+                doubtless = ~emphasis & (p2 == rule['without']) & (p1 == rule['doubt'])
+                negation = ~emphasis & ~doubtless & prev_negated[2]
+                v = np.where(cond & emphasis, v * 1.25, v)
+                v = np.where(cond & negation, v * n_scalar, v)
+            else:
+                emphasis = (((p3 == rule['never']) & ((p2 == rule['so']) | (p2 == rule['this'])))
+                            | ((p1 == rule['so']) | (p1 == rule['this'])))
+                doubtless = (~emphasis & (p3 == rule['without'])
+                             & ((p2 == rule['doubt']) | (p1 == rule['doubt'])))
+                negation = ~emphasis & ~doubtless & prev_negated[3]
+                v = np.where(cond & emphasis, v * 1.25, v)
+                v = np.where(cond & negation, v * n_scalar, v)
+                v = np.where(cond, self._special_idioms(v, ids, p1, p2, p3, next1, next2), v)
+
+        # "least" negation
+        least = active & ~self.in_lexicon[p1] & (p1 == rule['least'])
+        least &= ((pos > 1) & (p2 != rule['at']) & (p2 != rule['very'])) | (pos == 1)
+        v = np.where(least, v * n_scalar, v)
+
+        sentiments = np.where(active, v, 0.0)
+
+        # "but": replicate _but_check, including its value-based indexing
+        for j in np.unique(segment[ids == rule['but']]):
+            start, end = starts[j], starts[j] + lengths[j]
+            bi = int(np.argmax(ids[start:end] == rule['but']))
+            values = sentiments[start:end].tolist()
+            for sentiment in values:
+                si = values.index(sentiment)
+                if si < bi:
+                    values[si] = sentiment * 0.5
+                elif si > bi:
+                    values[si] = sentiment * 1.5
+            sentiments[start:end] = values
+
+        return sentiments
+
+    def _special_idioms(self, v, ids, p1, p2, p3, next1, next2):
+        """_special_idioms_check over all tokens"""
+        special2, special3 = self.special_cases[2], self.special_cases[3]
+        sequences = [
+            (special2, self._code(p1, ids)),
+            (special3, self._code(p2, p1, ids)),
+            (special2, self._code(p2, p1)),
+            (special3, self._code(p3, p2, p1)),
+            (special2, self._code(p3, p2)),
+        ]
+        found = np.zeros(len(v), dtype=bool)
+        for table, codes in sequences:
+            hit, value = self._lookup(table, codes)
+            v = np.where(hit & ~found, value, v)
+            found |= hit
+
+        hit, value = self._lookup(special2, self._code(ids, next1))
+        v = np.where(hit & (next1 > 0), value, v)
+        hit, value = self._lookup(special3, self._code(ids, next1, next2))
+        v = np.where(hit & (next2 > 0), value, v)
+
+        booster2, booster3 = self.booster_ngrams[2], self.booster_ngrams[3]
+        for table, codes in ((booster3, self._code(p3, p2, p1)),
+                             (booster2, self._code(p3, p2)),
+                             (booster2, self._code(p2, p1))):
+            hit, value = self._lookup(table, codes)
+            v = np.where(hit, v + value, v)
+        return v
+
+    @staticmethod
+    def _score_valence(sentiments, lengths, amplifiers):
+        """score_valence for every comment; bincount sums each one in token order"""
+        segments = len(lengths)
+        segment = np.repeat(np.arange(segments), lengths)
+
+        sum_s = np.bincount(segment, weights=sentiments, minlength=segments)
+        sum_s = np.where(sum_s > 0, sum_s + amplifiers, np.where(sum_s < 0, sum_s - amplifiers, sum_s))
+        compound = np.clip(sum_s / np.sqrt(sum_s * sum_s + 15), -1.0, 1.0)
+
+        pos_sum = np.bincount(segment, weights=np.where(sentiments > 0, sentiments + 1, 0.0), minlength=segments)
+        neg_sum = np.bincount(segment, weights=np.where(sentiments < 0, sentiments - 1, 0.0), minlength=segments)
+        neu_count = np.bincount(segment, weights=sentiments == 0, minlength=segments)
+        more_positive, more_negative = pos_sum > np.abs(neg_sum), pos_sum < np.abs(neg_sum)
+        pos_sum = np.where(more_positive, pos_sum + amplifiers, pos_sum)
+        neg_sum = np.where(more_negative, neg_sum - amplifiers, neg_sum)
+
+        total = pos_sum + np.abs(neg_sum) + neu_count
+        total = np.where(lengths > 0, total, 1.0)
+        pos, neg, neu = np.abs(pos_sum / total), np.abs(neg_sum / total), np.abs(neu_count / total)
+
+        results = []
+        for j in range(segments):
+            if lengths[j] == 0:
+                results.append({"neg": 0.0, "neu": 0.0, "pos": 0.0, "compound": 0.0})
+                continue
+            results.append({
+                "neg": round(float(neg[j]), 3),
+                "neu": round(float(neu[j]), 3),
+                "pos": round(float(pos[j]), 3),
+                "compound": round(float(compound[j]), 4)
+            })
+        return results
+
+
+# VectorizedVader built for each loaded model, by id(model)
+_vector_scorers = {}
+_vector_scorers_lock = threading.Lock()
+
+
+def _vector_scorer(model):
+    """The VectorizedVader built for a loaded model"""
+    scorer = _vector_scorers.get(id(model))
+    if scorer is None:
+        with _vector_scorers_lock:
+            scorer = _vector_scorers.get(id(model))
+            if scorer is None:
+                scorer = _vector_scorers[id(model)] = VectorizedVader(model)
+    return scorer
+
+
+def _polarity_scores(model, cleaned):
+    """VADER scores for cleaned text, or None if the model fails on it"""
+    try:
+        return model.polarity_scores(cleaned)
+    except Exception:
+        return None
+
+
+def _score_with(model, comments):
+    """(cleaned, scores) for each raw comment"""
+    cleaned_comments = clean_batch(comments)
+    if VECTORIZED_SCORING:
+        try:
+            return list(zip(cleaned_comments, _vector_scorer(model).polarity_scores_batch(cleaned_comments)))
+        except Exception:
+            pass
+    return [(cleaned, _polarity_scores(model, cleaned)) for cleaned in cleaned_comments]
+
+
+# Model loaded once by each scoring pool worker
+_worker_model = None
+
+
+def _init_worker(model_path, model_format):
+    global _worker_model
+    _worker_model = load_model(model_path, model_format)
+    if VECTORIZED_SCORING:
+        # Inherited from the parent when it preloaded the model before forking
+        _vector_scorer(_worker_model)
+
+
+def _score_chunk(comments):
+    return _score_with(_worker_model, comments)
+
+
+def _pack(data):
+    """base64 of zlib-compressed bytes (or an array's raw bytes)"""
+    if isinstance(data, np.ndarray):
+        data = data.tobytes()
+    return base64.b64encode(zlib.compress(data, RESULTS_COMPRESSION_LEVEL)).decode('ascii')
+
+
+def _unpack(text, dtype=None):
+    """Bytes packed by _pack, as an array of dtype if given"""
+    data = zlib.decompress(base64.b64decode(text))
+    return data if dtype is None else np.frombuffer(data, dtype=dtype)
+
+
+class ColumnarResults:
+    """
+    Analyzed comments stored column-wise: each distinct text once, plus
+    per-comment text index (int32), label code (int8, see LABELS) and VADER
+    scores (float32 rows of SCORE_FIELDS)
+    """
+
+    def __init__(self, texts, text_ids, labels, scores):
+        self.texts = texts
+        self.text_ids = np.asarray(text_ids, dtype=np.int32)
+        self.labels = np.asarray(labels, dtype=np.int8)
+        self.scores = np.asarray(scores, dtype=np.float32).reshape(-1, len(SCORE_FIELDS))
+        self._orders = {}
+
+    @property
+    def compounds(self):
+        return self.scores[:, -1]
+
+    @classmethod
+    def from_scored(cls, comments, scored_comments):
+        """Build from comments and their score_comments output"""
+        index = {}
+        text_ids = [index.setdefault(comment, len(index)) for comment in comments]
+        labels = [LABEL_CODES[sentiment_label(scores)] for _, scores in scored_comments]
+        scores = [
+            [scores[field] for field in SCORE_FIELDS] if scores is not None else [0.0] * len(SCORE_FIELDS)
+            for _, scores in scored_comments
+        ]
+        return cls(list(index), text_ids, labels, scores)
+
+    @classmethod
+    def concat(cls, parts):
+        """One result holding every comment of parts, in order"""
+        index = {}
+        text_ids = []
+        for part in parts:
+            remap = np.array([index.setdefault(text, len(index)) for text in part.texts], dtype=np.int32)
+            text_ids.append(remap[part.text_ids] if len(part) else part.text_ids)
+        return cls(
+            list(index),
+            np.concatenate(text_ids) if text_ids else [],
+            np.concatenate([part.labels for part in parts]) if parts else [],
+            np.concatenate([part.scores for part in parts]) if parts else []
+        )
+
+    def __len__(self):
+        return len(self.labels)
+
+    def head(self, n):
+        """A result holding only the first n comments"""
+        if n >= len(self):
+            return self
+        text_ids = self.text_ids[:max(n, 0)]
+        used = np.unique(text_ids)
+        remap = np.zeros(len(self.texts), dtype=np.int32)
+        remap[used] = np.arange(len(used), dtype=np.int32)
+        return ColumnarResults(
+            [self.texts[i] for i in used], remap[text_ids], self.labels[:len(text_ids)], self.scores[:len(text_ids)]
+        )
+
+    def counts(self):
+        tally = np.bincount(self.labels, minlength=len(LABELS))
+        counts = {label: int(tally[code]) for label, code in LABEL_CODES.items()}
+        return {
+            'positive': counts['positive'],
+            'negative': counts['negative'],
+            'neutral': counts['neutral'],
+            'total': len(self)
+        }
+
+    def comments(self, label=None):
+        """Comment texts in order, optionally only those with label"""
+        text_ids = self.text_ids if label is None else self.text_ids[self.labels == LABEL_CODES[label]]
+        return [self.texts[i] for i in text_ids]
+
+    def _order(self, sort):
+        """Comment positions in sort order ('score' ascending, '-score' descending), computed once"""
+        if sort not in self._orders:
+            order = np.argsort(self.compounds, kind='stable')
+            self._orders['score'] = order
+            self._orders['-score'] = np.argsort(-self.compounds, kind='stable')
+        return self._orders[sort]
+
+    def page(self, label=None, offset=0, limit=50, sort=None):
+        """
+        (total, items) for one page of comments, optionally filtered by label
+        and sorted by compound score ('score' or '-score'); items are dicts
+        with the comment's position, text, label and SCORE_FIELDS
+        """
+        positions = np.arange(len(self)) if sort is None else self._order(sort)
+        if label is not None:
+            positions = positions[self.labels[positions] == LABEL_CODES[label]]
+        return len(positions), [self._item(i) for i in positions[offset:offset + limit]]
+
+    def _item(self, i):
+        item = {'index': int(i), 'text': self.texts[self.text_ids[i]], 'label': LABELS[self.labels[i]]}
+        for field, value in zip(SCORE_FIELDS, self.scores[i].tolist()):
+            item[field] = round(value, 4)
+        return item
+
+    def extremes(self, k=10):
+        """
+        The k most positive and k most negative comments, most extreme first
+        Only the k candidates are sorted (argpartition selects them), so this
+        stays O(n) for large sessions
+        """
+        return {'positive': self._top(k, 'positive'), 'negative': self._top(k, 'negative')}
+
+    def _top(self, k, label):
+        positions = np.flatnonzero(self.labels == LABEL_CODES[label])
+        if k <= 0 or not len(positions):
+            return []
+        keys = self.compounds[positions]
+        if label == 'positive':
+            keys = -keys
+        if k < len(positions):
+            chosen = np.argpartition(keys, k - 1)[:k]
+            positions, keys = positions[chosen], keys[chosen]
+        # Ties keep analysis order
+        return [self._item(i) for i in positions[np.lexsort((positions, keys))]]
+
+    def legacy_view(self):
+        """The analyze_comments dict: texts per label plus counts"""
+        return {
+            'positive': self.comments('positive'),
+            'negative': self.comments('negative'),
+            'neutral': self.comments('neutral'),
+            'counts': self.counts()
+        }
+
+    def to_dict(self, texts=True):
+        """
+        JSON-safe form: every column is packed (base64 of zlib-compressed
+        bytes), the texts as a JSON array and the scores as int16 (see
+        SCORE_SCALE); text_ids is left out when every comment is distinct
+        With texts=False only the labels and scores are kept, for a caller
+        that has the comments themselves (see from_dict).
+        """
+        data = {
+            'format': 'columnar',
+            'labels': _pack(self.labels),
+            'scores': _pack(np.rint(self.scores * SCORE_SCALE).astype(np.int16))
+        }
+        if not texts:
+            return data
+        encoded = json.dumps(self.texts, ensure_ascii=False, separators=(',', ':'))
+        data['texts'] = _pack(encoded.encode('utf-8', 'surrogatepass'))
+        if len(self.texts) != len(self) or np.any(self.text_ids != np.arange(len(self))):
+            data['text_ids'] = _pack(self.text_ids)
+        return data
+
+    @classmethod
+    def from_dict(cls, data, comments=None):
+        """
+        Rebuild from to_dict output; comments (an iterable of every comment,
+        in order) supply the texts of a to_dict(texts=False) form
+        """
+        labels = _unpack(data['labels'], np.int8)
+        scores = _unpack(data['scores'], np.int16) / np.float32(SCORE_SCALE)
+        if comments is not None:
+            index = {}
+            text_ids = [index.setdefault(comment, len(index)) for comment in comments]
+            if len(text_ids) != len(labels):
+                raise ValueError(f"{len(text_ids)} comments given for {len(labels)} stored scores")
+            return cls(list(index), text_ids, labels, scores)
+        texts = json.loads(_unpack(data['texts']).decode('utf-8', 'surrogatepass'))
+        text_ids = _unpack(data['text_ids'], np.int32) if 'text_ids' in data else np.arange(len(labels))
+        return cls(texts, text_ids, labels, scores)
+
+    @staticmethod
+    def is_columnar(data):
+        return isinstance(data, dict) and data.get('format') == 'columnar'
+
+
+class SentimentAggregate:
+    """
+    Mergeable summary of scored comments: label counts, sum and sum of
+    squares of compound scores, and a histogram of compound scores over
+    HISTOGRAM_BINS equal bins of [-1, 1]
+    Aggregates of separate sources or runs combine with merge in constant
+    time, without the comments themselves.
+    """
+
+    def __init__(self, counts=None, compound_sum=0.0, compound_sq_sum=0.0, histogram=None):
+        self.label_counts = dict.fromkeys(LABELS, 0) if counts is None else {label: int(counts[label]) for label in LABELS}
+        self.compound_sum = float(compound_sum)
+        self.compound_sq_sum = float(compound_sq_sum)
+        self.histogram = np.zeros(HISTOGRAM_BINS, dtype=np.int64) if histogram is None else np.array(histogram, dtype=np.int64)
+
+    @classmethod
+    def from_results(cls, results):
+        """Aggregate of a ColumnarResults"""
+        compounds = results.compounds.astype(np.float64)
+        bins = np.clip(((compounds + 1) / 2 * HISTOGRAM_BINS).astype(np.int64), 0, HISTOGRAM_BINS - 1)
+        return cls(
+            results.counts(),
+            compounds.sum(),
+            np.square(compounds).sum(),
+            np.bincount(bins, minlength=HISTOGRAM_BINS)
+        )
+
+    def merge(self, other):
+        """Add other's comments to this aggregate; returns self"""
+        for label in LABELS:
+            self.label_counts[label] += other.label_counts[label]
+        self.compound_sum += other.compound_sum
+        self.compound_sq_sum += other.compound_sq_sum
+        self.histogram += other.histogram
+        return self
+
+    def __add__(self, other):
+        return SentimentAggregate().merge(self).merge(other)
+
+    @property
+    def total(self):
+        return sum(self.label_counts.values())
+
+    @property
+    def mean(self):
+        """Mean compound score (0 when empty)"""
+        return self.compound_sum / self.total if self.total else 0.0
+
+    @property
+    def std(self):
+        """Population standard deviation of compound scores"""
+        if not self.total:
+            return 0.0
+        return max(self.compound_sq_sum / self.total - self.mean ** 2, 0.0) ** 0.5
+
+    def counts(self):
+        return dict(self.label_counts, total=self.total)
+
+    def to_dict(self):
+        """JSON-safe form; a superset of counts()"""
+        return dict(
+            self.counts(),
+            compound_sum=self.compound_sum,
+            compound_sq_sum=self.compound_sq_sum,
+            histogram=self.histogram.tolist(),
+            mean=round(self.mean, 4),
+            std=round(self.std, 4)
+        )
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data, data['compound_sum'], data['compound_sq_sum'], data['histogram'])
+
+
+def sentiment_label(scores):
+    """'positive', 'negative' or 'neutral' for a scores dict (None counts as neutral)"""
+    if scores is None:
+        return 'neutral'
+    if scores['compound'] > 0:
+        return 'positive'
+    if scores['compound'] < 0:
+        return 'negative'
+    return 'neutral'
 
 
 class SentimentAnalyzer:
     """Wrapper for VADER sentiment model"""
     
-    def __init__(self, model_path='model_pickle'):
-        """Load the pre-trained VADER model"""
-        with open(model_path, 'rb') as f:
-            self.model = pickle.load(f)
+    def __init__(self, model_path=None, cache=None, workers=0,
+                 parallel_threshold=PARALLEL_THRESHOLD, model_format='pickle'):
+        """
+        Load the pre-trained VADER model
+
+        model_format selects the model file type (see load_model); the model
+        is shared with every other analyzer using the same file.
+        workers > 1 enables a process pool of that size for batches with at
+        least parallel_threshold uncached comments; smaller batches stay
+        in-process to avoid IPC overhead.
+        """
+        self.model = load_model(model_path, model_format)
+        self.model_path = model_path
+        self.model_format = model_format
+        self.cache = score_cache if cache is None else cache
+        self.workers = workers
+        self.parallel_threshold = parallel_threshold
+        self._pool = None
+        self._pool_lock = threading.Lock()
+
+    def _get_pool(self):
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    initializer=_init_worker,
+                    initargs=(self.model_path, self.model_format)
+                )
+            return self._pool
+
+    def close(self):
+        """Shut down the scoring pool, if one was started"""
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown()
+                self._pool = None
+
+    def _score(self, comments):
+        """(cleaned, scores) for each comment, spread over the pool for large batches"""
+        if self.workers <= 1 or len(comments) < self.parallel_threshold:
+            return _score_with(self.model, comments)
+
+        chunk_size = -(-len(comments) // (self.workers * CHUNKS_PER_WORKER))
+        chunks = [comments[i:i + chunk_size] for i in range(0, len(comments), chunk_size)]
+        try:
+            results = []
+            for chunk_result in self._get_pool().map(_score_chunk, chunks):
+                results.extend(chunk_result)
+            return results
+        except BrokenProcessPool:
+            # A worker died; drop the pool and score this batch in-process
+            with self._pool_lock:
+                self._pool = None
+            return _score_with(self.model, comments)
+
+    def score_comments(self, comments):
+        """
+        Cleaned text and VADER scores for each comment, in order
+        Comments already in the cache are neither cleaned nor scored again
+        """
+        keys = [self.cache.key(comment) for comment in comments]
+
+        entries = {}
+        missing = {}
+        for key, comment in zip(keys, comments):
+            if key in entries or key in missing:
+                continue
+            entry = self.cache.get(key)
+            if entry is None:
+                missing[key] = comment
+            else:
+                entries[key] = entry
+
+        if missing:
+            for key, (cleaned, scores) in zip(missing, self._score(list(missing.values()))):
+                self.cache.put(key, cleaned, scores)
+                entries[key] = (cleaned, scores)
+
+        return [entries[key] for key in keys]
     
+    def analyze_columnar(self, comments):
+        """Analyze a list of comments into a ColumnarResults"""
+        return ColumnarResults.from_scored(comments, self.score_comments(comments))
+
+    def analyze_iter(self, comments, batch_size=STREAM_BATCH_SIZE):
+        """
+        analyze_columnar for an iterable of any length, such as comments read
+        from a file. Comments are scored batch_size at a time and each batch
+        is dropped once merged, but the result keeps every distinct text, so
+        memory grows with the number of distinct comments (repeats cost only
+        their ids, labels and scores)
+        """
+        index = {}
+        text_ids, labels, scores = [], [], []
+
+        def add(batch):
+            part = self.analyze_columnar(batch)
+            remap = np.array([index.setdefault(text, len(index)) for text in part.texts], dtype=np.int32)
+            text_ids.append(remap[part.text_ids])
+            labels.append(part.labels)
+            scores.append(part.scores)
+
+        batch = []
+        for comment in comments:
+            batch.append(comment)
+            if len(batch) >= batch_size:
+                add(batch)
+                batch = []
+        if batch:
+            add(batch)
+        if not labels:
+            return ColumnarResults([], [], [], [])
+        return ColumnarResults(list(index), np.concatenate(text_ids), np.concatenate(labels), np.concatenate(scores))
+
     def analyze_comments(self, comments):
         """
         Analyze a list of comments and categorize by sentiment
@@ -25,29 +941,23 @@ class SentimentAnalyzer:
         Returns:
             dict with 'positive', 'negative', 'neutral' lists and counts
         """
-        # Clean all comments
-        cleaned_comments = [clean(comment) for comment in comments]
+        # Clean and score all comments (cached by content)
+        scored_comments = self.score_comments(comments)
         
         # Categorize by sentiment
         positive = []
         negative = []
         neutral = []
         
-        for i, cleaned_comment in enumerate(cleaned_comments):
-            try:
-                # Get sentiment score using VADER
-                score = self.model.polarity_scores(cleaned_comment)['compound']
-                
-                # Categorize based on score
-                if score > 0:
-                    positive.append(comments[i])
-                elif score < 0:
-                    negative.append(comments[i])
-                else:
-                    neutral.append(comments[i])
-            except Exception:
-                # If analysis fails, treat as neutral
-                neutral.append(comments[i])
+        for comment, (_, scores) in zip(comments, scored_comments):
+            # Failed analyses (scores None) count as neutral
+            label = sentiment_label(scores)
+            if label == 'positive':
+                positive.append(comment)
+            elif label == 'negative':
+                negative.append(comment)
+            else:
+                neutral.append(comment)
         
         return {
             'positive': positive,
@@ -81,3 +991,33 @@ class SentimentAnalyzer:
             return self.model.polarity_scores(cleaned)
         except Exception:
             return {'compound': 0, 'pos': 0, 'neg': 0, 'neu': 1}
+
+    def analyze_stream(self, comments, batch_size=STREAM_BATCH_SIZE):
+        """
+        Score an iterable of comments incrementally
+
+        Yields {'index', 'label', 'compound'} for each comment, then
+        {'counts'} with the running totals after each batch. Only one batch
+        is held in memory, so comments can be a generator of any length.
+        """
+        counts = {'positive': 0, 'negative': 0, 'neutral': 0, 'total': 0}
+        batch = []
+        for comment in comments:
+            batch.append(comment)
+            if len(batch) >= batch_size:
+                yield from self._stream_batch(batch, counts)
+                batch = []
+        if batch:
+            yield from self._stream_batch(batch, counts)
+
+    def _stream_batch(self, batch, counts):
+        for _, scores in self.score_comments(batch):
+            label = sentiment_label(scores)
+            yield {
+                'index': counts['total'],
+                'label': label,
+                'compound': scores['compound'] if scores is not None else 0
+            }
+            counts[label] += 1
+            counts['total'] += 1
+        yield {'counts': dict(counts)}
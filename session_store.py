@@ -0,0 +1,211 @@
+"""
+Session Store Module
+Bounded storage for analysis sessions
+
+Sessions expire after a TTL and the least recently used ones are evicted
+once the stored sessions exceed max_bytes. MemorySessionStore keeps them in
+the process; SQLiteSessionStore keeps them compressed in a SQLite file shared
+by every worker and kept across restarts.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+
+# Sessions older than this are dropped (seconds)
+SESSION_TTL = 24 * 60 * 60
+
+# Upper bound on the stored size of all sessions (JSON bytes; compressed for SQLite)
+SESSION_MAX_BYTES = 256 * 1024 * 1024
+
+# zlib level for SQLite session blobs
+COMPRESSION_LEVEL = 6
+
+
+def _encode(session):
+    return json.dumps(session, separators=(',', ':')).encode('utf-8')
+
+
+class SessionStore(ABC):
+    """Interface shared by the session backends"""
+
+    @abstractmethod
+    def get(self, session_id):
+        """The session, or None if it does not exist or has expired"""
+
+    @abstractmethod
+    def put(self, session_id, session):
+        """Store a JSON-serialisable session, evicting old ones if needed"""
+
+    @abstractmethod
+    def delete(self, session_id):
+        """Drop a session if it exists"""
+
+    @abstractmethod
+    def stats(self):
+        """Session count and stored bytes"""
+
+    def __contains__(self, session_id):
+        return self.get(session_id) is not None
+
+
+class MemorySessionStore(SessionStore):
+    """In-process LRU of sessions; sizes are measured as encoded JSON"""
+
+    def __init__(self, ttl=SESSION_TTL, max_bytes=SESSION_MAX_BYTES):
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._sessions = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def _remove(self, session_id):
+        _, size, _ = self._sessions.pop(session_id)
+        self._bytes -= size
+
+    def get(self, session_id):
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            if entry is None:
+                return None
+            if entry[0] <= time.time():
+                self._remove(session_id)
+                return None
+            self._sessions.move_to_end(session_id)
+            return entry[2]
+
+    def put(self, session_id, session):
+        size = len(_encode(session))
+        with self._lock:
+            if session_id in self._sessions:
+                self._remove(session_id)
+            self._sessions[session_id] = (time.time() + self.ttl, size, session)
+            self._bytes += size
+            self._evict()
+
+    def _purge_expired(self):
+        now = time.time()
+        for session_id in [sid for sid, entry in self._sessions.items() if entry[0] <= now]:
+            self._remove(session_id)
+
+    def _evict(self):
+        self._purge_expired()
+        # Keep at least the newest session even if it alone exceeds max_bytes
+        while self._bytes > self.max_bytes and len(self._sessions) > 1:
+            self._remove(next(iter(self._sessions)))
+
+    def delete(self, session_id):
+        with self._lock:
+            if session_id in self._sessions:
+                self._remove(session_id)
+
+    def stats(self):
+        with self._lock:
+            self._purge_expired()
+            return {'sessions': len(self._sessions), 'bytes': self._bytes, 'max_bytes': self.max_bytes}
+
+
+class SQLiteSessionStore(SessionStore):
+    """Sessions as zlib-compressed JSON in a SQLite database"""
+
+    def __init__(self, path, ttl=SESSION_TTL, max_bytes=SESSION_MAX_BYTES):
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._local = threading.local()
+        with self._connect() as db:
+            db.execute(
+                'CREATE TABLE IF NOT EXISTS sessions ('
+                ' id TEXT PRIMARY KEY,'
+                ' data BLOB NOT NULL,'
+                ' size INTEGER NOT NULL,'
+                ' expires REAL NOT NULL,'
+                ' accessed REAL NOT NULL)'
+            )
+            db.execute('CREATE INDEX IF NOT EXISTS sessions_accessed ON sessions (accessed)')
+
+    def _connect(self):
+        """
+        One connection per thread and process (connections must not cross a
+        fork); WAL lets workers read while another writes
+        """
+        db = getattr(self._local, 'db', None)
+        if db is None or self._local.pid != os.getpid():
+            db = sqlite3.connect(self.path, timeout=30)
+            db.execute('PRAGMA journal_mode=WAL')
+            db.execute('PRAGMA synchronous=NORMAL')
+            self._local.db = db
+            self._local.pid = os.getpid()
+        return db
+
+    def get(self, session_id):
+        now = time.time()
+        with self._connect() as db:
+            row = db.execute(
+                'SELECT data FROM sessions WHERE id = ? AND expires > ?', (session_id, now)
+            ).fetchone()
+            if row is None:
+                return None
+            db.execute('UPDATE sessions SET accessed = ? WHERE id = ?', (now, session_id))
+        return json.loads(zlib.decompress(row[0]))
+
+    def __contains__(self, session_id):
+        """Whether the session exists, counted as an access but not decompressed"""
+        now = time.time()
+        with self._connect() as db:
+            found = db.execute(
+                'UPDATE sessions SET accessed = ? WHERE id = ? AND expires > ?', (now, session_id, now)
+            ).rowcount
+        return found > 0
+
+    def put(self, session_id, session):
+        data = zlib.compress(_encode(session), COMPRESSION_LEVEL)
+        now = time.time()
+        with self._connect() as db:
+            db.execute(
+                'INSERT OR REPLACE INTO sessions (id, data, size, expires, accessed) VALUES (?, ?, ?, ?, ?)',
+                (session_id, data, len(data), now + self.ttl, now)
+            )
+            self._evict(db, now)
+
+    def _evict(self, db, now):
+        db.execute('DELETE FROM sessions WHERE expires <= ?', (now,))
+        total = db.execute('SELECT COALESCE(SUM(size), 0) FROM sessions').fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        # Drop the least recently used sessions, always keeping the newest one
+        rows = db.execute('SELECT id, size FROM sessions ORDER BY accessed').fetchall()
+        stale = []
+        for session_id, size in rows[:-1]:
+            if total <= self.max_bytes:
+                break
+            stale.append((session_id,))
+            total -= size
+        db.executemany('DELETE FROM sessions WHERE id = ?', stale)
+
+    def delete(self, session_id):
+        with self._connect() as db:
+            db.execute('DELETE FROM sessions WHERE id = ?', (session_id,))
+
+    def stats(self):
+        count, size = self._connect().execute(
+            'SELECT COUNT(*), COALESCE(SUM(size), 0) FROM sessions WHERE expires > ?', (time.time(),)
+        ).fetchone()
+        return {'sessions': count, 'bytes': size, 'max_bytes': self.max_bytes}
+
+
+def create_session_store(url=None, ttl=SESSION_TTL, max_bytes=SESSION_MAX_BYTES):
+    """
+    Session store for a URL: 'memory' (the default) or 'sqlite:///path/to/sessions.db'
+    """
+    url = url or 'memory'
+    if url == 'memory':
+        return MemorySessionStore(ttl, max_bytes)
+    if url.startswith('sqlite:///'):
+        return SQLiteSessionStore(os.path.expanduser(url[len('sqlite:///'):]), ttl, max_bytes)
+    raise ValueError(f"Unsupported session store: {url}")
@@ -136,7 +136,9 @@ document.addEventListener('DOMContentLoaded', () => {
 
                 const data = await res.json();
                 if (res.ok) {
-                    localStorage.setItem('sessionId', data.session_id);
+                    // The dashboard follows the job and fills in as each source finishes
+                    localStorage.removeItem('sessionId');
+                    localStorage.setItem('jobId', data.job_id);
                     localStorage.setItem('sessionType', 'creator');
                     window.location.href = '/dashboard';
                 } else {
@@ -171,7 +173,9 @@ document.addEventListener('DOMContentLoaded', () => {
 
                 const data = await res.json();
                 if (res.ok) {
-                    localStorage.setItem('sessionId', data.session_id);
+                    const result = await waitForJob(data.job_id);
+                    localStorage.removeItem('jobId');
+                    localStorage.setItem('sessionId', result.session_id);
                     // Reset session type to default/single
                     localStorage.removeItem('sessionType');
                     window.location.href = '/dashboard';
@@ -179,7 +183,7 @@ document.addEventListener('DOMContentLoaded', () => {
                     showError(data.error || 'URL analysis failed.');
                 }
             } catch (err) {
-                showError('Network Error: ' + err.message);
+                showError(err.jobFailed ? err.message : 'Network Error: ' + err.message);
             } finally {
                 hideLoading();
             }
@@ -212,6 +216,7 @@ document.addEventListener('DOMContentLoaded', () => {
                 const res = await fetch(`${API_BASE}/api/demo`);
                 const data = await res.json();
                 if (res.ok) {
+                    localStorage.removeItem('jobId');
                     localStorage.setItem('sessionId', data.session_id);
                     localStorage.removeItem('sessionType');
                     window.location.href = '/dashboard';
@@ -226,35 +231,48 @@ document.addEventListener('DOMContentLoaded', () => {
         });
     }
 
-    // 4. Upload CSV
+    // 4. Upload CSV / TXT (parsed and scored server-side in batches)
     if (elements.uploadBtn && elements.csvFile) {
         elements.uploadBtn.addEventListener('click', () => {
             elements.csvFile.click();
         });
 
-        elements.csvFile.addEventListener('change', (e) => {
+        elements.csvFile.addEventListener('change', async (e) => {
             const file = e.target.files[0];
             if (!file) return;
-
-            const reader = new FileReader();
-            reader.onload = async (ev) => {
-                const content = ev.target.result;
-                const lines = content.split('\n').map(l => l.trim()).filter(l => l);
-                // Simple CSV parsing: assume no commas/quotes complexity for now for demo
-                // Or just treat lines as comments
-                // Skip header if 'comment' is in first line
-                const comments = (lines[0] && lines[0].toLowerCase().includes('comment')) ? lines.slice(1) : lines;
-
-                if (comments.length === 0) return showError('No comments found in CSV.');
-
-                await performSingleAnalysis(comments, file.name.replace('.csv', ''));
-            };
-            reader.readAsText(file);
+            await performUploadAnalysis(file);
+            e.target.value = '';
         });
     }
 
     // --- HELPERS ---
 
+    // Long-poll a background job until it finishes; resolves with its result
+    async function waitForJob(jobId) {
+        let version = -1;
+        while (true) {
+            const res = await fetch(`${API_BASE}/api/jobs/${jobId}?version=${version}`);
+            const job = await res.json();
+            if (!res.ok) throw new Error(job.error || 'Job lookup failed.');
+
+            version = job.version;
+            showProgress(job.progress);
+            if (job.status === 'done') return job.result;
+            if (job.status === 'failed') {
+                const err = new Error(job.error || 'Analysis failed.');
+                err.jobFailed = true;
+                throw err;
+            }
+        }
+    }
+
+    function showProgress(progress) {
+        const label = elements.loading && elements.loading.querySelector('p');
+        if (!label || !progress || progress.sources_total === undefined) return;
+        label.textContent = `Analyzing comments... ${progress.sources_done}/${progress.sources_total} sources, ` +
+            `${progress.comments_scored} comments scored (${Math.round(progress.percent)}%)`;
+    }
+
     async function performSingleAnalysis(comments, title) {
         showLoading();
         hideError();
@@ -266,6 +284,30 @@ document.addEventListener('DOMContentLoaded', () => {
             });
             const data = await res.json();
             if (res.ok) {
+                localStorage.removeItem('jobId');
+                localStorage.setItem('sessionId', data.session_id);
+                localStorage.removeItem('sessionType');
+                window.location.href = '/dashboard';
+            } else {
+                showError(data.error || 'Analysis failed.');
+            }
+        } catch (err) {
+            showError('Network Error: ' + err.message);
+        } finally {
+            hideLoading();
+        }
+    }
+
+    async function performUploadAnalysis(file) {
+        showLoading();
+        hideError();
+        try {
+            const form = new FormData();
+            form.append('file', file);
+            const res = await fetch(`${API_BASE}/api/analyze/upload`, { method: 'POST', body: form });
+            const data = await res.json();
+            if (res.ok) {
+                localStorage.removeItem('jobId');
                 localStorage.setItem('sessionId', data.session_id);
                 localStorage.removeItem('sessionType');
                 window.location.href = '/dashboard';
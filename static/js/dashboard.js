@@ -2,20 +2,29 @@
 
 const API_BASE = 'http://localhost:5000';
 
-let currentResults = null;
+// Comments are fetched a page at a time from /api/session/<id>/comments
+const PAGE_SIZE = 50;
+// Most clearly positive/negative comments first
+const SORT_BY_SENTIMENT = { positive: '-score', negative: 'score', neutral: '' };
+
+let currentSessionId = null;
+let commentPage = { sentiment: null, offset: 0, total: 0 };
 let barChart = null;
 let pieChart = null;
 
 document.addEventListener('DOMContentLoaded', async () => {
     const sessionId = localStorage.getItem('sessionId');
     const sessionType = localStorage.getItem('sessionType'); // 'creator' or 'single'
+    const jobId = localStorage.getItem('jobId'); // creator analysis still running
 
-    if (!sessionId) {
+    if (!sessionId && !jobId) {
         window.location.href = '/';
         return;
     }
 
-    if (sessionType === 'creator') {
+    if (jobId) {
+        followCreatorJob(jobId);
+    } else if (sessionType === 'creator') {
         loadCreatorAnalysis(sessionId);
     } else {
         await loadAnalysis(sessionId);
@@ -26,7 +35,7 @@ document.addEventListener('DOMContentLoaded', async () => {
 
 async function loadCreatorAnalysis(sessionId) {
     try {
-        const response = await fetch(`${API_BASE}/api/session/${sessionId}`);
+        const response = await fetch(`${API_BASE}/api/session/${sessionId}/summary`);
         const data = await response.json();
 
         if (response.ok) {
@@ -34,6 +43,7 @@ async function loadCreatorAnalysis(sessionId) {
             document.getElementById('standardReport').style.display = 'none';
             document.getElementById('creatorReport').style.display = 'block';
 
+            currentSessionId = sessionId;
             displayCreatorResults(data.data); // data structure matches app.py response
         } else {
             alert('Session not found.');
@@ -45,6 +55,75 @@ async function loadCreatorAnalysis(sessionId) {
     }
 }
 
+// Render partial results pushed over SSE, then the full report once the job is done
+function followCreatorJob(jobId) {
+    document.getElementById('standardReport').style.display = 'none';
+    document.getElementById('creatorReport').style.display = 'block';
+    document.getElementById('recTitle').textContent = '⏳ Analysis in progress';
+    document.getElementById('recDetail').textContent = 'Results update as each source finishes.';
+    document.getElementById('safetyScore').textContent = '-';
+    document.getElementById('cultLevel').textContent = '-';
+
+    const events = new EventSource(`${API_BASE}/api/jobs/${jobId}/events`);
+
+    events.addEventListener('progress', (e) => {
+        const job = JSON.parse(e.data);
+        if (job.progress && job.progress.partial) displayPartialCreatorResults(job.progress);
+    });
+
+    events.addEventListener('done', (e) => {
+        events.close();
+        const job = JSON.parse(e.data);
+        localStorage.removeItem('jobId');
+        localStorage.setItem('sessionId', job.result.session_id);
+        loadCreatorAnalysis(job.result.session_id);
+    });
+
+    events.addEventListener('failed', (e) => {
+        events.close();
+        localStorage.removeItem('jobId');
+        alert(JSON.parse(e.data).error || 'Creator analysis failed.');
+        window.location.href = '/';
+    });
+}
+
+function displayPartialCreatorResults(progress) {
+    const { partial } = progress;
+
+    document.getElementById('creatorNameDisplay').textContent = partial.creator_name;
+    document.getElementById('reportTime').textContent =
+        `${progress.sources_done} of ${progress.sources_total} sources analyzed (${Math.round(progress.percent)}%)`;
+
+    updatePlatformScore('ytScore', partial.platform_breakdown.youtube);
+    updatePlatformScore('redditScore', partial.platform_breakdown.reddit);
+
+    const { counts } = partial;
+    document.getElementById('positiveCount').textContent = counts.positive;
+    document.getElementById('negativeCount').textContent = counts.negative;
+    document.getElementById('neutralCount').textContent = counts.neutral;
+    document.getElementById('totalCount').textContent = counts.total;
+
+    createBarChart(counts);
+    createPieChart(counts);
+    displaySources(partial.sources);
+
+    document.getElementById('commentsContainer').innerHTML =
+        '<p style="text-align: center; color: #94a3b8;">Comments appear when the analysis completes</p>';
+}
+
+function displaySources(sources) {
+    const container = document.getElementById('sourceList');
+    container.innerHTML = sources.map(source => {
+        const { positive, negative, neutral, total } = source.sentiment_summary;
+        return `
+            <div class="comment-item neutral">
+                <strong>${escapeHtml(source.title)}</strong> (${escapeHtml(source.platform)}):
+                ${total} comments, ${positive} positive, ${negative} negative, ${neutral} neutral
+            </div>
+        `;
+    }).join('');
+}
+
 function displayCreatorResults(data) {
     const { creator_name, timestamp, business_analysis, stats } = data;
 
@@ -79,14 +158,10 @@ function displayCreatorResults(data) {
     // Platform stats
     updatePlatformScore('ytScore', stats.platform_breakdown.youtube);
     updatePlatformScore('redditScore', stats.platform_breakdown.reddit);
+    displaySources(stats.sources);
 
     // --- POPULATE GLOBAL STATS & CHARTS ---
-    const counts = {
-        positive: stats.positive.length,
-        negative: stats.negative.length,
-        neutral: stats.neutral.length,
-        total: stats.total_count
-    };
+    const { counts } = stats;
 
     // Update stat cards
     document.getElementById('positiveCount').textContent = counts.positive;
@@ -98,8 +173,6 @@ function displayCreatorResults(data) {
     createBarChart(counts);
     createPieChart(counts);
 
-    // Set global currentResults for comment filtering
-    currentResults = stats;
     displayComments('positive');
 }
 
@@ -118,11 +191,11 @@ function updatePlatformScore(elementId, stats) {
 // Keep original loadAnalysis function below...
 async function loadAnalysis(sessionId) {
     try {
-        const response = await fetch(`${API_BASE}/api/session/${sessionId}`);
+        const response = await fetch(`${API_BASE}/api/session/${sessionId}/summary`);
         const data = await response.json();
 
         if (response.ok) {
-            currentResults = data.results;
+            currentSessionId = sessionId;
             displayResults(data);
         } else {
             alert('Session not found. Redirecting to home...');
@@ -135,36 +208,13 @@ async function loadAnalysis(sessionId) {
 }
 
 function displayResults(data) {
-    const { title, timestamp, results } = data;
-    const { counts } = results;
+    const { title, timestamp, counts } = data;
 
     // Update title and timestamp
     document.getElementById('analysisTitle').textContent = title;
     document.getElementById('analysisTime').textContent =
         `Analyzed on ${new Date(timestamp).toLocaleString()}`;
 
-    // Update Brand Score
-    if (results.brand_score !== undefined) {
-        const scoreContainer = document.getElementById('brandScoreContainer');
-        const scoreValue = document.getElementById('brandScoreValue');
-        const scoreBar = document.getElementById('brandScoreBar');
-        const recommendation = document.getElementById('brandRecommendation');
-
-        scoreContainer.style.display = 'block';
-        scoreValue.textContent = `${results.brand_score}%`;
-        scoreBar.style.width = `${results.brand_score}%`;
-        recommendation.textContent = results.brand_recommendation;
-
-        // Color coding for recommendation
-        if (results.brand_score > 80) {
-            recommendation.style.color = '#10b981'; // Green
-            recommendation.style.border = '1px solid #10b981';
-        } else {
-            recommendation.style.color = '#f59e0b'; // Orange/Yellow
-            recommendation.style.border = '1px solid #f59e0b';
-        }
-    }
-
     // Update stat cards
     document.getElementById('positiveCount').textContent = counts.positive;
     document.getElementById('negativeCount').textContent = counts.negative;
@@ -293,20 +343,38 @@ function createPieChart(counts) {
     });
 }
 
-function displayComments(sentiment) {
+async function displayComments(sentiment) {
+    if (!currentSessionId) return; // creator job still running
+    commentPage = { sentiment, offset: 0, total: 0 };
+    document.getElementById('commentsContainer').innerHTML = '';
+    await loadMoreComments();
+}
+
+async function loadMoreComments() {
     const container = document.getElementById('commentsContainer');
-    const comments = currentResults[sentiment];
+    const loadMoreBtn = document.getElementById('loadMoreBtn');
+    const { sentiment, offset } = commentPage;
+
+    const params = new URLSearchParams({ label: sentiment, offset, limit: PAGE_SIZE, sort: SORT_BY_SENTIMENT[sentiment] });
+    const response = await fetch(`${API_BASE}/api/session/${currentSessionId}/comments?${params}`);
+    const page = await response.json();
+    if (!response.ok || sentiment !== commentPage.sentiment) return; // failed, or the filter changed meanwhile
+
+    commentPage.offset += page.comments.length;
+    commentPage.total = page.total;
 
-    if (!comments || comments.length === 0) {
+    if (page.total === 0) {
         container.innerHTML = '<p style="text-align: center; color: #94a3b8;">No comments in this category</p>';
-        return;
+    } else {
+        container.insertAdjacentHTML('beforeend', page.comments.map(comment => `
+            <div class="comment-item ${sentiment}">
+                ${escapeHtml(comment.text)}
+            </div>
+        `).join(''));
     }
 
-    container.innerHTML = comments.map(comment => `
-        <div class="comment-item ${sentiment}">
-            ${escapeHtml(comment)}
-        </div>
-    `).join('');
+    loadMoreBtn.style.display = commentPage.offset < commentPage.total ? 'inline-block' : 'none';
+    loadMoreBtn.textContent = `Load more (${commentPage.total - commentPage.offset} remaining)`;
 }
 
 function setupEventListeners() {
@@ -315,6 +383,11 @@ function setupEventListeners() {
         displayComments(e.target.value);
     });
 
+    // Next page of comments
+    document.getElementById('loadMoreBtn').addEventListener('click', () => {
+        loadMoreComments();
+    });
+
     // Back button
     document.getElementById('backBtn').addEventListener('click', () => {
         window.location.href = '/';
@@ -323,6 +396,7 @@ function setupEventListeners() {
     // New analysis button
     document.getElementById('newAnalysisBtn').addEventListener('click', () => {
         localStorage.removeItem('sessionId');
+        localStorage.removeItem('jobId');
         window.location.href = '/';
     });
 
@@ -332,9 +406,23 @@ function setupEventListeners() {
     });
 }
 
-function exportResults() {
-    const { counts } = currentResults;
-    const title = document.getElementById('analysisTitle').textContent;
+// Export needs every comment, so only this fetches the full session
+async function exportResults() {
+    if (!currentSessionId) return;
+    const response = await fetch(`${API_BASE}/api/session/${currentSessionId}`);
+    const session = await response.json();
+    if (!response.ok) return alert(session.error || 'Export failed.');
+
+    const results = session.type === 'creator' ? session.data.stats : session.results;
+    const counts = {
+        positive: results.positive.length,
+        negative: results.negative.length,
+        neutral: results.neutral.length
+    };
+    counts.total = counts.positive + counts.negative + counts.neutral;
+    const title = session.type === 'creator'
+        ? session.data.creator_name
+        : document.getElementById('analysisTitle').textContent;
 
     let csv = 'Sentiment,Count\n';
     csv += `Positive,${counts.positive}\n`;
@@ -345,7 +433,7 @@ function exportResults() {
     csv += 'Sentiment,Comment\n';
 
     ['positive', 'negative', 'neutral'].forEach(sentiment => {
-        currentResults[sentiment].forEach(comment => {
+        results[sentiment].forEach(comment => {
             csv += `${sentiment},"${comment.replace(/"/g, '""')}"\n`;
         });
     });
@@ -0,0 +1,110 @@
+"""Run the tests against the modules in the repository root"""
+
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# Model files are found relative to the working directory
+os.chdir(ROOT)
+
+
+class StubServer:
+    """
+    Local HTTP server answering each path with queued responses, the last
+    one repeating, and recording the (method, path) of every request
+    """
+
+    def __init__(self):
+        self.responses = {}
+        self.requests = []
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def _respond(self):
+                path = self.path.split('?', 1)[0]
+                server.requests.append((self.command, path))
+                length = int(self.headers.get('Content-Length') or 0)
+                if length:
+                    self.rfile.read(length)
+                queue = server.responses.get(path) or [(404, b'', {}, 0, 0)]
+                status, body, headers, delay, body_delay = queue.pop(0) if len(queue) > 1 else queue[0]
+                time.sleep(delay)
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.flush()
+                time.sleep(body_delay)
+                self.wfile.write(body)
+
+            do_GET = do_POST = _respond
+
+            def log_message(self, *args):
+                pass
+
+        class Server(ThreadingHTTPServer):
+            daemon_threads = True
+
+            def handle_error(self, request, client_address):
+                # Clients that timed out have closed their end
+                pass
+
+        self.httpd = Server(('127.0.0.1', 0), Handler)
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+
+    def url(self, path):
+        return f"http://127.0.0.1:{self.httpd.server_port}{path}"
+
+    def add(self, path, status=200, body=b'', headers=None, delay=0, body_delay=0):
+        """Queue a response for path, sent after delay seconds with its body body_delay later"""
+        self.responses.setdefault(path, []).append((status, body, headers or {}, delay, body_delay))
+
+    def hits(self, path):
+        return sum(1 for _, requested in self.requests if requested == path)
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+@pytest.fixture
+def http_server():
+    server = StubServer()
+    yield server
+    server.close()
+
+
+class Clock:
+    """Stands in for the time module: time() returns now, everything else is real"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self):
+        return self.now
+
+    def __getattr__(self, name):
+        return getattr(time, name)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """A Clock standing in for time in the store and cache modules"""
+    import comment_fetcher
+    import session_store
+
+    clock = Clock()
+    monkeypatch.setattr(session_store, 'time', clock)
+    monkeypatch.setattr(comment_fetcher, 'time', clock)
+    return clock
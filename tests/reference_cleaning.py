@@ -0,0 +1,225 @@
+"""
+The original sequential clean() cascade (text_processor.py before the rules
+were compiled into passes), kept verbatim as the reference for equivalence tests
+"""
+
+import re
+from bs4 import BeautifulSoup
+
+
+def remove_emojis(text):
+    """Remove emojis from text"""
+    emoji_pattern = re.compile(
+        pattern="["
+                u"\U0001F600-\U0001F64F"  # emoticons
+                u"\U0001F300-\U0001F5FF"  # symbols & pictographs
+                u"\U0001F680-\U0001F6FF"  # transport & map symbols
+                u"\U0001F1E0-\U0001F1FF"  # flags (iOS)
+                "]+",
+        flags=re.UNICODE
+    )
+    return emoji_pattern.sub(r"", text)
+
+
+def clean(tweet): 
+    """
+    Comprehensive text cleaning function
+    Preserves all original logic from main.py
+    """
+    
+    # Special characters
+    tweet = re.sub(r"\x89Û_", "", tweet)
+    tweet = re.sub(r"\x89ÛÒ", "", tweet)
+    tweet = re.sub(r"\x89ÛÓ", "", tweet)
+    tweet = re.sub(r"\x89ÛÏWhen", "When", tweet)
+    tweet = re.sub(r"\x89ÛÏ", "", tweet)
+    tweet = re.sub(r"China\x89Ûªs", "China's", tweet)
+    tweet = re.sub(r"let\x89Ûªs", "let's", tweet)
+    tweet = re.sub(r"\x89Û÷", "", tweet)
+    tweet = re.sub(r"\x89Ûª", "", tweet)
+    tweet = re.sub(r"\x89Û\x9d", "", tweet)
+    tweet = re.sub(r"å_", "", tweet)
+    tweet = re.sub(r"\x89Û¢", "", tweet)
+    tweet = re.sub(r"\x89Û¢åÊ", "", tweet)
+    tweet = re.sub(r"fromåÊwounds", "from wounds", tweet)
+    tweet = re.sub(r"åÊ", "", tweet)
+    tweet = re.sub(r"åÈ", "", tweet)
+    tweet = re.sub(r"JapÌ_n", "Japan", tweet)    
+    tweet = re.sub(r"Ì©", "e", tweet)
+    tweet = re.sub(r"å¨", "", tweet)
+    tweet = re.sub(r"SuruÌ¤", "Suruc", tweet)
+    tweet = re.sub(r"åÇ", "", tweet)
+    tweet = re.sub(r"å£3million", "3 million", tweet)
+    tweet = re.sub(r"åÀ", "", tweet)
+    
+    # Contractions
+    tweet = re.sub(r"he's", "he is", tweet)
+    tweet = re.sub(r"there's", "there is", tweet)
+    tweet = re.sub(r"We're", "We are", tweet)
+    tweet = re.sub(r"That's", "That is", tweet)
+    tweet = re.sub(r"won't", "will not", tweet)
+    tweet = re.sub(r"they're", "they are", tweet)
+    tweet = re.sub(r"Can't", "Cannot", tweet)
+    tweet = re.sub(r"wasn't", "was not", tweet)
+    tweet = re.sub(r"don\x89Ûªt", "do not", tweet)
+    tweet = re.sub(r"aren't", "are not", tweet)
+    tweet = re.sub(r"isn't", "is not", tweet)
+    tweet = re.sub(r"What's", "What is", tweet)
+    tweet = re.sub(r"haven't", "have not", tweet)
+    tweet = re.sub(r"hasn't", "has not", tweet)
+    tweet = re.sub(r"There's", "There is", tweet)
+    tweet = re.sub(r"He's", "He is", tweet)
+    tweet = re.sub(r"It's", "It is", tweet)
+    tweet = re.sub(r"You're", "You are", tweet)
+    tweet = re.sub(r"I'M", "I am", tweet)
+    tweet = re.sub(r"shouldn't", "should not", tweet)
+    tweet = re.sub(r"wouldn't", "would not", tweet)
+    tweet = re.sub(r"i'm", "I am", tweet)
+    tweet = re.sub(r"I\x89Ûªm", "I am", tweet)
+    tweet = re.sub(r"I'm", "I am", tweet)
+    tweet = re.sub(r"Isn't", "is not", tweet)
+    tweet = re.sub(r"Here's", "Here is", tweet)
+    tweet = re.sub(r"you've", "you have", tweet)
+    tweet = re.sub(r"you\x89Ûªve", "you have", tweet)
+    tweet = re.sub(r"we're", "we are", tweet)
+    tweet = re.sub(r"what's", "what is", tweet)
+    tweet = re.sub(r"couldn't", "could not", tweet)
+    tweet = re.sub(r"we've", "we have", tweet)
+    tweet = re.sub(r"it\x89Ûªs", "it is", tweet)
+    tweet = re.sub(r"doesn\x89Ûªt", "does not", tweet)
+    tweet = re.sub(r"It\x89Ûªs", "It is", tweet)
+    tweet = re.sub(r"Here\x89Ûªs", "Here is", tweet)
+    tweet = re.sub(r"who's", "who is", tweet)
+    tweet = re.sub(r"I\x89Ûªve", "I have", tweet)
+    tweet = re.sub(r"y'all", "you all", tweet)
+    tweet = re.sub(r"can\x89Ûªt", "cannot", tweet)
+    tweet = re.sub(r"would've", "would have", tweet)
+    tweet = re.sub(r"it'll", "it will", tweet)
+    tweet = re.sub(r"we'll", "we will", tweet)
+    tweet = re.sub(r"wouldn\x89Ûªt", "would not", tweet)
+    tweet = re.sub(r"We've", "We have", tweet)
+    tweet = re.sub(r"he'll", "he will", tweet)
+    tweet = re.sub(r"Y'all", "You all", tweet)
+    tweet = re.sub(r"Weren't", "Were not", tweet)
+    tweet = re.sub(r"Didn't", "Did not", tweet)
+    tweet = re.sub(r"they'll", "they will", tweet)
+    tweet = re.sub(r"they'd", "they would", tweet)
+    tweet = re.sub(r"DON'T", "DO NOT", tweet)
+    tweet = re.sub(r"That\x89Ûªs", "That is", tweet)
+    tweet = re.sub(r"they've", "they have", tweet)
+    tweet = re.sub(r"i'd", "I would", tweet)
+    tweet = re.sub(r"should've", "should have", tweet)
+    tweet = re.sub(r"You\x89Ûªre", "You are", tweet)
+    tweet = re.sub(r"where's", "where is", tweet)
+    tweet = re.sub(r"Don\x89Ûªt", "Do not", tweet)
+    tweet = re.sub(r"we'd", "we would", tweet)
+    tweet = re.sub(r"i'll", "I will", tweet)
+    tweet = re.sub(r"weren't", "were not", tweet)
+    tweet = re.sub(r"They're", "They are", tweet)
+    tweet = re.sub(r"Can\x89Ûªt", "Cannot", tweet)
+    tweet = re.sub(r"you\x89Ûªll", "you will", tweet)
+    tweet = re.sub(r"I\x89Ûªd", "I would", tweet)
+    tweet = re.sub(r"let's", "let us", tweet)
+    tweet = re.sub(r"it's", "it is", tweet)
+    tweet = re.sub(r"can't", "cannot", tweet)
+    tweet = re.sub(r"don't", "do not", tweet)
+    tweet = re.sub(r"you're", "you are", tweet)
+    tweet = re.sub(r"i've", "I have", tweet)
+    tweet = re.sub(r"that's", "that is", tweet)
+    tweet = re.sub(r"i'll", "I will", tweet)
+    tweet = re.sub(r"doesn't", "does not", tweet)
+    tweet = re.sub(r"i'd", "I would", tweet)
+    tweet = re.sub(r"didn't", "did not", tweet)
+    tweet = re.sub(r"ain't", "am not", tweet)
+    tweet = re.sub(r"you'll", "you will", tweet)
+    tweet = re.sub(r"I've", "I have", tweet)
+    tweet = re.sub(r"Don't", "do not", tweet)
+    tweet = re.sub(r"I'll", "I will", tweet)
+    tweet = re.sub(r"I'd", "I would", tweet)
+    tweet = re.sub(r"Let's", "Let us", tweet)
+    tweet = re.sub(r"you'd", "You would", tweet)
+    tweet = re.sub(r"It's", "It is", tweet)
+    tweet = re.sub(r"Ain't", "am not", tweet)
+    tweet = re.sub(r"Haven't", "Have not", tweet)
+    tweet = re.sub(r"Could've", "Could have", tweet)
+    tweet = re.sub(r"youve", "you have", tweet)  
+    tweet = re.sub(r"donå«t", "do not", tweet)   
+            
+    # Character entity references
+    tweet = re.sub(r"&gt;", ">", tweet)
+    tweet = re.sub(r"&lt;", "<", tweet)
+    tweet = re.sub(r"&amp;", "&", tweet)
+    
+    # Typos, slang and informal abbreviations
+    tweet = re.sub(r"w/e", "whatever", tweet)
+    tweet = re.sub(r"w/", "with", tweet)
+    tweet = re.sub(r"USAgov", "USA government", tweet)
+    tweet = re.sub(r"recentlu", "recently", tweet)
+    tweet = re.sub(r"Ph0tos", "Photos", tweet)
+    tweet = re.sub(r"amirite", "am I right", tweet)
+    tweet = re.sub(r"exp0sed", "exposed", tweet)
+    tweet = re.sub(r"<3", "love", tweet)
+    tweet = re.sub(r"amageddon", "armageddon", tweet)
+    tweet = re.sub(r"Trfc", "Traffic", tweet)
+    tweet = re.sub(r"8/5/2015", "2015-08-05", tweet)
+    tweet = re.sub(r"WindStorm", "Wind Storm", tweet)
+    tweet = re.sub(r"8/6/2015", "2015-08-06", tweet)
+    tweet = re.sub(r"10:38PM", "10:38 PM", tweet)
+    tweet = re.sub(r"10:30pm", "10:30 PM", tweet)
+    tweet = re.sub(r"16yr", "16 year", tweet)
+    tweet = re.sub(r"lmao", "laughing my ass off", tweet)   
+    tweet = re.sub(r"TRAUMATISED", "traumatized", tweet)
+    
+    # Hashtags and usernames (keeping only a subset for brevity - add all from original if needed)
+    tweet = re.sub(r"IranDeal", "Iran Deal", tweet)
+    tweet = re.sub(r"ArianaGrande", "Ariana Grande", tweet)
+    tweet = re.sub(r"camilacabello97", "camila cabello", tweet) 
+    tweet = re.sub(r"RondaRousey", "Ronda Rousey", tweet)     
+    tweet = re.sub(r"MTVHottest", "MTV Hottest", tweet)
+    
+    # Urls
+    tweet = re.sub(r"https?:\/\/t.co\/[A-Za-z0-9]+", "", tweet)
+        
+    # Words with punctuations and special characters
+    punctuations = '@#!?+&*[]-%.:/();$=><|{}^' + "'`"
+    for p in punctuations:
+        tweet = tweet.replace(p, f' {p} ')
+        
+    # ... and ..
+    tweet = tweet.replace('...', ' ... ')
+    if '...' not in tweet:
+        tweet = tweet.replace('..', ' ... ')      
+        
+    # Acronyms
+    tweet = re.sub(r"MH370", "Malaysia Airlines Flight 370", tweet)
+    tweet = re.sub(r"mÌ¼sica", "music", tweet)
+    tweet = re.sub(r"okwx", "Oklahoma City Weather", tweet)
+    tweet = re.sub(r"arwx", "Arkansas Weather", tweet)    
+    tweet = re.sub(r"gawx", "Georgia Weather", tweet)  
+    tweet = re.sub(r"scwx", "South Carolina Weather", tweet)  
+    tweet = re.sub(r"cawx", "California Weather", tweet)
+    tweet = re.sub(r"tnwx", "Tennessee Weather", tweet)
+    tweet = re.sub(r"azwx", "Arizona Weather", tweet)  
+    tweet = re.sub(r"alwx", "Alabama Weather", tweet)
+    tweet = re.sub(r"wordpressdotcom", "wordpress", tweet)    
+    tweet = re.sub(r"usNWSgov", "United States National Weather Service", tweet)
+    tweet = re.sub(r"Suruc", "Sanliurfa", tweet)   
+    
+    # Grouping same words without embeddings
+    tweet = re.sub(r"Bestnaijamade", "bestnaijamade", tweet)
+    tweet = re.sub(r"SOUDELOR", "Soudelor", tweet)
+
+    # HTML CHARS
+    tweet = BeautifulSoup(tweet, 'html.parser').get_text()
+    tweet = re.sub(r'\\.', '', tweet)
+
+    # punct
+    tweet = ' '.join(re.sub(r"[\.,!?:;\-=]", " ", tweet).split())
+
+    # Lower case
+    tweet = tweet.lower()
+    
+    # emojis
+    tweet = remove_emojis(tweet)
+    
+    return tweet
@@ -0,0 +1,86 @@
+"""Flask endpoints, through the test client"""
+
+import io
+
+import pytest
+
+import app as app_module
+
+
+@pytest.fixture
+def client():
+    return app_module.app.test_client()
+
+
+def _upload(client, filename, content):
+    response = client.post('/api/analyze/upload', data={'file': (io.BytesIO(content.encode('utf-8')), filename)},
+                           content_type='multipart/form-data')
+    assert response.status_code == 200, response.get_json()
+    session_id = response.get_json()['session_id']
+    page = client.get(f'/api/session/{session_id}/comments?limit=500').get_json()
+    return [item['text'] for item in page['comments']]
+
+
+def test_csv_upload_keeps_unquoted_commas(client):
+    content = 'comment\nGreat video, loved it\n"Quoted, with ""quotes"" and\na line break"\nPlain\n'
+    assert _upload(client, 'dump.csv', content) == [
+        'Great video, loved it', 'Quoted, with "quotes" and\na line break', 'Plain'
+    ]
+
+
+def test_csv_upload_reads_the_named_comment_column(client):
+    content = 'author,comment,likes\nann,"Great video, loved it",3\nbob,Awful,0\n'
+    assert _upload(client, 'dump.csv', content) == ['Great video, loved it', 'Awful']
+
+
+def test_txt_upload_is_one_comment_per_line(client):
+    assert _upload(client, 'dump.txt', 'Great video, loved it\n\nAwful\n') == ['Great video, loved it', 'Awful']
+
+
+@pytest.mark.parametrize('value', [0, -1, 2.5, '10', True])
+def test_invalid_max_comments_is_rejected(client, value):
+    response = client.post('/api/analyze-url', json={'url': 'https://youtu.be/abc', 'max_comments': value})
+    assert response.status_code == 400
+
+
+def test_max_comments_upper_bound_is_configurable(client, monkeypatch):
+    assert app_module.fetch_options({'max_comments': None})[0]['max_count'] is None
+    monkeypatch.setattr(app_module, 'MAX_COMMENTS_PER_SOURCE', 1000)
+    assert app_module.fetch_options({'max_comments': 1000})[0]['max_count'] == 1000
+    for value in (None, 1001):
+        response = client.post('/api/analyze-url', json={'url': 'https://youtu.be/abc', 'max_comments': value})
+        assert response.status_code == 400
+
+
+def test_analyze_iter_matches_analyze_columnar_and_shares_repeated_texts():
+    comments = ['Great video, loved it', 'Awful', 'Great video, loved it', 'Meh', 'Awful']
+    whole = app_module.analyzer.analyze_columnar(comments)
+    batched = app_module.analyzer.analyze_iter(iter(comments), batch_size=2)
+    assert batched.comments() == comments
+    assert batched.texts == ['Great video, loved it', 'Awful', 'Meh']
+    assert batched.labels.tolist() == whole.labels.tolist()
+    assert batched.scores.tolist() == whole.scores.tolist()
+    assert len(app_module.analyzer.analyze_iter(iter([]))) == 0
+
+
+def test_session_endpoints_forget_an_evicted_session(client):
+    session_id = client.get('/api/demo').get_json()['session_id']
+    assert client.get(f'/api/session/{session_id}/comments').status_code == 200
+    assert session_id in app_module._session_results
+    app_module.sessions.delete(session_id)
+    for endpoint in ('summary', 'comments', 'extremes'):
+        assert client.get(f'/api/session/{session_id}/{endpoint}').status_code == 404
+    assert session_id not in app_module._session_results
+
+
+def test_summary_counts_come_from_the_session_metadata(client, monkeypatch):
+    demo = client.get('/api/demo').get_json()
+    session_id = demo['session_id']
+
+    def from_dict(data):
+        raise AssertionError('summary decoded the results')
+
+    monkeypatch.setattr(app_module.ColumnarResults, 'from_dict', from_dict)
+    summary = client.get(f'/api/session/{session_id}/summary').get_json()
+    assert summary['counts'] == demo['results']['counts']
+    assert 'results' not in summary
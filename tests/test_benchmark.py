@@ -0,0 +1,23 @@
+"""benchmark.py end to end, so it keeps up with the pipeline it times"""
+
+import json
+
+import benchmark
+import comment_fetcher
+
+
+def test_main_runs_every_benchmark_offline(tmp_path, monkeypatch):
+    def no_network(url, *args, **kwargs):
+        raise AssertionError(f'benchmark fetched {url}')
+
+    monkeypatch.setattr(comment_fetcher, '_open_uncached', no_network)
+    monkeypatch.setattr(comment_fetcher, '_fetch_uncached', no_network)
+    output = tmp_path / 'results.json'
+    argv = ['--sizes', '10', '--repeat', '1', '--fixtures', str(tmp_path / 'none'), '--output', str(output)]
+
+    assert benchmark.main(argv) == 0
+
+    results = json.loads(output.read_text())['results']
+    ran = {(result['benchmark'], result['corpus']) for result in results}
+    assert ran == {(name, corpus) for name in benchmark.BENCHMARKS for corpus in benchmark.SYNTHETIC_CORPORA}
+    assert all(result['size'] == 10 and result['comments_per_sec'] for result in results)
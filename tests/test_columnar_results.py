@@ -0,0 +1,44 @@
+"""ColumnarResults stored form"""
+
+import json
+
+import numpy as np
+import pytest
+
+from sentiment_engine import ColumnarResults, ScoreCache, SentimentAnalyzer
+
+
+@pytest.fixture(scope='module')
+def analyzer():
+    return SentimentAnalyzer(cache=ScoreCache(), model_format='lexicon')
+
+
+def _same(a, b):
+    assert a.comments() == b.comments()
+    assert np.array_equal(a.labels, b.labels)
+    assert np.array_equal(a.scores, b.scores)
+
+
+def test_round_trip_is_exact(analyzer):
+    comments = ['Great video, loved it!', 'Awful \ud800 audio', 'Great video, loved it!', 'Meh 😀', 'so so']
+    results = analyzer.analyze_columnar(comments)
+    stored = json.loads(json.dumps(results.to_dict()))
+    _same(ColumnarResults.from_dict(stored), results)
+    assert ColumnarResults.from_dict(stored).texts == results.texts
+
+
+def test_scores_only_form_takes_its_texts_from_the_comments(analyzer):
+    comments = ['Great video, loved it!', 'Awful', 'Great video, loved it!']
+    results = analyzer.analyze_columnar(comments)
+    stored = results.to_dict(texts=False)
+    assert 'texts' not in stored and 'text_ids' not in stored
+    _same(ColumnarResults.from_dict(stored, iter(comments)), results)
+    with pytest.raises(ValueError):
+        ColumnarResults.from_dict(stored, comments[:2])
+
+
+def test_stored_form_is_smaller_than_the_texts(analyzer):
+    comments = [f"comment {n} says the video was {'great' if n % 3 else 'awful'}" for n in range(5000)]
+    results = analyzer.analyze_columnar(comments)
+    size = len(json.dumps(results.to_dict()))
+    assert size * 3 < len(json.dumps(comments))
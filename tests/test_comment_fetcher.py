@@ -0,0 +1,195 @@
+"""FetchCache and open_comments"""
+
+import time
+
+import pytest
+import requests
+
+import comment_fetcher
+from comment_fetcher import FetchCache, NotModified
+from session_store import MemorySessionStore
+
+URL = 'https://www.reddit.com/r/test/comments/abc/post/'
+
+
+class Opener:
+    """Serves comments in pages, counting opens; 304 once validators are set"""
+
+    def __init__(self, pages, etag=None):
+        self.pages = pages
+        self.etag = etag
+        self.opens = 0
+
+    def __call__(self, url, validators):
+        self.opens += 1
+        if self.etag and validators.get('etag') == self.etag:
+            raise NotModified(url)
+        if validators is not None:
+            validators['etag'] = self.etag
+        return 'title', iter(self.pages)
+
+
+def test_open_stores_once_every_page_is_read():
+    cache = FetchCache(MemorySessionStore())
+    opener = Opener([['a', 'b'], ['c']])
+
+    title, pages = cache.open(URL, opener)
+    assert next(pages) == ['a', 'b']
+    assert cache.store.get('reddit:abc') is None
+    assert list(pages) == [['c']]
+    assert cache.store.get('reddit:abc')['result'] == {'title': 'title', 'comments': ['a', 'b', 'c']}
+
+    title, pages = cache.open(URL, opener)
+    assert (title, list(pages)) == ('title', [['a', 'b', 'c']])
+    assert opener.opens == 1
+    assert cache.stats()['hits'] == 1
+
+
+def test_open_serves_a_revalidated_entry(monkeypatch):
+    cache = FetchCache(MemorySessionStore())
+    opener = Opener([['a'], ['b']], etag='v1')
+    list(cache.open(URL, opener)[1])
+
+    monkeypatch.setitem(comment_fetcher.FETCH_CACHE_TTL, 'reddit', 0)
+    title, pages = cache.open(URL, opener)
+    assert list(pages) == [['a', 'b']]
+    assert opener.opens == 2
+    assert cache.stats()['revalidated'] == 1
+
+
+def test_open_stores_nothing_for_an_unfinished_download():
+    cache = FetchCache(MemorySessionStore())
+
+    def pages():
+        yield ['a']
+        raise ConnectionError('reset')
+
+    _, opened = cache.open(URL, lambda url, validators: ('title', pages()))
+    with pytest.raises(ConnectionError):
+        list(opened)
+    assert cache.store.get('reddit:abc') is None
+
+
+VIDEO = 'https://www.youtube.com/watch?v=abc'
+
+
+@pytest.fixture
+def video(monkeypatch):
+    """A YouTube video with 450 comments, served without the network"""
+    class Downloader:
+        def get_comments(self, video_id, sort_by=None):
+            for i in range(450):
+                yield {'cid': f'c{i}', 'text': f'comment {i}', 'reply': False}
+
+    monkeypatch.setattr(comment_fetcher, '_youtube_downloader', Downloader)
+
+
+@pytest.mark.parametrize('options, expected', [
+    ({}, comment_fetcher.YOUTUBE_MAX_COMMENTS),
+    ({'max_count': None}, 450),
+    ({'max_count': 300}, 300),
+])
+def test_youtube_comment_cap(video, options, expected):
+    result, error = comment_fetcher.fetch_comments(VIDEO, use_cache=False, **options)
+    assert error is None and len(result['comments']) == expected
+    title, pages = comment_fetcher.open_comments(VIDEO, use_cache=False, **options)
+    assert sum(len(page) for page in pages) == expected
+
+
+def test_source_key_names_options_other_than_the_defaults():
+    assert comment_fetcher.source_key(VIDEO) == 'youtube:abc'
+    assert comment_fetcher.source_key(VIDEO, comment_fetcher.YOUTUBE_MAX_COMMENTS) == 'youtube:abc'
+    assert comment_fetcher.source_key(VIDEO, None, 'popular') == 'youtube:abc?max=all&sort=popular'
+    assert comment_fetcher.source_key(URL, 50) == 'reddit:abc?max=50'
+
+
+@pytest.fixture
+def fast_retries(monkeypatch):
+    """One retry, no backoff and a short read timeout for adapters created afterwards"""
+    monkeypatch.setattr(comment_fetcher, 'HTTP_TIMEOUT', (1, 0.3))
+    monkeypatch.setattr(comment_fetcher, 'HTTP_RETRIES', 1)
+    monkeypatch.setattr(comment_fetcher, 'HTTP_BACKOFF', 0)
+
+
+def test_youtube_session_applies_the_default_timeout(http_server, fast_retries):
+    http_server.add('/watch', body=b'late', delay=2)
+    session = comment_fetcher._YoutubeDownloader().session
+    start = time.monotonic()
+    with pytest.raises(requests.RequestException):
+        session.get(http_server.url('/watch'))
+    assert time.monotonic() - start < 1.5
+    assert http_server.hits('/watch') == 2
+
+
+def test_youtube_continuations_are_retried_once_by_the_adapter(http_server, fast_retries):
+    downloader = comment_fetcher._YoutubeDownloader()
+    downloader.origin = http_server.url('')
+    endpoint = {'commandMetadata': {'webCommandMetadata': {'apiUrl': '/next'}},
+                'continuationCommand': {'token': 'token'}}
+    ytcfg = {'INNERTUBE_CONTEXT': {}, 'INNERTUBE_API_KEY': 'key'}
+
+    http_server.add('/next', status=503)
+    http_server.add('/next', body=b'{"ok": true}')
+    assert downloader.ajax_request(endpoint, ytcfg) == {'ok': True}
+    assert http_server.hits('/next') == 2
+
+    http_server.responses.pop('/next')
+    http_server.add('/next', status=503)
+    start = time.monotonic()
+    with pytest.raises(comment_fetcher.FetchError):
+        downloader.ajax_request(endpoint, ytcfg)
+    assert time.monotonic() - start < 1
+    assert http_server.hits('/next') == 4
+
+
+class Fetcher:
+    """fetch_comments stand-in counting fetches and the validators it was given"""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, url, validators):
+        self.calls.append(dict(validators or {}))
+        if validators is not None:
+            validators['etag'] = 'v1'
+        return {'title': 'title', 'comments': [f'comment {len(self.calls)}']}, None
+
+
+def test_fetch_is_served_from_cache_within_the_platform_ttl(clock):
+    cache = FetchCache(MemorySessionStore())
+    fetcher = Fetcher()
+    first, _ = cache.fetch(URL, fetcher)
+    clock.now += comment_fetcher.FETCH_CACHE_TTL['reddit'] - 1
+    assert cache.fetch(URL, fetcher) == (first, None)
+    assert len(fetcher.calls) == 1
+
+    clock.now += 1
+    second, _ = cache.fetch(URL, fetcher)
+    assert second['comments'] == ['comment 2']
+    # The stale entry's validators go with the new request
+    assert fetcher.calls == [{}, {'etag': 'v1'}]
+    assert cache.stats()['hits'] == 1 and cache.stats()['misses'] == 2
+
+
+def test_fetch_cache_entries_are_dropped_after_retention(clock):
+    cache = FetchCache(MemorySessionStore(ttl=comment_fetcher.FETCH_CACHE_RETENTION))
+    fetcher = Fetcher()
+    cache.fetch(URL, fetcher)
+    clock.now += comment_fetcher.FETCH_CACHE_RETENTION
+    cache.fetch(URL, fetcher)
+    # Nothing left to revalidate against
+    assert fetcher.calls == [{}, {}]
+
+
+def test_open_is_served_from_cache_within_the_platform_ttl(clock):
+    cache = FetchCache(MemorySessionStore())
+    opener = Opener([['a', 'b'], ['c']])
+    title, pages = cache.open(URL, opener)
+    assert list(pages) == [['a', 'b'], ['c']]
+    clock.now += comment_fetcher.FETCH_CACHE_TTL['reddit'] - 1
+    title, pages = cache.open(URL, opener)
+    assert list(pages) == [['a', 'b', 'c']]
+    assert opener.opens == 1
+    clock.now += 1
+    assert list(cache.open(URL, opener)[1]) == [['a', 'b'], ['c']]
+    assert opener.opens == 2
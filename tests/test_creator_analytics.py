@@ -0,0 +1,259 @@
+"""CreatorAnalyzer fetch -> score pipeline"""
+
+import threading
+import time
+
+import pytest
+
+import comment_fetcher
+import creator_analytics
+from creator_analytics import CreatorAnalyzer, SourceResults
+from sentiment_engine import ScoreCache, SentimentAnalyzer
+from session_store import MemorySessionStore
+
+
+class SlowAnalyzer(SentimentAnalyzer):
+    """Scores like SentimentAnalyzer, taking delay seconds per batch"""
+
+    def __init__(self, delay):
+        super().__init__(cache=ScoreCache(), model_format='lexicon')
+        self.delay = delay
+
+    def analyze_columnar(self, comments):
+        time.sleep(self.delay)
+        return super().analyze_columnar(comments)
+
+
+def _comments(url, count):
+    return [f"{url} comment {n} is great" for n in range(count)]
+
+
+@pytest.fixture
+def fetches(monkeypatch):
+    """URL -> seconds its download takes; open_comments serves 20 comments in pages of 5"""
+    delays = {}
+
+    def open_comments(url, use_cache=True, **options):
+        comments = _comments(url, 20)
+
+        def pages():
+            for start in range(0, len(comments), 5):
+                time.sleep(delays.get(url, 0) / 4)
+                yield comments[start:start + 5]
+        return url, pages()
+
+    monkeypatch.setattr(creator_analytics, 'open_comments', open_comments)
+    monkeypatch.setattr(creator_analytics, 'SCORE_CHUNK_SIZE', 5)
+    monkeypatch.setattr(creator_analytics, 'PIPELINE_DEPTH', 1)
+    return delays
+
+
+def _creator_analyzer(delay, fetch_deadline):
+    return CreatorAnalyzer(SlowAnalyzer(delay), fetch_deadline=fetch_deadline,
+                           sources=SourceResults(MemorySessionStore()))
+
+
+def test_deadline_spares_sources_waiting_on_scoring(fetches):
+    urls = [f"https://www.reddit.com/r/test/comments/abc{n}/post/" for n in range(3)]
+    creator = _creator_analyzer(delay=0.1, fetch_deadline=0.5)
+    result = creator.analyze_creator('test', urls, [{'platform': 'instagram', 'text': 'nice\nbad'}])
+    assert result['errors'] == []
+    assert result['stats']['total_count'] == 62
+
+
+def test_deadline_fails_sources_still_downloading(fetches):
+    slow, fast = 'https://www.reddit.com/r/test/comments/slow/post/', 'https://www.reddit.com/r/test/comments/fast/post/'
+    fetches[slow] = 2
+    creator = _creator_analyzer(delay=0, fetch_deadline=0.5)
+    result = creator.analyze_creator('test', [slow, fast])
+    assert len(result['errors']) == 1 and slow in result['errors'][0]
+    assert 'deadline' in result['errors'][0]
+    assert result['stats']['total_count'] == 20
+
+
+def test_abandoned_download_stops_at_its_next_page(monkeypatch):
+    url = 'https://www.reddit.com/r/test/comments/endless/post/'
+    pages_read = []
+    endless = threading.Event()
+
+    def open_comments(url, use_cache=True, **options):
+        def pages():
+            for n in range(10 ** 6 if endless.is_set() else 1):
+                time.sleep(0.02)
+                pages_read.append(n)
+                yield _comments(f"{url} page {n}", 5)
+        return url, pages()
+
+    monkeypatch.setattr(creator_analytics, 'open_comments', open_comments)
+    # Stored results are always stale, so the second analysis downloads in full to compare
+    monkeypatch.setitem(comment_fetcher.FETCH_CACHE_TTL, 'reddit', 0)
+    creator = CreatorAnalyzer(SlowAnalyzer(0), url_timeout=0.2, sources=SourceResults(MemorySessionStore()))
+    assert creator.analyze_creator('test', [url])['errors'] == []
+
+    endless.set()
+    result = creator.analyze_creator('test', [url])
+    assert len(result['errors']) == 1 and 'timed out' in result['errors'][0]
+    read = len(pages_read)
+    time.sleep(0.2)
+    assert len(pages_read) <= read + 1
+
+
+def test_pages_are_scored_while_the_source_downloads(monkeypatch):
+    scored = []
+    last_page_read = threading.Event()
+
+    def open_comments(url, use_cache=True, **options):
+        def pages():
+            for n in range(4):
+                if n == 3:
+                    # The first chunks are scored before the last page arrives
+                    deadline = time.monotonic() + 5
+                    while len(scored) < 2 and time.monotonic() < deadline:
+                        time.sleep(0.01)
+                    last_page_read.set()
+                yield _comments(f"{url} page {n}", 5)
+        return url, pages()
+
+    class RecordingAnalyzer(SlowAnalyzer):
+        def analyze_columnar(self, comments):
+            scored.append(last_page_read.is_set())
+            return super().analyze_columnar(comments)
+
+    monkeypatch.setattr(creator_analytics, 'open_comments', open_comments)
+    monkeypatch.setattr(creator_analytics, 'SCORE_CHUNK_SIZE', 5)
+    creator = CreatorAnalyzer(RecordingAnalyzer(0), sources=SourceResults(MemorySessionStore()))
+    result = creator.analyze_creator('test', ['https://www.youtube.com/watch?v=abc'])
+    assert result['stats']['total_count'] == 20
+    assert scored[:2] == [False, False]
+
+
+def test_chunks_are_large_enough_for_the_process_pool():
+    creator = CreatorAnalyzer(SentimentAnalyzer(workers=4, parallel_threshold=5000, cache=ScoreCache(),
+                                                model_format='lexicon'))
+    assert creator._chunk_size() >= creator.analyzer.parallel_threshold
+    creator = CreatorAnalyzer(SentimentAnalyzer(workers=1, cache=ScoreCache(), model_format='lexicon'))
+    assert creator._chunk_size() == creator_analytics.SCORE_CHUNK_SIZE
+
+
+def test_manual_text_is_scored_in_chunks_and_reused(monkeypatch):
+    monkeypatch.setattr(creator_analytics, 'SCORE_CHUNK_SIZE', 7)
+    lines = [f"line {n} is {'great' if n % 2 else 'awful'}" for n in range(50)]
+    text = '\n\n'.join(lines) + '\n   \n'
+    sources = SourceResults(MemorySessionStore())
+    batches = []
+
+    class RecordingAnalyzer(SlowAnalyzer):
+        def analyze_columnar(self, comments):
+            batches.append(len(comments))
+            return super().analyze_columnar(comments)
+
+    creator = CreatorAnalyzer(RecordingAnalyzer(0), sources=sources)
+
+    result = creator.analyze_creator('test', [], [{'platform': 'instagram', 'text': text}, {'text': ' \n '}])
+    assert result['stats']['total_count'] == 50
+    assert list(result['stats']['comments'].texts) == lines
+    assert batches == [7] * 7 + [1]
+    assert sources.get(f"manual:{creator_analytics.content_hash(lines)}") is not None
+
+    batches.clear()
+    again = creator.analyze_creator('test', [], [{'platform': 'instagram', 'text': text}])
+    assert again['stats']['counts'] == result['stats']['counts']
+    assert batches == []
+
+
+class FakeDownloader:
+    """Serves a video's comments newest first, counting those handed out"""
+
+    def __init__(self):
+        self.comments = []
+        self.served = 0
+
+    def post(self, *texts):
+        for text in texts:
+            self.comments.insert(0, {'cid': f"c{len(self.comments)}", 'text': text, 'reply': False})
+
+    def get_comments(self, video_id, sort_by=None):
+        for comment in self.comments:
+            self.served += 1
+            yield comment
+
+
+@pytest.fixture
+def youtube(monkeypatch):
+    downloader = FakeDownloader()
+    monkeypatch.setattr(comment_fetcher, '_youtube_downloader', lambda: downloader)
+    monkeypatch.setattr(comment_fetcher, 'fetch_cache', comment_fetcher.FetchCache(MemorySessionStore()))
+    # Stored results and cached fetches are always stale, so every analysis goes to the "network"
+    monkeypatch.setitem(comment_fetcher.FETCH_CACHE_TTL, 'youtube', 0)
+    return downloader
+
+
+@pytest.mark.parametrize('max_count, expected', [(comment_fetcher.PLATFORM_DEFAULT, 5), (None, 5), (4, 4)])
+def test_resumed_youtube_fetch_is_merged_with_stored_results(youtube, max_count, expected):
+    url = 'https://www.youtube.com/watch?v=abc'
+    batches = []
+
+    class RecordingAnalyzer(SlowAnalyzer):
+        def analyze_columnar(self, comments):
+            batches.append(list(comments))
+            return super().analyze_columnar(comments)
+
+    sources = SourceResults(MemorySessionStore())
+    creator = CreatorAnalyzer(RecordingAnalyzer(0), sources=sources)
+
+    youtube.post('first is great', 'second is awful', 'third is fine')
+    result = creator.analyze_creator('test', [url], max_count=max_count)
+    assert result['stats']['total_count'] == 3
+
+    youtube.post('fourth is lovely', 'fifth is terrible')
+    youtube.served = 0
+    batches.clear()
+    result = creator.analyze_creator('test', [url], max_count=max_count)
+
+    newest_first = [comment['text'] for comment in youtube.comments][:expected]
+    assert list(result['stats']['comments'].comments()) == newest_first
+    assert result['stats']['total_count'] == expected
+    # Only the new comments were downloaded (up to the first stored one) and scored
+    assert youtube.served == 3
+    assert batches == [['fifth is terrible', 'fourth is lovely']]
+    key = comment_fetcher.source_key(url, max_count)
+    assert sources.get(key)['content_hash'] == creator_analytics.content_hash(newest_first)
+
+    # Nothing new: the stored results are served as they are
+    youtube.served = 0
+    batches.clear()
+    again = creator.analyze_creator('test', [url], max_count=max_count)
+    assert list(again['stats']['comments'].comments()) == newest_first
+    assert youtube.served == 1 and batches == []
+
+
+def test_stored_sources_keep_scores_and_read_texts_from_the_fetch_cache(youtube, monkeypatch):
+    monkeypatch.setitem(comment_fetcher.FETCH_CACHE_TTL, 'youtube', 900)
+    url = 'https://www.youtube.com/watch?v=abc'
+    key = comment_fetcher.source_key(url)
+    batches = []
+
+    class RecordingAnalyzer(SlowAnalyzer):
+        def analyze_columnar(self, comments):
+            batches.append(list(comments))
+            return super().analyze_columnar(comments)
+
+    sources = SourceResults(MemorySessionStore())
+    creator = CreatorAnalyzer(RecordingAnalyzer(0), sources=sources)
+    youtube.post('first is great', 'second is awful')
+    comments = list(creator.analyze_creator('test', [url])['stats']['comments'].comments())
+    assert comments == ['second is awful', 'first is great']
+    assert 'texts' not in sources.get(key)['results']
+
+    # Fresh: the texts come from the fetch cache, with nothing fetched or scored
+    youtube.served = 0
+    batches.clear()
+    again = creator.analyze_creator('test', [url])
+    assert list(again['stats']['comments'].comments()) == comments
+    assert youtube.served == 0 and batches == []
+
+    # Without the cached texts the video is downloaded again, but not re-scored
+    comment_fetcher.fetch_cache.store.delete(key)
+    again = creator.analyze_creator('test', [url])
+    assert list(again['stats']['comments'].comments()) == comments
+    assert youtube.served == 2 and batches == []
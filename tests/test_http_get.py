@@ -0,0 +1,72 @@
+"""http_get against a local stub server: retries, timeouts and FetchMetrics"""
+
+import time
+
+import pytest
+import requests
+
+import comment_fetcher
+from comment_fetcher import FetchMetrics, http_get
+
+
+@pytest.fixture
+def metrics(monkeypatch):
+    """Fresh metrics, and a session with one retry, 0.2s backoff and a 0.5s read timeout"""
+    monkeypatch.setattr(comment_fetcher, 'HTTP_TIMEOUT', (1, 0.5))
+    monkeypatch.setattr(comment_fetcher, 'HTTP_RETRIES', 1)
+    monkeypatch.setattr(comment_fetcher, 'HTTP_BACKOFF', 0.2)
+    monkeypatch.setattr(comment_fetcher, 'http_session', comment_fetcher.create_http_session())
+    fresh = FetchMetrics()
+    monkeypatch.setattr(comment_fetcher, 'fetch_metrics', fresh)
+    return fresh
+
+
+def test_counts_requests_bytes_and_reused_connections(http_server, metrics):
+    http_server.add('/thread.json', body=b'x' * 5000)
+    for _ in range(2):
+        assert http_get(http_server.url('/thread.json')).content == b'x' * 5000
+    stats = metrics.stats()
+    assert stats['requests'] == 2 and stats['bytes'] == 10000
+    assert stats['connections'] == 1 and stats['connection_reuse'] == 0.5
+    assert stats['errors'] == 0 and stats['retries'] == 0 and stats['retry_seconds'] == 0
+
+
+def test_retries_a_failed_status_and_reports_it_apart(http_server, metrics):
+    http_server.add('/thread.json', status=503, delay=0.3)
+    http_server.add('/thread.json', body=b'ok')
+    response = http_get(http_server.url('/thread.json'))
+    assert response.status_code == 200 and response.content == b'ok'
+    assert http_server.hits('/thread.json') == 2
+    stats = metrics.stats()
+    assert stats['requests'] == 1 and stats['retries'] == 1
+    # The slow failed attempt is retry time, not response or transfer time
+    assert stats['retry_seconds'] >= 0.3
+    assert stats['response_seconds'] < 0.2 and stats['transfer_seconds'] < 0.2
+
+
+def test_returns_the_last_response_once_retries_run_out(http_server, metrics):
+    http_server.add('/thread.json', status=503)
+    response = http_get(http_server.url('/thread.json'))
+    assert response.status_code == 503
+    assert http_server.hits('/thread.json') == 2
+    assert metrics.stats()['retries'] == 1
+
+
+def test_times_the_body_as_transfer(http_server, metrics):
+    http_server.add('/thread.json', body=b'late body', body_delay=0.3)
+    assert http_get(http_server.url('/thread.json')).content == b'late body'
+    stats = metrics.stats()
+    assert stats['transfer_seconds'] >= 0.3
+    assert stats['response_seconds'] < 0.2 and stats['retry_seconds'] < 0.2
+
+
+def test_read_timeout_is_retried_then_counted_as_an_error(http_server, metrics):
+    http_server.add('/thread.json', body=b'too late', delay=2)
+    start = time.monotonic()
+    with pytest.raises(requests.RequestException):
+        http_get(http_server.url('/thread.json'))
+    # Two attempts of 0.5s each and one backoff, nowhere near the server's 2s
+    assert time.monotonic() - start < 1.8
+    assert http_server.hits('/thread.json') == 2
+    stats = metrics.stats()
+    assert stats['errors'] == 1 and stats['requests'] == 0
@@ -0,0 +1,201 @@
+"""JobQueue versioning and wait/notify, and the 202 job endpoints"""
+
+import json
+import threading
+import time
+
+import pytest
+
+import app as app_module
+from job_queue import DONE, FAILED, QUEUED, JobError, JobQueue
+
+
+class Gate:
+    """A job function that reports progress, then blocks until released"""
+
+    def __init__(self):
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def __call__(self, value, progress):
+        progress(step=1)
+        self.started.set()
+        assert self.release.wait(10)
+        if value == 'fail':
+            raise JobError('Nothing to analyze')
+        return {'value': value}
+
+
+@pytest.fixture
+def queue():
+    return JobQueue()
+
+
+@pytest.fixture
+def gate():
+    gate = Gate()
+    yield gate
+    gate.release.set()
+
+
+def _wait_for(queue, job_id, status):
+    job = queue.get(job_id)
+    while job['status'] != status:
+        job = queue.wait(job_id, job['version'], timeout=5)
+    return job
+
+
+def test_updates_bump_the_version_and_finish_with_the_result(queue, gate):
+    job_id = queue.submit('test', gate, 'x')
+    assert gate.started.wait(5)
+    running = queue.get(job_id)
+    # running, then the progress report
+    assert (running['status'], running['version'], running['progress']) == ('running', 2, {'step': 1})
+    gate.release.set()
+    job = _wait_for(queue, job_id, DONE)
+    assert (job['version'], job['result'], job['error']) == (3, {'value': 'x'}, None)
+    # The record handed out earlier is never mutated
+    assert running['status'] == 'running'
+
+
+def test_failed_job_keeps_the_message(queue, gate):
+    job_id = queue.submit('test', gate, 'fail')
+    gate.release.set()
+    job = _wait_for(queue, job_id, FAILED)
+    assert (job['error'], job['result']) == ('Nothing to analyze', None)
+
+
+def test_wait_returns_at_once_when_already_past_version(queue, gate):
+    job_id = queue.submit('test', gate, 'x')
+    assert gate.started.wait(5)
+    started = time.monotonic()
+    assert queue.wait(job_id, version=0, timeout=5)['version'] == 2
+    assert time.monotonic() - started < 1
+
+
+def test_wait_times_out_with_the_unchanged_job(queue, gate):
+    job_id = queue.submit('test', gate, 'x')
+    assert gate.started.wait(5)
+    started = time.monotonic()
+    job = queue.wait(job_id, version=2, timeout=0.3)
+    assert job['version'] == 2
+    assert 0.3 <= time.monotonic() - started < 2
+
+
+def test_wait_is_woken_by_an_update(queue, gate):
+    job_id = queue.submit('test', gate, 'x')
+    assert gate.started.wait(5)
+    threading.Timer(0.2, gate.release.set).start()
+    started = time.monotonic()
+    job = queue.wait(job_id, version=2, timeout=10)
+    assert job['status'] == DONE
+    assert time.monotonic() - started < 2
+
+
+def test_unknown_job(queue):
+    assert queue.get('missing') is None
+    assert queue.wait('missing', timeout=5) is None
+
+
+# Endpoints
+
+@pytest.fixture
+def client(monkeypatch, queue):
+    monkeypatch.setattr(app_module, 'jobs', queue)
+    return app_module.app.test_client()
+
+
+@pytest.fixture
+def fetched(monkeypatch):
+    """fetch_comments that waits on a gate, so tests see the job mid-flight"""
+    gate = threading.Event()
+
+    def fetch_comments(url, **options):
+        assert gate.wait(10)
+        return {'title': 'Post', 'comments': ['Great video, loved it', 'Awful']}, None
+
+    monkeypatch.setattr(app_module, 'fetch_comments', fetch_comments)
+    yield gate
+    gate.set()
+
+
+def _submit(client):
+    response = client.post('/api/analyze-url', json={'url': 'https://www.reddit.com/r/test/comments/abc/post/'})
+    assert response.status_code == 202
+    body = response.get_json()
+    assert body['status'] == QUEUED
+    return body['job_id']
+
+
+def _events(response):
+    events = []
+    for block in response.get_data(as_text=True).split('\n\n'):
+        fields = dict(line.split(': ', 1) for line in block.splitlines() if not line.startswith(':'))
+        if 'event' in fields:
+            events.append((int(fields['id']) if 'id' in fields else None, fields['event'], json.loads(fields['data'])))
+    return events
+
+
+def test_submit_poll_done(client, fetched):
+    job_id = _submit(client)
+    job = client.get(f'/api/jobs/{job_id}').get_json()
+    assert job['type'] == 'url'
+    fetched.set()
+    while job['status'] != DONE:
+        response = client.get(f"/api/jobs/{job_id}?version={job['version']}&timeout=5")
+        assert response.status_code == 200
+        job = response.get_json()
+        assert job['status'] != FAILED, job['error']
+    assert job['result']['title'] == 'Post'
+    assert job['progress']['comments_scored'] == 2
+    summary = client.get(f"/api/session/{job['result']['session_id']}/summary")
+    assert summary.status_code == 200
+
+
+def test_long_poll_times_out_with_the_unchanged_job(client, fetched, monkeypatch):
+    monkeypatch.setattr(app_module, 'JOB_POLL_MAX_TIMEOUT', 0.3)
+    job_id = _submit(client)
+    job = client.get(f'/api/jobs/{job_id}?version=0&timeout=5').get_json()
+    started = time.monotonic()
+    # timeout is capped at JOB_POLL_MAX_TIMEOUT
+    response = client.get(f"/api/jobs/{job_id}?version={job['version']}&timeout=60")
+    assert 0.3 <= time.monotonic() - started < 2
+    assert response.get_json()['version'] == job['version']
+
+
+def test_unknown_job_is_404(client):
+    assert client.get('/api/jobs/missing').status_code == 404
+    assert client.get('/api/jobs/missing?version=0&timeout=1').status_code == 404
+    assert client.get('/api/jobs/missing/events').status_code == 404
+
+
+def test_event_stream_ends_with_done(client, fetched):
+    job_id = _submit(client)
+    fetched.set()
+    response = client.get(f'/api/jobs/{job_id}/events')
+    assert response.mimetype == 'text/event-stream'
+    assert response.get_data(as_text=True).startswith(f'retry: {app_module.EVENT_RETRY_MS}\n\n')
+    events = _events(response)
+    assert [event for _, event, _ in events[:-1]] == ['progress'] * (len(events) - 1)
+    version, event, job = events[-1]
+    assert (event, job['status'], version) == (DONE, DONE, job['version'])
+    # Event ids are increasing versions
+    ids = [version for version, _, _ in events]
+    assert ids == sorted(set(ids))
+
+    # Reconnecting with Last-Event-ID resumes after that version
+    resumed = _events(client.get(f'/api/jobs/{job_id}/events', headers={'Last-Event-ID': str(version - 1)}))
+    assert [(version, event) for version, event, _ in resumed] == [(version, DONE)]
+
+
+def test_event_stream_closes_after_its_duration(client, fetched, monkeypatch):
+    monkeypatch.setattr(app_module, 'EVENT_STREAM_DURATION', 0.5)
+    monkeypatch.setattr(app_module, 'EVENT_KEEPALIVE', 0.2)
+    job_id = _submit(client)
+    started = time.monotonic()
+    response = client.get(f'/api/jobs/{job_id}/events')
+    body = response.get_data(as_text=True)
+    assert 0.5 <= time.monotonic() - started < 3
+    # The job is still running: progress events then keep-alives, no done
+    assert ': keep-alive' in body
+    assert all(event == 'progress' for _, event, _ in _events(response))
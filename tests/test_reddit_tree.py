@@ -0,0 +1,109 @@
+"""Reddit comment tree walking and "more" stub expansion, with http_get stubbed out"""
+
+import pytest
+
+import comment_fetcher
+from comment_fetcher import RedditFetchError, open_reddit_thread
+
+URL = 'https://www.reddit.com/r/test/comments/abc/post/'
+
+
+def comment(body, depth, replies=()):
+    return {'kind': 't1', 'data': {
+        'body': body, 'depth': depth,
+        'replies': {'data': {'children': list(replies)}} if replies else ''
+    }}
+
+
+def more(depth, *ids):
+    return {'kind': 'more', 'data': {'depth': depth, 'children': list(ids)}}
+
+
+class Response:
+    def __init__(self, payload, status_code=200, headers=None):
+        self.payload = payload
+        self.status_code = status_code
+        self.headers = headers or {}
+
+    def json(self):
+        return self.payload
+
+
+class FakeReddit:
+    """Serves one thread and its morechildren batches, recording the requests"""
+
+    def __init__(self, children, more_things):
+        self.children = children
+        self.more_things = more_things
+        self.requests = []
+
+    def __call__(self, url, params=None, headers=None):
+        self.requests.append((url, dict(params or {})))
+        if url.endswith('/api/morechildren.json'):
+            assert params['link_id'] == 't3_abc'
+            things = [thing for comment_id in params['children'].split(',')
+                      for thing in self.more_things.get(comment_id, [])]
+            return Response({'json': {'data': {'things': things}}})
+        post = {'data': {'children': [{'kind': 't3', 'data': {'title': 'Post', 'name': 't3_abc'}}]}}
+        return Response([post, {'data': {'children': self.children}}])
+
+    def batches(self):
+        return [params['children'] for url, params in self.requests if 'morechildren' in url]
+
+
+@pytest.fixture
+def reddit(monkeypatch):
+    # morechildren returns a flat list with each thing's depth; a "more" thing can lead to further batches
+    fake = FakeReddit(
+        children=[
+            comment('c1', 0, [comment('c1a', 1, [comment('c1a1', 2)]), comment('[deleted]', 1)]),
+            comment('c2', 0, [more(1, 'r1')]),
+            more(0, 'm1', 'm2'),
+            # "Continue this thread" stubs carry no ids
+            more(1, '_'),
+        ],
+        more_things={
+            'm1': [comment('m1', 0), comment('m1 reply', 1), more(1, 'm3')],
+            'm2': [comment('m2', 0)],
+            'm3': [comment('m3', 1)],
+            'r1': [comment('r1', 1)],
+        },
+    )
+    monkeypatch.setattr(comment_fetcher, 'http_get', fake)
+    return fake
+
+
+def test_walks_depth_first_then_expands_more_stubs_in_order(reddit):
+    title, comments = open_reddit_thread(URL, max_depth=None, max_count=None)
+    assert title == 'Post'
+    assert list(comments) == ['c1', 'c1a', 'c1a1', 'c2', 'r1', 'm1', 'm1 reply', 'm2', 'm3']
+    assert reddit.requests[0] == ('https://www.reddit.com/r/test/comments/abc/post/.json',
+                                  {'limit': comment_fetcher.REDDIT_PAGE_LIMIT})
+    # Stubs found while walking the page share one batch; m3 only turns up in its results
+    assert reddit.batches() == ['r1,m1,m2', 'm3']
+
+
+def test_more_ids_are_batched(reddit, monkeypatch):
+    monkeypatch.setattr(comment_fetcher, 'REDDIT_MORE_BATCH', 2)
+    assert list(open_reddit_thread(URL, max_depth=None, max_count=None)[1]) == [
+        'c1', 'c1a', 'c1a1', 'c2', 'r1', 'm1', 'm1 reply', 'm2', 'm3'
+    ]
+    assert reddit.batches() == ['r1,m1', 'm2', 'm3']
+
+
+def test_max_depth_zero_keeps_top_level_comments_only(reddit):
+    assert list(open_reddit_thread(URL, max_depth=0, max_count=None)[1]) == ['c1', 'c2', 'm1', 'm2']
+    # Stubs below the cutoff are never requested
+    assert reddit.batches() == ['m1,m2']
+
+
+def test_max_count_stops_the_walk(reddit):
+    assert list(open_reddit_thread(URL, max_depth=None, max_count=5)[1]) == ['c1', 'c1a', 'c1a1', 'c2', 'r1']
+    assert list(open_reddit_thread(URL, max_depth=None, max_count=3)[1]) == ['c1', 'c1a', 'c1a1']
+    assert reddit.batches() == ['r1,m1,m2']
+
+
+def test_failed_first_page_raises(monkeypatch):
+    monkeypatch.setattr(comment_fetcher, 'http_get', lambda url, **kwargs: Response(None, status_code=429))
+    with pytest.raises(RedditFetchError):
+        open_reddit_thread(URL)
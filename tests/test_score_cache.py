@@ -0,0 +1,47 @@
+"""ScoreCache LRU bounds and counters"""
+
+from sentiment_engine import ScoreCache
+
+SCORES = {'neg': 0.0, 'neu': 1.0, 'pos': 0.0, 'compound': 0.0}
+
+
+def test_least_recently_used_entry_is_evicted_at_maxsize():
+    cache = ScoreCache(maxsize=3)
+    keys = [ScoreCache.key(f'comment {n}') for n in range(4)]
+    for key in keys[:3]:
+        cache.put(key, 'cleaned', SCORES)
+    assert cache.get(keys[0]) == ('cleaned', SCORES)
+    cache.put(keys[3], 'cleaned', SCORES)
+    assert cache.get(keys[1]) is None
+    assert all(cache.get(key) is not None for key in (keys[0], keys[2], keys[3]))
+    assert cache.stats()['size'] == 3
+
+
+def test_putting_an_existing_key_refreshes_it():
+    cache = ScoreCache(maxsize=2)
+    a, b, c = (ScoreCache.key(text) for text in 'abc')
+    cache.put(a, 'a', SCORES)
+    cache.put(b, 'b', SCORES)
+    cache.put(a, 'a again', SCORES)
+    cache.put(c, 'c', SCORES)
+    assert cache.get(b) is None
+    assert cache.get(a) == ('a again', SCORES)
+
+
+def test_zero_maxsize_stores_nothing_and_counts_misses():
+    cache = ScoreCache(maxsize=0)
+    key = ScoreCache.key('comment')
+    cache.put(key, 'comment', SCORES)
+    assert cache.get(key) is None
+    assert cache.stats() == {'hits': 0, 'misses': 1, 'hit_ratio': 0.0, 'size': 0, 'maxsize': 0}
+
+
+def test_stats_and_clear():
+    cache = ScoreCache(maxsize=10)
+    key = ScoreCache.key('comment')
+    cache.put(key, 'comment', SCORES)
+    cache.get(key)
+    cache.get(ScoreCache.key('other'))
+    assert cache.stats()['hit_ratio'] == 0.5
+    cache.clear()
+    assert cache.stats() == {'hits': 0, 'misses': 0, 'hit_ratio': 0.0, 'size': 0, 'maxsize': 10}
@@ -0,0 +1,102 @@
+"""Session store TTL expiry and LRU eviction, in memory and in SQLite"""
+
+import os
+import sqlite3
+import zlib
+
+import pytest
+
+from session_store import COMPRESSION_LEVEL, MemorySessionStore, SQLiteSessionStore, _encode
+
+
+def _session(n):
+    return {'title': f'session {n}', 'results': ['x' * 100]}
+
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def make_store(request, tmp_path):
+    def make(ttl=60, max_bytes=10 ** 6):
+        if request.param == 'memory':
+            return MemorySessionStore(ttl, max_bytes)
+        return SQLiteSessionStore(str(tmp_path / 'sessions.db'), ttl, max_bytes)
+    return make
+
+
+def _size(store, session):
+    """Bytes a session counts for in store (compressed JSON for SQLite)"""
+    store.put('probe', session)
+    size = store.stats()['bytes']
+    store.delete('probe')
+    return size
+
+
+def test_sessions_expire_after_the_ttl(make_store, clock):
+    store = make_store(ttl=60)
+    store.put('a', _session(1))
+    clock.now += 59
+    assert store.get('a') == _session(1)
+    clock.now += 1
+    assert store.get('a') is None
+    assert 'a' not in store
+    assert store.stats()['sessions'] == 0
+
+
+@pytest.mark.parametrize('touch', [
+    lambda store, session_id: store.get(session_id) is not None,
+    lambda store, session_id: session_id in store
+], ids=['get', 'contains'])
+def test_least_recently_used_session_is_evicted_at_capacity(make_store, clock, touch):
+    probe = make_store()
+    capacity = 3 * _size(probe, _session(0))
+    store = make_store(max_bytes=capacity)
+    for n in range(3):
+        clock.now += 1
+        store.put(str(n), _session(n))
+    # Reading "0" (or checking it is there) makes "1" the least recently used
+    clock.now += 1
+    assert touch(store, '0')
+    clock.now += 1
+    store.put('3', _session(3))
+    assert store.get('1') is None
+    assert [n for n in '0123' if store.get(n) is not None] == ['0', '2', '3']
+    assert store.stats()['bytes'] <= capacity
+
+
+def test_newest_session_is_kept_even_over_capacity(make_store, clock):
+    store = make_store(max_bytes=10)
+    store.put('a', _session(1))
+    clock.now += 1
+    store.put('b', _session(2))
+    assert store.get('a') is None
+    assert store.get('b') == _session(2)
+
+
+def test_replacing_a_session_counts_its_size_once(make_store):
+    store = make_store()
+    store.put('a', _session(1))
+    size = store.stats()['bytes']
+    store.put('a', _session(1))
+    assert store.stats() == {'sessions': 1, 'bytes': size, 'max_bytes': 10 ** 6}
+
+
+def test_sqlite_rows_are_deleted_on_eviction_and_expiry(tmp_path, clock):
+    path = str(tmp_path / 'sessions.db')
+    big = {'results': os.urandom(5000).hex()}
+    # Room for exactly one of them, as stored (compressed)
+    store = SQLiteSessionStore(path, ttl=60, max_bytes=len(zlib.compress(_encode(big), COMPRESSION_LEVEL)))
+    for n in range(5):
+        clock.now += 1
+        store.put(str(n), big)
+    with sqlite3.connect(path) as db:
+        assert db.execute('SELECT id FROM sessions').fetchall() == [('4',)]
+
+    clock.now += 61
+    store.put('fresh', {'title': 'small'})
+    with sqlite3.connect(path) as db:
+        assert db.execute('SELECT id FROM sessions').fetchall() == [('fresh',)]
+
+
+def test_sqlite_sessions_are_shared_between_store_instances(tmp_path):
+    path = str(tmp_path / 'sessions.db')
+    SQLiteSessionStore(path).put('a', _session(1))
+    assert SQLiteSessionStore(path).get('a') == _session(1)
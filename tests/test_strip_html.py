@@ -0,0 +1,63 @@
+"""strip_html parity with BeautifulSoup(text, 'html.parser').get_text()"""
+
+import random
+
+import pytest
+
+from text_processor import strip_html
+
+bs4 = pytest.importorskip('bs4')
+
+_CASES = (
+    '', ' ', '\n', ' \n ', 'plain text', '<b>bold</b> text', '<br>', '<br/>', '<br></br>', '<p>one<p>two',
+    '<i>unclosed', 'closed</i> only', '<a href="x">link</a>', '<img src=x onerror=y>', '<script>x = 1</script>after',
+    '<style>p {}</style>', '<ruby>漢<rt>kan</rt></ruby>', '<pre>  keep   spaces </pre>', '<textarea> a </textarea>',
+    '<!-- comment -->text', '<!DOCTYPE html>doc', '<?php echo 1 ?>pi', '<![CDATA[raw <b>]]>', '&amp;', '&amp',
+    '&lt;3', '&notin;', '&notit;', '&#39;', '&#x27;', '&#0;', '&#128;', '&#x110000;', '&#55296;', '&#12ab;',
+    '&#xzz;', '&unknown;', 'a & b', 'a < b', '<3 you', '< b>', '</>', '<a<b>c', '<b><i>nested</b></i>',
+    '<div>\n  <span> </span>\n</div>', '<td>cell<td>cell', 'x<br>y<hr/>z', '<svg><path d="M0"/></svg>',
+    '<template><b>hidden</b></template>shown', 'tab\tand\fform', '&nbsp;&nbsp;', '<p>a</p>  <p>b</p>',
+)
+
+_TAGS = ('b', 'i', 'p', 'div', 'span', 'br', 'hr', 'img', 'a', 'pre', 'textarea', 'script', 'style', 'rt', 'td')
+_ENTITIES = ('&amp;', '&amp', '&lt;', '&gt', '&quot;', '&#39;', '&#x2764;', '&#150;', '&nbsp;', '&copy', '&bogus;', '&#;')
+_TEXT = ('love', 'hate', ' ', '  ', '\n', '\t', 'a < b', '>', '&', '"', "'", '=', '/', '😂', 'ü')
+
+
+def _fragments(size, seed=0):
+    """Random tag soup of open/close/self-closing tags, entities, comments and text"""
+    rng = random.Random(seed)
+    fragments = []
+    for _ in range(size):
+        parts = []
+        for _ in range(rng.randint(1, 10)):
+            kind = rng.random()
+            tag = rng.choice(_TAGS)
+            if kind < 0.2:
+                parts.append(f'<{tag}>')
+            elif kind < 0.35:
+                parts.append(f'</{tag}>')
+            elif kind < 0.4:
+                parts.append(f'<{tag} class="x"/>')
+            elif kind < 0.55:
+                parts.append(rng.choice(_ENTITIES))
+            elif kind < 0.6:
+                parts.append(rng.choice(('<!-- c -->', '<![CDATA[d]]>', '<!DOCTYPE x>', '<?x y?>')))
+            else:
+                parts.append(rng.choice(_TEXT))
+        fragments.append(''.join(parts))
+    return fragments
+
+
+def _expected(text):
+    return bs4.BeautifulSoup(text, 'html.parser').get_text()
+
+
+@pytest.mark.parametrize('text', _CASES)
+def test_strip_html_matches_beautifulsoup(text):
+    assert strip_html(text) == _expected(text)
+
+
+def test_strip_html_matches_beautifulsoup_on_random_fragments():
+    mismatches = [text for text in _fragments(5000) if strip_html(text) != _expected(text)]
+    assert mismatches == []
@@ -0,0 +1,115 @@
+"""clean / clean_batch behaviour"""
+
+import random
+
+import pytest
+
+import text_processor
+from sentiment_engine import ScoreCache, SentimentAnalyzer
+from text_processor import clean, clean_batch
+
+
+def test_clean_batch_url_cannot_span_comments():
+    # 'https://t' + sentinel + 'co/abc' must not read as one t.co URL
+    comments = ['see https://t', 'co/abc nice', 'third']
+    assert clean_batch(comments) == [clean(comment) for comment in comments]
+
+
+def test_analyze_comments_with_url_split_across_comments():
+    cache = ScoreCache()
+    analyzer = SentimentAnalyzer(cache=cache, model_format='lexicon')
+    comments = ['I love it https://t', 'co/x terrible', 'great', 'bad']
+    result = analyzer.analyze_comments(comments)
+    assert result['counts']['total'] == 4
+    for comment, (cleaned, _) in zip(comments, analyzer.score_comments(comments)):
+        assert cleaned == clean(comment)
+
+
+# Equivalence with the original sequential cascade (tests/reference_cleaning.py)
+
+_RULES = (
+    text_processor._SPECIAL_CHARACTERS + text_processor._CONTRACTIONS + text_processor._ENTITY_REFERENCES
+    + text_processor._SLANG + text_processor._HASHTAGS + text_processor._ACRONYMS + text_processor._GROUPING
+)
+_EXTRA_FRAGMENTS = (
+    'love', 'hate', 'great', 'the', 'video', 'https://t.co/abc12', 'http://t.co/Z9', 'https://t', 'co/x',
+    '<b>bold</b>', '<br/>', '&amp;', '&lt;3', '&#39;', '<p>hi', '😂', '🔥🔥', "'", '.', '...', '!!', '?',
+    '#', '@user', '\\n', 'A', 'ü', '\x89', 'Û', 'ª',
+)
+_FRAGMENTS = tuple(text for rule in _RULES for text in rule if text) + _EXTRA_FRAGMENTS
+_SEPARATORS = ('', '', ' ', ' ', '.', "'", ',', '\n')
+
+
+def _corpus(size, seed=0):
+    """Comments built from rule patterns, their replacements and common noise, glued together"""
+    rng = random.Random(seed)
+    comments = []
+    for _ in range(size):
+        parts = [rng.choice(_FRAGMENTS) for _ in range(rng.randint(1, 8))]
+        comments.append(''.join(part + rng.choice(_SEPARATORS) for part in parts))
+    return comments
+
+
+def _adversarial(size, seed=0):
+    """
+    Strings where one rule's pattern or replacement overlaps, or is spliced
+    into, another rule's pattern: the cases the pass grouping must keep
+    in sequential order
+    """
+    rules = [rule for rule in _RULES if rule[0]]
+    candidates = set()
+    for pattern, replacement in rules:
+        for other, _ in rules:
+            for k in range(1, len(other)):
+                candidates.add(other[:k] + replacement + other[k:])
+                if pattern.endswith(other[:k]):
+                    candidates.add(pattern + other[k:])
+                if other.endswith(pattern[:k]) and k < len(pattern):
+                    candidates.add(other + pattern[k:])
+    candidates = sorted(candidates)
+    return random.Random(seed).sample(candidates, min(size, len(candidates)))
+
+
+def _cuts(comments):
+    """Each comment cut in two at every position, dropping the character at the cut"""
+    return [[comment[:i], comment[i + 1:]] for comment in comments for i in range(len(comment))]
+
+
+@pytest.fixture(scope='module')
+def reference():
+    pytest.importorskip('bs4')
+    from tests import reference_cleaning
+    return reference_cleaning
+
+
+@pytest.fixture(scope='module')
+def corpus():
+    return _corpus(4000)
+
+
+def test_every_rule_alone_matches_reference(reference):
+    for text in _FRAGMENTS:
+        assert clean(text) == reference.clean(text), text
+
+
+def test_clean_matches_reference(reference, corpus):
+    mismatches = [comment for comment in corpus if clean(comment) != reference.clean(comment)]
+    assert mismatches == []
+
+
+def test_clean_matches_reference_on_rule_interactions(reference):
+    mismatches = [comment for comment in _adversarial(3000) if clean(comment) != reference.clean(comment)]
+    assert mismatches == []
+
+
+def test_clean_batch_matches_reference_across_comment_boundaries(reference):
+    # The dropped character becomes the batch sentinel, so patterns are
+    # split exactly where clean_batch joins comments
+    for pair in _cuts(_EXTRA_FRAGMENTS + tuple(sorted(set(_FRAGMENTS)))[::7]):
+        assert clean_batch(pair) == [reference.clean(comment) for comment in pair], pair
+
+
+def test_clean_batch_matches_reference(reference, corpus):
+    for start in range(0, len(corpus), 500):
+        batch = corpus[start:start + 500]
+        assert clean_batch(batch) == [reference.clean(comment) for comment in batch]
@@ -0,0 +1,97 @@
+"""VectorizedVader against VADER's own polarity_scores"""
+
+import gc
+import random
+import time
+
+import pytest
+
+import sentiment_engine
+from sentiment_engine import VectorizedVader, load_model, preload_model
+from text_processor import clean_batch
+
+# Words that switch on each of the scorer's rules
+_RULE_WORDS = (
+    'no', 'not', "don't", "isn't", 'never', 'without', 'doubt', 'least', 'at', 'very', 'so', 'this',
+    'kind', 'of', 'or', 'nor', 'but', 'BUT', 'kinda', 'sort', 'just', 'enough', 'extremely', 'barely',
+    'the', 'shit', 'bomb', 'bad', 'ass', 'yeah', 'right', 'cut', 'mustard', 'hand', 'to', 'mouth',
+    'back', 'handed', 'blow', 'smoke', 'break', 'a', 'leg', 'hat', 'tip',
+)
+_NOISE = ('!', '!!', '!!!!!', '?', '??', '????', '.', ',', ':)', ':(', '😂', '🔥', '💔', 'x', '')
+
+
+def _comments(model, size, seed=0):
+    """Comments mixing lexicon words, rule words, caps and punctuation"""
+    rng = random.Random(seed)
+    lexicon = sorted(model.lexicon)
+    comments = []
+    for _ in range(size):
+        words = []
+        for _ in range(rng.randint(0, 14)):
+            roll = rng.random()
+            if roll < 0.4:
+                word = rng.choice(lexicon)
+            elif roll < 0.85:
+                word = rng.choice(_RULE_WORDS)
+            else:
+                word = rng.choice(_NOISE)
+            if rng.random() < 0.1:
+                word = word.upper()
+            if rng.random() < 0.1:
+                word += rng.choice(_NOISE)
+            words.append(word)
+        comments.append(' '.join(words))
+    return comments
+
+
+@pytest.fixture(scope='module', params=['lexicon', 'pickle'])
+def model(request):
+    return load_model(model_format=request.param)
+
+
+def test_matches_polarity_scores_on_100k_comments(model):
+    # Raw as well as cleaned text: cleaning lowercases, which hides the caps rules
+    comments = _comments(model, 50000)
+    comments += clean_batch(_comments(model, 50000, seed=1))
+    scorer = VectorizedVader(model)
+    expected = [model.polarity_scores(comment) for comment in comments]
+    for start in range(0, len(comments), 5000):
+        batch = comments[start:start + 5000]
+        assert scorer.polarity_scores_batch(batch) == expected[start:start + 5000]
+
+
+def test_preload_builds_the_scorer_before_freezing():
+    model = preload_model(model_format='lexicon')
+    gc.unfreeze()
+    assert id(model) in sentiment_engine._vector_scorers
+    assert sentiment_engine._vector_scorer(model) is sentiment_engine._vector_scorers[id(model)]
+
+
+def _fresh_preload_seconds(monkeypatch, model_format, repeat=7):
+    """Best time to load a model and build its scorer from scratch"""
+    best = float('inf')
+    for _ in range(repeat):
+        monkeypatch.setattr(sentiment_engine, '_models', {})
+        monkeypatch.setattr(sentiment_engine, '_vector_scorers', {})
+        start = time.perf_counter()
+        sentiment_engine._vector_scorer(load_model(model_format=model_format))
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def test_lexicon_scorer_reads_sections_without_lookups(monkeypatch):
+    monkeypatch.setattr(sentiment_engine, '_models', {})
+    model = load_model(model_format='lexicon')
+    VectorizedVader(model)
+    assert model.lexicon._index.cache_info().currsize == 0
+    assert model.emojis._index.cache_info().currsize == 0
+
+
+def test_lexicon_preload_is_not_slower_than_pickle(monkeypatch):
+    # Alternate the formats so a burst of load from other threads hits both
+    best = {'lexicon': float('inf'), 'pickle': float('inf')}
+    for _ in range(9):
+        for model_format in best:
+            best[model_format] = min(best[model_format], _fresh_preload_seconds(monkeypatch, model_format, repeat=1))
+    # Some slack for timer noise; a per-key copy of the lexicon was 6x slower
+    assert best['lexicon'] < best['pickle'] * 1.5